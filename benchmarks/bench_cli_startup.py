@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the CLI paths run by hooks and slash commands.
+
+Times `scripts/exec.py daemon status` and `config show` end to end against
+a bare `python -c pass`, and uses `-X importtime` to check that none of
+them imports the audio stack. Runs against a throwaway HOME so the real
+config and daemon are never touched. Prints JSON; exits 1 if a command
+imports a heavy module or exceeds the overhead budget.
+
+Usage:
+    python benchmarks/bench_cli_startup.py
+    python benchmarks/bench_cli_startup.py --iterations 50 --budget-ms 30 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PLUGIN_ROOT = BENCH_DIR.parent
+EXEC_PATH = PLUGIN_ROOT / "scripts" / "exec.py"
+
+# CLI invocations that must stay fast
+COMMANDS = {
+    "daemon status": ["daemon", "status"],
+    "daemon status -v": ["daemon", "status", "--verbose"],
+    "config show": ["config", "show"],
+}
+
+# Modules only the daemon process may import
+HEAVY_MODULES = ("numpy", "scipy", "sounddevice", "pynput")
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def time_command(argv, iterations: int, env: dict) -> list:
+    """Wall-clock milliseconds of each run."""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        subprocess.run(argv, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def imported_modules(argv, env: dict) -> dict:
+    """Module -> cumulative import microseconds, from -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *argv[1:]],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="voice-to-claude CLI startup benchmark")
+    parser.add_argument("--iterations", type=int, default=20, help="Runs per command")
+    parser.add_argument("--budget-ms", type=float, default=100.0,
+                        help="Allowed p50 overhead over a bare interpreter start")
+    parser.add_argument("--output", type=Path, help="Write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        config_dir = Path(home) / ".config" / "voice-to-claude"
+        config_dir.mkdir(parents=True)
+        (config_dir / "config.json").write_text(json.dumps({"setup_complete": True}))
+        env = {**os.environ, "HOME": home}
+
+        baseline = time_command([sys.executable, "-c", "pass"], args.iterations, env)
+        baseline_p50 = percentile(baseline, 50)
+
+        results = []
+        failed = False
+        for name, command in COMMANDS.items():
+            print(f"Running {name}...", file=sys.stderr)
+            argv = [sys.executable, str(EXEC_PATH), *command]
+            samples = time_command(argv, args.iterations, env)
+            modules = imported_modules(argv, env)
+            heavy = sorted(m for m in modules if m.split(".")[0] in HEAVY_MODULES)
+            own = {m: us for m, us in modules.items() if m.startswith("voice_to_claude")}
+            overhead = percentile(samples, 50) - baseline_p50
+            ok = not heavy and overhead <= args.budget_ms
+            failed = failed or not ok
+            results.append({
+                "command": name,
+                "p50_ms": round(percentile(samples, 50), 1),
+                "p95_ms": round(percentile(samples, 95), 1),
+                "overhead_p50_ms": round(overhead, 1),
+                "voice_to_claude_import_ms": round(max(own.values(), default=0) / 1000, 1),
+                "heavy_modules": heavy,
+                "ok": ok,
+            })
+
+    report = {
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "interpreter_p50_ms": round(baseline_p50, 1),
+        "budget_ms": args.budget_ms,
+        "commands": results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the record -> transcribe -> inject pipeline.
+
+Feeds synthetic and fixture PCM through AudioRecorder buffering, VAD,
+WAV encoding, the Transcriber (backed by a stub whisper executable) and
+the TextInjector (backed by a fake keyboard controller). Runs headless
+with no model, audio device or display, and prints JSON so results can
+be compared between commits.
+
+Usage:
+    python benchmarks/bench_pipeline.py --output bench.json
+    python benchmarks/bench_pipeline.py --lengths 2,10 --sample-rates 16000 --fixtures path/to/wavs
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PLUGIN_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(PLUGIN_ROOT / "src"))
+sys.path.insert(0, str(BENCH_DIR))
+
+import fakes  # noqa: E402
+
+fakes.install()
+
+import numpy as np  # noqa: E402
+from scipy.io import wavfile  # noqa: E402
+
+from voice_to_claude.audio import encode_wav, to_int16  # noqa: E402
+from voice_to_claude.config import SAMPLE_RATE, Config  # noqa: E402
+from voice_to_claude.keyboard import TextInjector  # noqa: E402
+from voice_to_claude.metrics import percentile  # noqa: E402
+from voice_to_claude.recorder import AudioRecorder  # noqa: E402
+from voice_to_claude.transcriber import Transcriber  # noqa: E402
+from voice_to_claude.vad import VoiceActivityDetector  # noqa: E402
+
+BLOCK_SIZE = 512  # Frames per simulated PortAudio callback
+
+
+def make_synthetic(seconds: float, silence_ratio: float, sample_rate: int, seed: int = 0) -> np.ndarray:
+    """Speech-like bursts (modulated harmonics) separated by low-level noise."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sample_rate)
+    audio = (rng.standard_normal(n) * 0.0005).astype(np.float32)
+
+    speech_frames = int(n * (1 - silence_ratio))
+    if speech_frames <= 0:
+        return audio
+
+    # Leading/trailing silence plus pauses between ~1s bursts
+    bursts = max(int(speech_frames / sample_rate), 1)
+    burst_len = speech_frames // bursts
+    gap = (n - speech_frames) // (bursts + 1)
+    t = np.arange(burst_len) / sample_rate
+    envelope = 0.5 * (1 - np.cos(2 * np.pi * 4 * t))
+    for i in range(bursts):
+        f0 = rng.uniform(100, 220)
+        voice = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 6))
+        start = gap * (i + 1) + burst_len * i
+        audio[start:start + burst_len] += (0.2 * envelope * voice).astype(np.float32)
+    return audio
+
+
+def load_fixtures(directory: Path):
+    """Yield (name, int16 audio, sample_rate) for each mono or stereo WAV in a directory."""
+    for path in sorted(directory.glob("*.wav")):
+        sample_rate, data = wavfile.read(str(path))
+        if data.ndim > 1:
+            data = data.mean(axis=1).astype(data.dtype)
+        yield path.stem, to_int16(data), sample_rate
+
+
+def make_config(tmp: Path) -> Config:
+    """Config pointing at the stub whisper and an empty model file."""
+    models_dir = tmp / "models"
+    models_dir.mkdir(exist_ok=True)
+    (models_dir / "ggml-base.bin").touch()
+    return Config(
+        whisper_cpp_path=str(BENCH_DIR / "stub_whisper.py"),
+        models_dir=str(models_dir),
+        use_server=False,
+        cache_enabled=False,  # Every iteration must reach the stub
+        setup_complete=True,
+    )
+
+
+def run_case(name: str, audio: np.ndarray, sample_rate: int, iterations: int,
+             config: Config, tmp: Path) -> dict:
+    """Run the pipeline stages on one clip captured at sample_rate and collect timings."""
+    seconds = len(audio) / sample_rate
+    transcriber = Transcriber(config)
+    controller = fakes.FakeController()
+    injector = TextInjector(mode="keyboard", controller=controller, typing_backend="pynput")
+    vad = VoiceActivityDetector.from_config(config)
+    blocks = [audio[i:i + BLOCK_SIZE, None] for i in range(0, len(audio), BLOCK_SIZE)]
+
+    stages = {}
+
+    def timed(stage, fn, *args, **kwargs):
+        start = time.perf_counter()
+        value = fn(*args, **kwargs)
+        stages.setdefault(stage, []).append((time.perf_counter() - start) * 1000)
+        return value
+
+    totals = []
+    tracemalloc.start()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        recorder = AudioRecorder(max_seconds=math.ceil(seconds) + 1, capture_rate=sample_rate)
+        recorder.start()
+
+        def feed():
+            for block in blocks:
+                recorder._audio_callback(block, len(block), None, None)
+
+        timed("buffer", feed)
+        recorded = timed("stop", recorder.stop)
+        speech = timed("vad", vad.trim, recorded, SAMPLE_RATE)
+        clip = speech if speech is not None else recorded
+
+        wav_path = timed("save_to_wav", recorder.save_to_wav, clip, tmp / "clip.wav")
+        timed("encode_wav", encode_wav, clip, SAMPLE_RATE)
+        file_result = timed("transcribe_file", transcriber.transcribe, wav_path)
+        result = timed("transcribe_memory", transcriber.transcribe_audio, clip, SAMPLE_RATE)
+        wav_path.unlink(missing_ok=True)
+        if not (file_result.success and result.success):
+            raise RuntimeError(f"Stub transcription failed: {result.error or file_result.error}")
+        timed("inject", injector.inject, result.text)
+        totals.append((time.perf_counter() - start) * 1000)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    mean_total = sum(totals) / len(totals)
+    return {
+        "name": name,
+        "sample_rate": sample_rate,
+        "audio_seconds": round(seconds, 3),
+        "speech_seconds": round(len(speech) / SAMPLE_RATE, 3) if speech is not None else 0.0,
+        "iterations": iterations,
+        "stages_ms": {
+            stage: {
+                "mean": round(sum(values) / len(values), 3),
+                "p50": round(percentile(values, 50), 3),
+                "p95": round(percentile(values, 95), 3),
+                "p99": round(percentile(values, 99), 3),
+            }
+            for stage, values in stages.items()
+        },
+        "total_ms": {"mean": round(mean_total, 3), "p95": round(percentile(totals, 95), 3)},
+        "throughput_x_realtime": round(seconds / (mean_total / 1000), 2),
+        "injected_chars_per_second": round(
+            controller.typed_chars / iterations / (sum(stages["inject"]) / len(stages["inject"]) / 1000), 1
+        ),
+        "peak_traced_memory_bytes": peak,
+    }
+
+
+def git_commit() -> str:
+    """Current commit of the repo, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PLUGIN_ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def parse_list(value: str, cast):
+    return [cast(v) for v in value.split(",") if v]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="voice-to-claude pipeline benchmark")
+    parser.add_argument("--iterations", type=int, default=5, help="Runs per case")
+    parser.add_argument("--lengths", default="1,5,30", help="Synthetic clip lengths in seconds")
+    parser.add_argument("--silence-ratios", default="0.1,0.5", help="Fraction of each clip that is silence")
+    parser.add_argument("--sample-rates", default="16000,48000",
+                        help="Microphone rates for synthetic clips (resampled to 16kHz while buffering)")
+    parser.add_argument("--fixtures", type=Path, help="Directory of WAV fixtures to include")
+    parser.add_argument("--stub-rtf", type=float, default=0.0,
+                        help="Simulated decode seconds per audio second")
+    parser.add_argument("--stub-load-ms", type=float, default=0.0, help="Simulated model load time")
+    parser.add_argument("--output", type=Path, help="Write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    os.environ["STUB_WHISPER_RTF"] = str(args.stub_rtf)
+    os.environ["STUB_WHISPER_LOAD_MS"] = str(args.stub_load_ms)
+
+    cases = []
+    for sample_rate in parse_list(args.sample_rates, int):
+        for length in parse_list(args.lengths, float):
+            for ratio in parse_list(args.silence_ratios, float):
+                name = f"synthetic-{length:g}s-{int(ratio * 100)}pct-silence-{sample_rate}hz"
+                cases.append((name, to_int16(make_synthetic(length, ratio, sample_rate)), sample_rate))
+    if args.fixtures:
+        cases.extend(load_fixtures(args.fixtures))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        config = make_config(tmp)
+        results = []
+        for name, audio, sample_rate in cases:
+            print(f"Running {name}...", file=sys.stderr)
+            results.append(run_case(name, audio, sample_rate, args.iterations, config, tmp))
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "stub": {"rtf": args.stub_rtf, "load_ms": args.stub_load_ms},
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "cases": results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Headless stand-ins for the audio device and keyboard.
+
+The benchmarks install these before importing voice_to_claude so they run
+on machines with no microphone, no PortAudio and no display, and never
+type into the real desktop.
+"""
+
+import sys
+import types
+
+
+class FakeInputStream:
+    """sounddevice.InputStream that never touches a device."""
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeController:
+    """pynput.keyboard.Controller that records instead of typing."""
+
+    def __init__(self):
+        self.typed_chars = 0
+        self.events = 0
+
+    def type(self, text):
+        self.typed_chars += len(text)
+        self.events += 2 * len(text)
+
+    def press(self, key):
+        self.events += 1
+
+    def release(self, key):
+        self.events += 1
+
+
+def install() -> None:
+    """Replace sounddevice and pynput in sys.modules with the fakes."""
+    sd = types.ModuleType("sounddevice")
+    sd.PortAudioError = type("PortAudioError", (Exception,), {})
+    sd.InputStream = FakeInputStream
+    sd.OutputStream = FakeInputStream
+    sd.query_devices = lambda *args, **kwargs: {"name": "fake", "default_samplerate": 16000.0}
+    sd.check_input_settings = lambda **kwargs: None
+    sys.modules["sounddevice"] = sd
+
+    key_names = ["ctrl", "ctrl_l", "alt", "alt_l", "shift", "shift_l", "cmd", "cmd_l", "backspace"]
+    keyboard = types.ModuleType("pynput.keyboard")
+    keyboard.Key = types.SimpleNamespace(**{name: name for name in key_names})
+    keyboard.Controller = FakeController
+    keyboard.Listener = FakeInputStream
+    pynput = types.ModuleType("pynput")
+    pynput.keyboard = keyboard
+    sys.modules["pynput"] = pynput
+    sys.modules["pynput.keyboard"] = keyboard
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Stand-in for whisper-cli used by the benchmarks.
+
+Accepts the same arguments the Transcriber passes, reads the WAV from a file
+or stdin (-f -), simulates decode time proportional to the audio length and
+prints a transcript plus whisper.cpp-style timing lines on stderr.
+
+Environment:
+    STUB_WHISPER_LOAD_MS: Simulated model load time (default 0)
+    STUB_WHISPER_RTF: Simulated decode seconds per audio second (default 0)
+"""
+
+import os
+import sys
+import time
+
+
+def main() -> int:
+    args = sys.argv[1:]
+    inputs = [args[i + 1] for i, arg in enumerate(args) if arg == "-f" and i + 1 < len(args)]
+    if not inputs:
+        print("error: no input file", file=sys.stderr)
+        return 1
+
+    load_ms = float(os.environ.get("STUB_WHISPER_LOAD_MS", "0"))
+    rtf = float(os.environ.get("STUB_WHISPER_RTF", "0"))
+
+    start = time.perf_counter()
+    time.sleep(load_ms / 1000)
+
+    for path in inputs:
+        if path == "-":
+            data = sys.stdin.buffer.read()
+        else:
+            with open(path, "rb") as f:
+                data = f.read()
+        # 16-bit mono PCM after a 44-byte header
+        sample_rate = int.from_bytes(data[24:28], "little") or 16000
+        audio_seconds = max(len(data) - 44, 0) / 2 / sample_rate
+        time.sleep(audio_seconds * rtf)
+        print(f" stub transcript of {audio_seconds:.2f} seconds of audio")
+
+    total_ms = (time.perf_counter() - start) * 1000
+    print(f"whisper_print_timings:     load time = {load_ms:8.2f} ms", file=sys.stderr)
+    print(f"whisper_print_timings:    total time = {total_ms:8.2f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
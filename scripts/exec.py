@@ -21,8 +21,12 @@ def main():
 
     # Daemon commands
     daemon_parser = subparsers.add_parser("daemon", help="Daemon management")
-    daemon_parser.add_argument("action", choices=["start", "stop", "status", "restart", "run"],
+    daemon_parser.add_argument("action",
+                               choices=["start", "stop", "status", "restart", "run", "reload",
+                                        "model", "record-start", "record-stop", "record-toggle"],
                                help="Action to perform")
+    daemon_parser.add_argument("value", nargs="?",
+                               help="Model name for 'model' (switches the running daemon only)")
     daemon_parser.add_argument("--background", "-b", action="store_true",
                                help="Run in background")
     daemon_parser.add_argument("--quiet", "-q", action="store_true",
@@ -37,12 +41,58 @@ def main():
                                default="show", help="Setting to configure")
     config_parser.add_argument("value", nargs="?", help="New value")
 
+    # Batch transcription
+    transcribe_parser = subparsers.add_parser("transcribe", help="Transcribe WAV files or directories")
+    transcribe_parser.add_argument("paths", nargs="+", help="WAV files or directories")
+    transcribe_parser.add_argument("--workers", "-w", type=int, default=2,
+                                   help="Parallel workers (default: 2)")
+    transcribe_parser.add_argument("--files-per-call", type=int, default=8,
+                                   help="Files per whisper-cli invocation when not using the server")
+    transcribe_parser.add_argument("--model", help="Model to use instead of the configured one")
+    transcribe_parser.add_argument("--no-server", action="store_true",
+                                   help="Use grouped whisper-cli calls instead of resident servers")
+    transcribe_parser.add_argument("--output", "-o", help="JSONL output file (default: stdout)")
+
+    # Model files
+    models_parser = subparsers.add_parser("models", help="Model files")
+    models_parser.add_argument("action", choices=["list", "pull", "verify", "prune", "quantize"],
+                               help="Action to perform")
+    models_parser.add_argument("model", nargs="?",
+                               help="Model for 'pull' (default: the configured one) or 'verify' (default: all), "
+                                    "quantized variant for 'quantize', e.g. medium-q5_0")
+    models_parser.add_argument("--from", dest="source",
+                               help="Pull from a mirror directory, file:// or http(s) URL (default: model_mirror)")
+    models_parser.add_argument("--connections", type=int, default=4,
+                               help="Parallel requests per download (default: 4)")
+    models_parser.add_argument("--online", action="store_true",
+                               help="Verify: fetch the published checksum for files pulled without one")
+    models_parser.add_argument("--dry-run", action="store_true",
+                               help="Prune: list the files that would be deleted")
+
+    # Decoding-parameter tuning
+    tune_parser = subparsers.add_parser("tune", help="Find the fastest decoding settings for this machine")
+    tune_parser.add_argument("--clip", help="Reference WAV file (default: whisper.cpp's samples/jfk.wav)")
+    tune_parser.add_argument("--text", help="Correct transcript of the clip (default: the transcript "
+                                            "produced with whisper.cpp's default settings)")
+    tune_parser.add_argument("--runs", type=int, default=3, help="Decodes per setting (default: 3)")
+    tune_parser.add_argument("--max-wer", type=float,
+                             help="Allowed word error rate against the reference (default: tuning_max_wer)")
+    tune_parser.add_argument("--dry-run", action="store_true", help="Report the result without saving it")
+
     # Setup command
     setup_parser = subparsers.add_parser("setup", help="Run setup")
     setup_parser.add_argument("--skip-build", action="store_true",
                               help="Skip whisper.cpp build")
     setup_parser.add_argument("--skip-model", action="store_true",
                               help="Skip model download")
+    setup_parser.add_argument("--model",
+                              help="Model to download, e.g. medium-q5_0 (default: base); quantized "
+                                   "variants that are not published are quantized locally")
+    setup_parser.add_argument("--rebuild", action="store_true",
+                              help="Rebuild whisper.cpp from a clean build directory")
+    setup_parser.add_argument("--profile",
+                              help="whisper.cpp build profile: metal, native, openblas, avx512, "
+                                   "avx2 or generic (default: detected from the CPU)")
 
     args = parser.parse_args()
 
@@ -50,6 +100,12 @@ def main():
         handle_daemon(args)
     elif args.command == "config":
         handle_config(args)
+    elif args.command == "transcribe":
+        handle_transcribe(args)
+    elif args.command == "models":
+        handle_models(args)
+    elif args.command == "tune":
+        handle_tune(args)
     elif args.command == "setup":
         handle_setup(args)
     else:
@@ -59,11 +115,12 @@ def main():
 
 def handle_daemon(args):
     """Handle daemon commands."""
-    from voice_to_claude.daemon import (
+    # Not voice_to_claude.daemon: that imports the audio stack, which only
+    # the daemon process itself needs
+    from voice_to_claude.lifecycle import (
         start_daemon, stop_daemon, daemon_status
     )
     from voice_to_claude.config import Config
-    import time
 
     config = Config.load()
 
@@ -81,15 +138,38 @@ def handle_daemon(args):
 
     elif args.action == "restart":
         stop_daemon()
-        time.sleep(0.5)
         start_daemon(background=args.background, quiet=args.quiet)
 
     elif args.action == "run":
         # Run in foreground (used by background launcher)
         start_daemon(background=False, quiet=args.quiet)
 
+    elif args.action in ("reload", "model", "record-start", "record-stop", "record-toggle"):
+        from voice_to_claude.control import ControlError, send_command
+
+        try:
+            if args.action == "reload":
+                result = send_command("reload")
+                changed = result["changed"]
+                print(f"Reloaded: {', '.join(changed)}" if changed else "Reloaded: no changes")
+                if result.get("session_model_dropped"):
+                    print(f"Session model {result['session_model_dropped']} replaced by the saved model")
+            elif args.action == "model":
+                if not args.value:
+                    print("Usage: daemon model <name>")
+                    sys.exit(1)
+                send_command("model", model=args.value, timeout=30.0)
+                print(f"Daemon now using model: {args.value} (this run only; `daemon reload` "
+                      f"or a restart returns to the saved model)")
+            else:
+                result = send_command("record", action=args.action.split("-", 1)[1])
+                print("Recording" if result["recording"] else "Not recording")
+        except ControlError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
     elif args.action == "status":
-        status = daemon_status()
+        status = daemon_status(include_metrics=args.verbose)
         if args.verbose:
             print("voice-to-claude Status")
             print("=" * 40)
@@ -98,9 +178,56 @@ def handle_daemon(args):
                 print(f"Daemon:   Running (PID: {status['pid']})")
             else:
                 print("Daemon:   Stopped")
-            print(f"Model:    {status['model']}")
+            if status['model_selection'] == "adaptive":
+                print(f"Model:    adaptive (default {status['model']})")
+            else:
+                print(f"Model:    {status['model']}")
             print(f"Hotkey:   {status['hotkey']}")
             print(f"Output:   {status['output_mode']}")
+            warmup = status.get("warmup")
+            if warmup:
+                details = [warmup["method"]]
+                if warmup.get("seconds") is not None:
+                    details.append(f"{warmup['bytes'] / 1024 ** 2:.0f} MB in {warmup['seconds']:.2f}s")
+                    details.append("was cached" if warmup.get("was_cached") else "was cold")
+                ready = status.get("time_to_ready_seconds")
+                ready_text = f", ready in {ready:.2f}s" if ready is not None else ", loading"
+                print(f"Warm-up:  {warmup['state']} ({', '.join(details)}){ready_text}")
+            queue = status.get("queue")
+            if queue:
+                print(f"Queue:    {queue['depth']}/{queue['max_depth']} waiting"
+                      f"{', 1 in flight' if queue['in_flight'] else ''}"
+                      f" (wait last {queue['last_wait_seconds']:.2f}s,"
+                      f" avg {queue['avg_wait_seconds']:.2f}s)")
+                print(f"          processed {queue['processed']}, merged {queue['merged']},"
+                      f" dropped {queue['dropped']}, cancelled {queue['cancelled']}")
+            cache = status.get("cache")
+            if cache:
+                lookups = cache.get("hits", 0) + cache.get("misses", 0)
+                rate = f", {100 * cache.get('hits', 0) / lookups:.0f}% hit rate" if lookups else ""
+                print(f"Cache:    {cache.get('hits', 0)} hits, {cache.get('misses', 0)} misses{rate}")
+            latency = status.get("latency")
+            if latency:
+                print()
+                print(f"Latency (ms, last {max(s['count'] for s in latency.values())} dictations)")
+                print(f"  {'stage':<20}{'p50':>9}{'p95':>9}{'p99':>9}")
+                for stage, stats in latency.items():
+                    print(f"  {stage:<20}{stats['p50']:>9.1f}{stats['p95']:>9.1f}{stats['p99']:>9.1f}")
+            injection = status.get("injection")
+            if injection:
+                print()
+                print("Injection speed")
+                for method, stats in injection.items():
+                    print(f"  {method:<12}{stats['chars_per_second']:>9.0f} chars/s ({stats['count']} dictations)")
+            speed = status.get("model_speed")
+            if speed:
+                print()
+                print("Measured model speed")
+                print(f"  {'model':<12}{'runs':>6}{'overhead s':>12}{'s/audio s':>11}{'load s':>9}")
+                for model, stats in speed.items():
+                    load = f"{stats['load_seconds']:.2f}" if stats['load_seconds'] is not None else "-"
+                    print(f"  {model:<12}{stats['samples']:>6}{stats['overhead_seconds']:>12.2f}"
+                          f"{stats['rtf']:>11.3f}{load:>9}")
         else:
             if status['running']:
                 print(f"Running (PID: {status['pid']})")
@@ -119,48 +246,66 @@ def handle_config(args):
     if args.setting == "show" or args.setting is None:
         print("Current Configuration")
         print("=" * 40)
-        print(f"Model:    {config.model}")
+        if config.model_selection == "adaptive":
+            print(f"Model:    adaptive ({', '.join(config.adaptive_models)}; default {config.model})")
+        else:
+            print(f"Model:    {config.model}")
         print(f"Hotkey:   {config.get_hotkey_description()}")
         print(f"Output:   {config.output_mode}")
         print(f"Sounds:   {'enabled' if config.sound_effects else 'disabled'}")
+        print(f"Build:    {config.build_profile or 'default'}")
         return
 
     if args.value is None:
         # Show current value
         if args.setting == "model":
             print(f"Current model: {config.model}")
-            print("\nAvailable models: tiny, base, medium, large-v3")
+            print(f"Model selection: {config.model_selection}")
+            print()
+            print_model_table(config)
+            print("\nQuantized variants (e.g. medium-q5_0) are much faster on CPU-only machines.")
+            print("Use 'adaptive' to pick a model per utterance, 'static' to always use the current one")
         elif args.setting == "hotkey":
             print(f"Current hotkey: {config.get_hotkey_description()}")
             print("\nOptions: ctrl, alt, shift, cmd (combine with +)")
         elif args.setting == "output":
             print(f"Current output mode: {config.output_mode}")
-            print("\nOptions: keyboard, clipboard")
+            print("\nOptions: keyboard, clipboard, auto (paste long texts, type short ones), copy (clipboard only)")
         elif args.setting == "sounds":
             print(f"Sound effects: {'on' if config.sound_effects else 'off'}")
         return
 
     # Set new value
-    if args.setting == "model":
+    if args.setting == "model" and args.value in ("adaptive", "static"):
+        config.model_selection = args.value
+        config.save()
+        print(f"Model selection changed to: {args.value}")
+        apply_to_running_daemon()
+
+    elif args.setting == "model":
+        from voice_to_claude.models import ModelError, print_progress, pull_model
+
         if args.value not in WHISPER_MODELS:
             print(f"Invalid model: {args.value}")
-            print("Available: tiny, base, medium, large-v3")
+            print(f"Available: {', '.join(WHISPER_MODELS)}")
             sys.exit(1)
 
         # Check if model exists
         if config.models_dir:
             model_path = Path(config.models_dir) / WHISPER_MODELS[args.value]["file"]
             if not model_path.exists():
-                print(f"Model '{args.value}' not downloaded.")
-                print(f"Download with:")
-                print(f"  cd ~/.local/share/voice-to-claude/whisper.cpp")
-                print(f"  ./models/download-ggml-model.sh {args.value}")
-                sys.exit(1)
+                print(f"Model '{args.value}' not downloaded, pulling it...")
+                try:
+                    pull_model(config, args.value, progress=print_progress)
+                except ModelError as e:
+                    print(f"\nError: {e}")
+                    print(f"Retry with: python scripts/exec.py models pull {args.value}")
+                    sys.exit(1)
 
         config.model = args.value
         config.save()
         print(f"Model changed to: {args.value}")
-        print("Restart daemon for changes to take effect.")
+        apply_to_running_daemon()
 
     elif args.setting == "hotkey":
         keys = args.value.lower().split("+")
@@ -170,27 +315,235 @@ def handle_config(args):
         config.hotkey_cmd = "cmd" in keys
         config.save()
         print(f"Hotkey changed to: {config.get_hotkey_description()}")
-        print("Restart daemon for changes to take effect.")
+        apply_to_running_daemon()
 
     elif args.setting == "output":
-        if args.value not in ["keyboard", "clipboard"]:
-            print("Invalid output mode. Options: keyboard, clipboard")
+        if args.value not in ["keyboard", "clipboard", "auto", "copy"]:
+            print("Invalid output mode. Options: keyboard, clipboard, auto, copy")
             sys.exit(1)
         config.output_mode = args.value
         config.save()
         print(f"Output mode changed to: {args.value}")
-        print("Restart daemon for changes to take effect.")
+        apply_to_running_daemon()
 
     elif args.setting == "sounds":
         config.sound_effects = args.value.lower() in ["on", "true", "1", "yes"]
         config.save()
         print(f"Sound effects: {'on' if config.sound_effects else 'off'}")
+        apply_to_running_daemon()
+
+
+def print_model_table(config):
+    """Models with their size and measured speed."""
+    from voice_to_claude.models import model_report
+
+    print(f"  {'model':<16}{'size':>10}  {'status':<12}{'runs':>6}{'overhead s':>12}{'s/audio s':>11}")
+    for row in model_report(config):
+        if row["downloaded"]:
+            size, status = f"{row['size_bytes'] / 1024 ** 2:.0f}MB", "downloaded"
+        else:
+            size = row["expected_size"]
+            status = "available" if row["published"] or not row["quantization"] else "quantize"
+        speed = row["speed"]
+        measured = (f"{speed['samples']:>6}{speed['overhead_seconds']:>12.2f}{speed['rtf']:>11.3f}"
+                    if speed else f"{'-':>6}{'-':>12}{'-':>11}")
+        marker = "*" if row["model"] == config.model else " "
+        print(f"{marker} {row['model']:<16}{size:>10}  {status:<12}{measured}")
+
+
+def apply_to_running_daemon():
+    """Ask a running daemon to pick up the saved config."""
+    from voice_to_claude.control import ControlError, send_command
+
+    try:
+        result = send_command("reload")
+    except ControlError:
+        print("Changes take effect the next time the daemon starts.")
+        return
+    if result["changed"]:
+        print("Applied to the running daemon.")
+
+
+def handle_transcribe(args):
+    """Handle batch transcription."""
+    from voice_to_claude.batch import BatchTranscriber, collect_audio_files
+    from voice_to_claude.config import Config, WHISPER_MODELS
+
+    config = Config.load()
+    if not config.setup_complete:
+        print("Setup not complete. Run /voice-to-claude:setup first.", file=sys.stderr)
+        sys.exit(1)
+    if args.model:
+        if args.model not in WHISPER_MODELS:
+            print(f"Invalid model: {args.model}", file=sys.stderr)
+            sys.exit(1)
+        config.model = args.model
+
+    files = collect_audio_files(args.paths)
+    if not files:
+        print("No WAV files found.", file=sys.stderr)
+        sys.exit(1)
+
+    batch = BatchTranscriber(
+        config,
+        workers=args.workers,
+        files_per_call=args.files_per_call,
+        use_server=False if args.no_server else None,
+    )
+    if args.output:
+        with open(args.output, "w") as output:
+            summary = batch.run(files, output)
+    else:
+        summary = batch.run(files)
+
+    print(f"Transcribed {summary['succeeded']}/{summary['files']} files "
+          f"({summary['audio_seconds']:.1f}s of audio in {summary['wall_seconds']:.1f}s, "
+          f"{summary['x_realtime']}x realtime)", file=sys.stderr)
+    if summary["failed"]:
+        sys.exit(1)
+
+
+def handle_models(args):
+    """Handle model file commands."""
+    from voice_to_claude.config import Config, WHISPER_MODELS
+    from voice_to_claude.models import (
+        ModelError, model_report, models_in_use, print_progress, prune_models, pull_model, quantize_model,
+        verify_model,
+    )
+
+    config = Config.load()
+    if args.model and args.model not in WHISPER_MODELS:
+        print(f"Invalid model: {args.model}")
+        print(f"Available: {', '.join(WHISPER_MODELS)}")
+        sys.exit(1)
+
+    if args.action == "list":
+        print_model_table(config)
+
+    elif args.action == "pull":
+        model = args.model or config.model
+        try:
+            path = pull_model(config, model, source=args.source, connections=args.connections,
+                              progress=print_progress)
+        except ModelError as e:
+            print(f"\nError: {e}")
+            sys.exit(1)
+        print(f"{model}: {path} ({path.stat().st_size / 1024 ** 2:.0f}MB)")
+
+    elif args.action == "verify":
+        models = [args.model] if args.model else [
+            row["model"] for row in model_report(config) if row["downloaded"]
+        ]
+        failed = False
+        for model in models:
+            result = verify_model(config, model, online=args.online)
+            if result["status"] == "ok" and result["verified"]:
+                print(f"  ✓ {model:<16} {result['sha256'][:16]}  ({result['source']})")
+            elif result["status"] == "ok":
+                print(f"  ✓ {model:<16} {result['sha256'][:16]}  unchanged since pulled from {result['source']}; "
+                      f"no published checksum (try --online)")
+            elif result["status"] == "unknown":
+                print(f"  ? {model:<16} {result['sha256'][:16]}  no reference checksum (try --online)")
+            else:
+                failed = True
+                detail = "not downloaded" if result["status"] == "missing" else \
+                    f"expected {result['expected'][:16]}, got {result['actual'][:16]}; re-pull it"
+                print(f"  ✗ {model:<16} {detail}")
+        if failed:
+            sys.exit(1)
+
+    elif args.action == "prune":
+        keep = models_in_use(config)
+        removed = prune_models(config, keep, dry_run=args.dry_run)
+        for path, size in removed:
+            print(f"  {'would delete' if args.dry_run else 'deleted'} {path.name} ({size / 1024 ** 2:.0f}MB)")
+        print(f"{len(removed)} file(s); kept models in use: {', '.join(keep)}")
+
+    elif args.action == "quantize":
+        if not args.model or "quantization" not in WHISPER_MODELS.get(args.model, {}):
+            variants = [name for name, info in WHISPER_MODELS.items() if "quantization" in info]
+            print(f"Usage: models quantize <variant>  ({', '.join(variants)})")
+            sys.exit(1)
+        try:
+            path = quantize_model(config, args.model)
+        except ModelError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"Created {path} ({path.stat().st_size / 1024 ** 2:.0f}MB)")
+
+
+def format_settings(settings: dict) -> str:
+    """Decoding settings as whisper-cli flags ("defaults" when none are set)."""
+    from dataclasses import replace
+    from voice_to_claude.config import Config
+
+    # audio_ctx is shown as if the clip fits
+    args = replace(Config(), **settings).get_decode_args(audio_seconds=0)
+    return " ".join(args) or "defaults"
+
+
+def handle_tune(args):
+    """Handle decoding-parameter tuning."""
+    from pathlib import Path
+    from voice_to_claude.config import Config
+    from voice_to_claude.tuning import TUNED_FIELDS, Tuner, reference_clip
+
+    config = Config.load()
+    if not config.setup_complete:
+        print("Setup not complete. Run /voice-to-claude:setup first.")
+        sys.exit(1)
+    clip = Path(args.clip) if args.clip else reference_clip(config)
+    if clip is None or not clip.exists():
+        print("No reference clip found; pass one with --clip <file.wav>")
+        sys.exit(1)
+
+    def report(trial):
+        if trial.error:
+            print(f"  {format_settings(trial.settings):<32} failed: {trial.error}")
+        else:
+            print(f"  {format_settings(trial.settings):<32} {trial.seconds * 1000:>8.0f}ms  WER {trial.wer:.1%}")
+
+    tuner = Tuner(config, clip, runs=args.runs, max_wer=args.max_wer,
+                  reference_text=args.text, progress=report)
+    print(f"Tuning {config.model} on {clip.name} ({args.runs} runs per setting, "
+          f"max WER {tuner.max_wer:.1%})")
+    try:
+        best = tuner.run()
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    baseline = tuner.trials[0]
+    print()
+    print(f"Fastest: {format_settings(best.settings)} "
+          f"({best.seconds * 1000:.0f}ms vs {baseline.seconds * 1000:.0f}ms with defaults)")
+    current = {name: getattr(config, name) for name in TUNED_FIELDS}
+    if args.dry_run or best.settings == current:
+        return
+    for name in TUNED_FIELDS:
+        setattr(config, name, best.settings[name])
+    config.save()
+    print("Saved.")
+    apply_to_running_daemon()
 
 
 def handle_setup(args):
     """Handle setup command."""
-    from scripts.setup import run_setup
-    run_setup(skip_build=args.skip_build, skip_model=args.skip_model)
+    from voice_to_claude.setup import BUILD_PROFILES, run_setup
+
+    if args.profile and args.profile not in BUILD_PROFILES:
+        print(f"Invalid profile: {args.profile}")
+        print(f"Available: {', '.join(BUILD_PROFILES)}")
+        sys.exit(1)
+    run_setup(skip_build=args.skip_build, skip_model=args.skip_model,
+              rebuild=args.rebuild, profile=args.profile, model=args.model)
+
+    # A running daemon switches to the new binaries right away
+    from voice_to_claude.control import ControlError, send_command
+    try:
+        send_command("reload")
+    except ControlError:
+        pass
 
 
 if __name__ == "__main__":
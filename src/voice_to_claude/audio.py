@@ -0,0 +1,230 @@
+"""In-memory audio helpers shared by the recorder and transcriber."""
+
+import math
+import struct
+
+import numpy as np
+
+from .config import SAMPLE_RATE
+
+
+def to_int16(audio: np.ndarray) -> np.ndarray:
+    """Convert float32 PCM in [-1, 1] to int16. int16 input is returned as-is."""
+    if audio.dtype == np.int16:
+        return audio
+    scaled = np.multiply(audio, 32767.0, dtype=np.float32)
+    np.clip(scaled, -32768.0, 32767.0, out=scaled)
+    return scaled.astype(np.int16)
+
+
+def wav_header(num_samples: int, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """Build a 44-byte header for mono 16-bit PCM WAV data."""
+    data_size = num_samples * 2
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", data_size,
+    )
+
+
+def encode_wav(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """Encode mono PCM as WAV bytes without touching the disk."""
+    pcm = np.ascontiguousarray(to_int16(audio).reshape(-1))
+    return b"".join([wav_header(len(pcm), sample_rate), memoryview(pcm).cast("B")])
+
+
+class RingBuffer:
+    """
+    Fixed-capacity ring buffer of mono samples, written in place.
+
+    Positions are absolute frame counts since the last clear(), so readers can
+    keep a cursor while the writer keeps going. Once full, the oldest frames
+    are overwritten.
+    """
+
+    def __init__(self, capacity: int, dtype=np.float32):
+        self.capacity = max(int(capacity), 1)
+        self.data = np.zeros(self.capacity, dtype=dtype)
+        self.write_pos = 0
+
+    def clear(self) -> None:
+        """Forget all frames (the storage is reused)."""
+        self.write_pos = 0
+
+    def __len__(self) -> int:
+        return min(self.write_pos, self.capacity)
+
+    @property
+    def oldest(self) -> int:
+        """Absolute position of the oldest frame still held."""
+        return self.write_pos - len(self)
+
+    def write(self, samples: np.ndarray) -> None:
+        """Copy samples into the buffer. Does not allocate."""
+        n = len(samples)
+        if n > self.capacity:
+            # Only the newest `capacity` frames survive
+            self.write_pos += n - self.capacity
+            samples = samples[n - self.capacity:]
+            n = self.capacity
+
+        start = self.write_pos % self.capacity
+        first = min(n, self.capacity - start)
+        self.data[start:start + first] = samples[:first]
+        if first < n:
+            self.data[:n - first] = samples[first:]
+        self.write_pos += n
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """
+        Return frames [start, end), clamped to what the buffer still holds.
+
+        The result is a zero-copy view unless the range wraps around the end of
+        the storage, in which case the two halves are joined into a new array.
+        """
+        start = max(start, self.oldest)
+        end = min(end, self.write_pos)
+        if end <= start:
+            return self.data[:0]
+
+        first = start % self.capacity
+        last = first + (end - start)
+        if last <= self.capacity:
+            return self.data[first:last]
+        return np.concatenate((self.data[first:], self.data[:last - self.capacity]))
+
+    def view(self) -> np.ndarray:
+        """Return everything held, oldest first."""
+        return self.read(self.oldest, self.write_pos)
+
+    def drain_into(self, other: "RingBuffer") -> None:
+        """Append everything held to another buffer and clear. Does not allocate."""
+        held = len(self)
+        first = self.oldest % self.capacity
+        split = min(held, self.capacity - first)
+        other.write(self.data[first:first + split])
+        if split < held:
+            other.write(self.data[:held - split])
+        self.clear()
+
+
+class PolyphaseResampler:
+    """
+    Streaming resampler from a device's capture rate to int16 at another rate.
+
+    Uses the anti-aliasing filter scipy.signal.resample_poly designs (a
+    Kaiser-windowed sinc) split into its polyphase components, so each
+    output sample is one short dot product over the input and the
+    zero-stuffed intermediate signal is never built. Blocks are converted as
+    they arrive: filter history carries over between calls, output is
+    aligned with the input like resample_poly's, and the scratch arrays only
+    grow, so steady-state calls from the audio callback do not allocate.
+    """
+
+    def __init__(self, in_rate: int, out_rate: int = SAMPLE_RATE, zero_crossings: int = 10,
+                 beta: float = 5.0):
+        """
+        Initialize resampler.
+
+        Args:
+            in_rate: Input sample rate (e.g. 48000 or 44100)
+            out_rate: Output sample rate
+            zero_crossings: Filter half-length in zero crossings of the sinc
+            beta: Kaiser window shape
+        """
+        gcd = math.gcd(in_rate, out_rate)
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.up = out_rate // gcd
+        self.down = in_rate // gcd
+        max_rate = max(self.up, self.down)
+
+        # Lowpass at the lower of the two Nyquist rates, unity gain after zero-stuffing
+        self.delay = zero_crossings * max_rate
+        n = np.arange(-self.delay, self.delay + 1)
+        h = np.sinc(n / max_rate) * np.kaiser(len(n), beta)
+        h *= self.up / h.sum()
+        self.taps = -(-len(h) // self.up)
+        padded = np.zeros(self.taps * self.up)
+        padded[:len(h)] = h
+        # phases[p, j] weights input T // up - j for output position T with T % up == p
+        self.phases = np.ascontiguousarray(padded.reshape(self.taps, self.up).T, dtype=np.float32)
+        self._offsets = np.arange(self.taps)
+
+        self._capacity = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Start a new signal (history is zeros)."""
+        self._consumed = 0  # Input samples seen
+        self._produced = 0  # Output samples emitted
+        if self._capacity:
+            self._x[:self.taps - 1] = 0
+
+    def _ensure_capacity(self, frames: int) -> None:
+        """Grow the scratch arrays to handle a block of this many input frames."""
+        if frames <= self._capacity:
+            return
+        history = self._x[:self.taps - 1].copy() if self._capacity else np.zeros(self.taps - 1, np.float32)
+        outputs = frames * self.up // self.down + 2
+        self._x = np.zeros(self.taps - 1 + frames, dtype=np.float32)
+        self._x[:self.taps - 1] = history
+        self._steps = np.arange(outputs, dtype=np.int64)
+        self._t = np.empty(outputs, dtype=np.int64)
+        self._newest = np.empty(outputs, dtype=np.int64)
+        self._phase = np.empty(outputs, dtype=np.int64)
+        self._index = np.empty((outputs, self.taps), dtype=np.int64)
+        self._windows = np.empty((outputs, self.taps), dtype=np.float32)
+        self._coeffs = np.empty((outputs, self.taps), dtype=np.float32)
+        self._y = np.empty(outputs, dtype=np.float32)
+        self._out = np.empty(outputs, dtype=np.int16)
+        self._capacity = frames
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """
+        Resample one block of mono samples (int16 or float32 in int16 scale).
+
+        Returns:
+            The int16 output that became available; a view into scratch
+            storage that the next call overwrites
+        """
+        frames = len(block)
+        self._ensure_capacity(frames)
+        keep = self.taps - 1
+        x = self._x[:keep + frames]
+        x[keep:] = block
+        base = self._consumed - keep  # Input position of x[0]
+        self._consumed += frames
+
+        # Output k is ready once its newest input, (k * down + delay) // up, has arrived
+        ready = (self._consumed * self.up - 1 - self.delay) // self.down + 1
+        count = max(ready - self._produced, 0)
+        out = self._out[:count]
+        if count:
+            t = self._t[:count]
+            np.multiply(self._steps[:count], self.down, out=t)
+            t += self._produced * self.down + self.delay
+            newest = self._newest[:count]
+            np.floor_divide(t, self.up, out=newest)
+            newest -= base
+            phase = self._phase[:count]
+            np.remainder(t, self.up, out=phase)
+
+            index = self._index[:count]
+            np.subtract(newest[:, None], self._offsets, out=index)
+            windows = self._windows[:count]
+            np.take(x, index, out=windows, mode="clip")  # "clip" writes to out without buffering
+            coeffs = self._coeffs[:count]
+            np.take(self.phases, phase, axis=0, out=coeffs, mode="clip")
+
+            y = self._y[:count]
+            np.einsum("ij,ij->i", windows, coeffs, out=y)
+            np.rint(y, out=y)
+            np.clip(y, -32768, 32767, out=y)
+            out[:] = y
+            self._produced += count
+
+        # Carry the newest inputs over as the next block's history
+        x[:keep] = x[frames:frames + keep]
+        return out
@@ -0,0 +1,149 @@
+"""Batch transcription of saved audio files."""
+
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, Iterable, List, Optional
+
+from .config import Config
+from .server import WhisperServer
+from .transcriber import Transcriber, TranscriptionResult
+
+logger = logging.getLogger(__name__)
+
+AUDIO_SUFFIXES = {".wav"}
+
+
+def collect_audio_files(paths: Iterable[Path]) -> List[Path]:
+    """Expand files and directories (recursively) into a sorted list of WAV files."""
+    files = []
+    for path in paths:
+        path = Path(path).expanduser()
+        if path.is_dir():
+            files.extend(p for p in sorted(path.rglob("*")) if p.suffix.lower() in AUDIO_SUFFIXES)
+        elif path.exists():
+            files.append(path)
+        else:
+            logger.warning(f"Skipping missing path: {path}")
+    return files
+
+
+def wav_duration(path: Path) -> Optional[float]:
+    """Duration of a WAV file from its header, or None if unreadable."""
+    try:
+        with wave.open(str(path), "rb") as wav:
+            return wav.getnframes() / wav.getframerate()
+    except (wave.Error, OSError, EOFError):
+        return None
+
+
+class BatchTranscriber:
+    """
+    Transcribes many files with a pool of workers.
+
+    Each worker loads the model once: either by owning a resident
+    whisper-server, or by passing a group of files to a single whisper-cli
+    invocation.
+    """
+
+    def __init__(self, config: Config, workers: int = 2, files_per_call: int = 8,
+                 use_server: Optional[bool] = None):
+        self.config = config
+        self.workers = max(workers, 1)
+        self.files_per_call = max(files_per_call, 1)
+        self.use_server = config.use_server if use_server is None else use_server
+        self._write_lock = threading.Lock()
+
+    def _start_servers(self) -> "queue.Queue[Optional[WhisperServer]]":
+        """
+        Start one resident server per worker, if available.
+
+        Returns a queue holding one entry per worker: a ready server, or None
+        for workers that use grouped whisper-cli calls.
+        """
+        servers: "queue.Queue[Optional[WhisperServer]]" = queue.Queue()
+        started = []
+        if self.use_server:
+            for _ in range(self.workers):
+                server = WhisperServer.from_config(self.config)
+                if server is None:
+                    break
+                started.append(server)
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                ready = list(pool.map(lambda srv: srv.start(), started))
+            if started and not all(ready):
+                logger.warning("whisper-server unavailable, using grouped whisper-cli calls")
+                for server in started:
+                    server.stop()
+                started = []
+        for server in started:
+            servers.put(server)
+        for _ in range(self.workers - len(started)):
+            servers.put(None)
+        return servers
+
+    def _run_group(self, group: List[Path], servers, output: IO[str]) -> List[TranscriptionResult]:
+        """Transcribe one group of files on whichever worker resource is free."""
+        server = servers.get()
+        try:
+            if server is not None:
+                transcriber = Transcriber(self.config, server=server)
+                results = [transcriber.transcribe(path) for path in group]
+            else:
+                results = Transcriber(self.config).transcribe_many(group)
+        finally:
+            servers.put(server)
+
+        for path, result in zip(group, results):
+            record = {
+                "file": str(path),
+                "text": result.text,
+                "success": result.success,
+                "error": result.error,
+                "audio_seconds": wav_duration(path),
+                "duration_seconds": round(result.duration_seconds, 3),
+                "model": result.model,
+                "backend": result.backend,
+                "batch_size": len(group) if server is None else 1,
+            }
+            with self._write_lock:
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+        return results
+
+    def run(self, files: List[Path], output: IO[str] = sys.stdout) -> dict:
+        """Transcribe all files, writing one JSON line per file. Returns a summary."""
+        start = time.time()
+        servers = self._start_servers()
+        resident = any(server is not None for server in list(servers.queue))
+        # With resident servers, one file per task keeps workers evenly loaded
+        group_size = 1 if resident else self.files_per_call
+        groups = [files[i:i + group_size] for i in range(0, len(files), group_size)]
+
+        results: List[TranscriptionResult] = []
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for group_results in pool.map(lambda g: self._run_group(g, servers, output), groups):
+                    results.extend(group_results)
+        finally:
+            while not servers.empty():
+                server = servers.get()
+                if server is not None:
+                    server.stop()
+
+        elapsed = time.time() - start
+        audio_seconds = sum(d for d in (wav_duration(f) for f in files) if d)
+        return {
+            "files": len(files),
+            "succeeded": sum(1 for r in results if r.success),
+            "failed": sum(1 for r in results if not r.success),
+            "audio_seconds": round(audio_seconds, 3),
+            "wall_seconds": round(elapsed, 3),
+            "x_realtime": round(audio_seconds / elapsed, 2) if elapsed else None,
+        }
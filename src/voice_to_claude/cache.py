@@ -0,0 +1,201 @@
+"""On-disk transcript cache keyed by audio content, model and decode options."""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+from .config import DEFAULT_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+STATS_FILE = "stats.json"
+
+# Seconds hit/miss counts are held in memory before being written out
+STATS_FLUSH_SECONDS = 5
+
+
+def model_identity(model_path: Path) -> str:
+    """Identify a model file by path, size and modification time."""
+    stat = model_path.stat()
+    return f"{model_path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def make_key(audio_data: bytes, model_path: Path, options: dict) -> str:
+    """Content address for a transcription request."""
+    digest = hashlib.sha256()
+    digest.update(model_identity(model_path).encode("utf-8"))
+    digest.update(json.dumps(options, sort_keys=True).encode("utf-8"))
+    digest.update(audio_data)
+    return digest.hexdigest()
+
+
+class TranscriptCache:
+    """
+    LRU store of transcripts, one small JSON file per entry.
+
+    Entries are touched on every hit, and the least recently used ones are
+    evicted once the directory grows past ``max_bytes``. The directory is
+    scanned once; after that an in-memory index and running size decide what
+    to evict. Hit and miss counts are kept in memory and flushed to
+    stats.json every few seconds so `daemon status` can report them.
+    """
+
+    def __init__(self, directory: Path = DEFAULT_CACHE_DIR, max_bytes: int = 50 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._index: Optional["OrderedDict[str, int]"] = None  # Entry file name -> size, oldest first
+        self._total = 0
+        self._pending: Dict[str, int] = {}
+        self._flush_timer: Optional[threading.Timer] = None
+        atexit.register(self.flush)
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _load_index(self) -> None:
+        """Scan the directory once, oldest entries first (caller holds lock)."""
+        if self._index is not None:
+            return
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(".json") and entry.name != STATS_FILE:
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, entry.name, stat.st_size))
+        except OSError:
+            pass
+        self._index = OrderedDict((name, size) for _, name, size in sorted(entries))
+        self._total = sum(self._index.values())
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached entry for key, or None."""
+        path = self._entry_path(key)
+        try:
+            data = path.read_bytes()
+            entry = json.loads(data)
+            os.utime(path)  # Mark as recently used, for the next process's scan
+        except (OSError, ValueError):
+            entry = None
+        with self._lock:
+            self._load_index()
+            if entry is None:
+                self._total -= self._index.pop(path.name, 0)
+                self._count("misses")
+                return None
+            if path.name in self._index:
+                self._index.move_to_end(path.name)
+            else:  # Written by another process
+                self._index[path.name] = len(data)
+                self._total += len(data)
+            self._count("hits")
+        return entry
+
+    def put(self, key: str, text: str, model: str) -> None:
+        """Store a transcript and evict old entries if over the size limit."""
+        data = json.dumps({"text": text, "model": model, "created": time.time()}).encode("utf-8")
+        with self._lock:
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                path = self._entry_path(key)
+                tmp_path = path.with_suffix(".tmp")
+                tmp_path.write_bytes(data)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning(f"Failed to write transcript cache: {e}")
+                return
+            self._load_index()
+            self._total += len(data) - self._index.pop(path.name, 0)
+            self._index[path.name] = len(data)
+            self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until under max_bytes (caller holds lock)."""
+        evicted = 0
+        while self._total > self.max_bytes and self._index:
+            name, size = self._index.popitem(last=False)
+            try:
+                os.unlink(self.directory / name)
+            except OSError:
+                pass
+            self._total -= size
+            evicted += 1
+        if evicted:
+            self._count("evictions", evicted)
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        """Increment a counter; flushed to stats.json shortly after (caller holds lock)."""
+        self._pending[name] = self._pending.get(name, 0) + amount
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(STATS_FLUSH_SECONDS, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self) -> None:
+        """Add the counts gathered since the last flush to stats.json."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                if self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+            if not pending:
+                return
+            stats = self._read_stats()
+            for name, amount in pending.items():
+                stats[name] = stats.get(name, 0) + amount
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.directory / (STATS_FILE + ".tmp")
+                tmp_path.write_text(json.dumps(stats))
+                os.replace(tmp_path, self.directory / STATS_FILE)
+            except OSError:
+                pass
+
+    def _read_stats(self) -> dict:
+        try:
+            return json.loads((self.directory / STATS_FILE).read_text())
+        except (OSError, ValueError):
+            return {"hits": 0, "misses": 0, "evictions": 0}
+
+    def stats(self) -> dict:
+        """Hit, miss and eviction counters, including those not yet flushed."""
+        stats = self._read_stats()
+        with self._lock:
+            for name, amount in self._pending.items():
+                stats[name] = stats.get(name, 0) + amount
+        return stats
+
+
+_shared: Dict[Path, TranscriptCache] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_cache(directory: Path = DEFAULT_CACHE_DIR, max_bytes: Optional[int] = None) -> TranscriptCache:
+    """
+    The process-wide cache for a directory.
+
+    Every Transcriber uses it, so they share one index, lock and set of
+    counters instead of racing on the same files.
+
+    Args:
+        directory: Cache directory
+        max_bytes: Size limit; updates the shared cache's limit when given
+    """
+    directory = Path(directory)
+    with _shared_lock:
+        cache = _shared.get(directory)
+        if cache is None:
+            cache = _shared[directory] = TranscriptCache(directory)
+    if max_bytes is not None:
+        cache.max_bytes = max_bytes
+    return cache
@@ -0,0 +1,259 @@
+"""Clipboard backends for pasting transcripts."""
+
+import json
+import logging
+import os
+import select
+import shutil
+import subprocess
+import sys
+import threading
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Accepted values of clipboard_backend (besides "auto")
+CLIPBOARD_BACKENDS = ("appkit", "tk", "pbcopy", "wl-clipboard", "xclip", "xsel")
+
+# Seconds between checks whether an orphaned Tk helper still owns the clipboard
+TK_HELPER_POLL_SECONDS = 1
+
+# Seconds to wait for the Tk helper to start, and to answer a request
+TK_HELPER_START_SECONDS = 5
+TK_HELPER_TIMEOUT_SECONDS = 2
+
+
+class AppKitClipboard:
+    """In-process macOS pasteboard access, no process spawned per copy."""
+
+    name = "appkit"
+
+    def __init__(self):
+        # pyobjc is installed alongside pynput on macOS
+        from AppKit import NSPasteboard, NSPasteboardTypeString
+        self.pasteboard = NSPasteboard.generalPasteboard()
+        self.string_type = NSPasteboardTypeString
+
+    def get(self) -> Optional[str]:
+        text = self.pasteboard.stringForType_(self.string_type)
+        return str(text) if text is not None else None
+
+    def set(self, text: str) -> bool:
+        self.pasteboard.clearContents()
+        return bool(self.pasteboard.setString_forType_(text, self.string_type))
+
+
+class TkClipboard:
+    """
+    X11 clipboard served by one long-lived helper process.
+
+    The helper owns the selection through Tk and answers one JSON request
+    per line, so a paste costs no process spawns. It exits when we close its
+    stdin, once another application has taken the clipboard over.
+    """
+
+    name = "tk"
+
+    def __init__(self):
+        if sys.platform == "darwin" or not os.environ.get("DISPLAY"):
+            raise RuntimeError("tk needs an X display")
+        self._lock = threading.Lock()
+        self._process: Optional[subprocess.Popen] = None
+        if not self._start():
+            raise RuntimeError("tk clipboard helper failed to start")
+
+    def _helper_command(self) -> List[str]:
+        return [sys.executable, os.path.abspath(__file__), "--tk-helper"]
+
+    def _start(self) -> bool:
+        """Start the helper and wait for it to report ready (caller holds lock or is __init__)."""
+        try:
+            self._process = subprocess.Popen(
+                self._helper_command(),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError:
+            return False
+        return self._read(TK_HELPER_START_SECONDS) is not None
+
+    def _read(self, timeout: float) -> Optional[dict]:
+        """Read one reply; a helper that does not answer in time is killed."""
+        try:
+            ready, _, _ = select.select([self._process.stdout], [], [], timeout)
+            if not ready:
+                logger.warning("Tk clipboard helper did not answer in %ss, restarting it", timeout)
+                self._kill()
+                return None
+            line = self._process.stdout.readline()
+            return json.loads(line) if line else None
+        except (OSError, ValueError):
+            return None
+
+    def _kill(self) -> None:
+        """Kill the helper; the next request starts a fresh one."""
+        self._process.kill()
+        self._process.wait()
+
+    def _request(self, request: dict) -> Optional[dict]:
+        """Send a request, restarting the helper if it died or hung."""
+        with self._lock:
+            if self._process.stdin.closed:
+                return None
+            if self._process.poll() is not None and not self._start():
+                return None
+            try:
+                self._process.stdin.write(json.dumps(request).encode("utf-8") + b"\n")
+                self._process.stdin.flush()
+            except OSError:
+                return None
+            return self._read(TK_HELPER_TIMEOUT_SECONDS)
+
+    def get(self) -> Optional[str]:
+        response = self._request({"op": "get"})
+        return response.get("text") if response else None
+
+    def set(self, text: str) -> bool:
+        response = self._request({"op": "set", "text": text})
+        return bool(response and response.get("ok"))
+
+    def close(self) -> None:
+        """Let the helper exit (it keeps serving our text until it loses the clipboard)."""
+        with self._lock:
+            if self._process and self._process.stdin:
+                self._process.stdin.close()
+
+
+def _serve_tk() -> None:
+    """Clipboard helper process main loop (see TkClipboard)."""
+    import tkinter
+
+    root = tkinter.Tk()
+    root.withdraw()
+
+    def reply(response: dict) -> None:
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+
+    def exit_when_not_owner() -> None:
+        try:
+            owner = root.selection_own_get(selection="CLIPBOARD")
+        except tkinter.TclError:
+            owner = None
+        if owner:
+            root.after(TK_HELPER_POLL_SECONDS * 1000, exit_when_not_owner)
+        else:
+            root.destroy()
+
+    def handle(*_) -> None:
+        line = sys.stdin.readline()
+        if not line:
+            root.deletefilehandler(sys.stdin)
+            exit_when_not_owner()
+            return
+        request = json.loads(line)
+        if request["op"] == "get":
+            try:
+                text = root.clipboard_get(type="UTF8_STRING")
+            except tkinter.TclError:
+                try:
+                    text = root.clipboard_get()
+                except tkinter.TclError:
+                    text = None
+            reply({"text": text})
+        else:
+            root.clipboard_clear()
+            root.clipboard_append(request["text"])
+            root.update()
+            reply({"ok": True})
+
+    root.createfilehandler(sys.stdin, tkinter.READABLE, handle)
+    reply({"ok": True})
+    root.mainloop()
+
+
+class CommandClipboard:
+    """
+    Clipboard through command-line tools.
+
+    On Linux, wl-copy, xclip and xsel fork a background process that keeps
+    serving the selection, so copying only costs one short-lived spawn.
+    """
+
+    # (copy argv, paste argv)
+    COMMANDS = {
+        "pbcopy": (["pbcopy"], ["pbpaste"]),
+        "wl-clipboard": (["wl-copy"], ["wl-paste", "--no-newline"]),
+        "xclip": (["xclip", "-selection", "clipboard"], ["xclip", "-selection", "clipboard", "-o"]),
+        "xsel": (["xsel", "--clipboard", "--input"], ["xsel", "--clipboard", "--output"]),
+    }
+
+    def __init__(self, name: str):
+        if name not in self.COMMANDS or not shutil.which(self.COMMANDS[name][0][0]):
+            raise RuntimeError(f"{name} not available")
+        self.name = name
+        self.copy_args, self.paste_args = self.COMMANDS[name]
+        self.env = {**os.environ, "LANG": "en_US.UTF-8"}
+
+    def get(self) -> Optional[str]:
+        try:
+            result = subprocess.run(self.paste_args, capture_output=True, timeout=2, env=self.env)
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        if result.returncode != 0:
+            return None
+        return result.stdout.decode("utf-8", errors="replace")
+
+    def set(self, text: str) -> bool:
+        try:
+            # The background helper inherits our stdout/stderr; capturing them would block
+            result = subprocess.run(
+                self.copy_args,
+                input=text.encode("utf-8"),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=2,
+                env=self.env,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+        return result.returncode == 0
+
+
+def _backend_candidates() -> List[str]:
+    """Clipboard backends worth trying on this platform, best first."""
+    if sys.platform == "darwin":
+        return ["appkit", "pbcopy"]
+    if os.environ.get("WAYLAND_DISPLAY"):
+        return ["wl-clipboard", "tk", "xclip", "xsel"]
+    return ["tk", "xclip", "xsel", "wl-clipboard"]
+
+
+def create_clipboard(backend: str = "auto"):
+    """
+    Create a clipboard backend.
+
+    Args:
+        backend: One of CLIPBOARD_BACKENDS, or "auto" for the best available
+
+    Returns:
+        An object with a name and get()/set(text) methods, or None if no
+        clipboard is available
+    """
+    names = _backend_candidates() if backend == "auto" else [backend]
+    for name in names:
+        try:
+            if name == "appkit":
+                return AppKitClipboard()
+            if name == "tk":
+                return TkClipboard()
+            return CommandClipboard(name)
+        except (ImportError, RuntimeError):
+            continue
+    logger.warning(f"No clipboard backend available (tried {', '.join(names)})")
+    return None
+
+
+if __name__ == "__main__" and sys.argv[1:] == ["--tk-helper"]:
+    _serve_tk()
@@ -2,46 +2,119 @@
 
 import json
 from pathlib import Path
-from dataclasses import dataclass, asdict
-from typing import Optional
+from dataclasses import dataclass, asdict, field
+from typing import List, Optional
 
 # Default paths
 DEFAULT_CONFIG_DIR = Path.home() / ".config" / "voice-to-claude"
 DEFAULT_CONFIG_FILE = DEFAULT_CONFIG_DIR / "config.json"
 DEFAULT_PID_FILE = DEFAULT_CONFIG_DIR / "daemon.pid"
 DEFAULT_LOG_FILE = DEFAULT_CONFIG_DIR / "daemon.log"
+DEFAULT_SERVER_LOG_FILE = DEFAULT_CONFIG_DIR / "whisper-server.log"
+DEFAULT_STATE_FILE = DEFAULT_CONFIG_DIR / "daemon.state.json"
+DEFAULT_CONTROL_SOCKET = DEFAULT_CONFIG_DIR / "daemon.sock"
+DEFAULT_METRICS_FILE = DEFAULT_CONFIG_DIR / "metrics.jsonl"
+DEFAULT_CACHE_DIR = DEFAULT_CONFIG_DIR / "cache"
+DEFAULT_MODEL_STATS_FILE = DEFAULT_CONFIG_DIR / "model_stats.json"
 
-# Whisper model definitions
-WHISPER_MODELS = {
+# Whisper model definitions, smallest to largest.
+# relative_cost is the approximate decode cost compared to "tiny".
+# "sha1" pins the digest whisper.cpp lists in its models/README.md; every
+# entry with a url has one. Downloads are also checked against the SHA-256
+# Hugging Face publishes for the file.
+_FULL_PRECISION_MODELS = {
     "tiny": {
         "file": "ggml-tiny.bin",
         "size": "~75MB",
+        "size_mb": 75,
         "speed": "Fastest (~0.5s)",
-        "url": "https://huggingface.co/ggerganov/whisper.cpp/resolve/main/ggml-tiny.bin"
+        "relative_cost": 1,
+        "url": "https://huggingface.co/ggerganov/whisper.cpp/resolve/main/ggml-tiny.bin",
+        "sha1": "bd577a113a864445d4c299885e0cb97d4ba92b5f",
     },
     "base": {
         "file": "ggml-base.bin",
         "size": "~142MB",
+        "size_mb": 142,
         "speed": "Fast (~1s)",
-        "url": "https://huggingface.co/ggerganov/whisper.cpp/resolve/main/ggml-base.bin"
+        "relative_cost": 2,
+        "url": "https://huggingface.co/ggerganov/whisper.cpp/resolve/main/ggml-base.bin",
+        "sha1": "465707469ff3a37a2b9b8d8f89f2f99de7299dac",
     },
     "medium": {
         "file": "ggml-medium.bin",
         "size": "~1.5GB",
+        "size_mb": 1500,
         "speed": "Medium (~2s)",
-        "url": "https://huggingface.co/ggerganov/whisper.cpp/resolve/main/ggml-medium.bin"
+        "relative_cost": 8,
+        "url": "https://huggingface.co/ggerganov/whisper.cpp/resolve/main/ggml-medium.bin",
+        "sha1": "fd9727b6e1217c2f614f9b698455c4ffd82463b4",
     },
     "large-v3": {
         "file": "ggml-large-v3.bin",
         "size": "~3GB",
+        "size_mb": 3100,
         "speed": "Slow (~3s)",
-        "url": "https://huggingface.co/ggerganov/whisper.cpp/resolve/main/ggml-large-v3.bin"
+        "relative_cost": 16,
+        "url": "https://huggingface.co/ggerganov/whisper.cpp/resolve/main/ggml-large-v3.bin",
+        "sha1": "ad82bf6a9043ceed055076d0fd39f5f186ff8062",
     }
 }
 
+# ggml quantization types: (size, decode cost) relative to the full-precision
+# model. Decoding on a CPU is memory-bound, so smaller weights decode faster;
+# on a GPU the difference is small. Measured speeds replace these estimates.
+QUANTIZATIONS = {
+    "q5_0": (0.36, 0.6),
+    "q5_1": (0.39, 0.6),
+    "q8_0": (0.55, 0.75),
+}
+
+# Quantized variants downloaded from Hugging Face, with their SHA-1 from
+# whisper.cpp's models/README.md. Upstream lists no digest for its other
+# published variants, so those are created locally with whisper.cpp's quantize
+# tool from a verified full-precision model, like the unpublished ones.
+_PUBLISHED_VARIANTS = {
+    "large-v3-q5_0": "e6e2ed78495d403bef4b7cff42ef4aaadcfea8de",
+}
+
+
+def _with_quantized_variants(models: dict) -> dict:
+    """Add "<model>-<quantization>" entries, each model's variants just before it."""
+    registry = {}
+    for name, info in models.items():
+        for quantization, (size_ratio, cost_ratio) in QUANTIZATIONS.items():
+            variant = f"{name}-{quantization}"
+            size_mb = info["size_mb"] * size_ratio
+            registry[variant] = {
+                "file": f"ggml-{variant}.bin",
+                "size": f"~{size_mb / 1000:.1f}GB" if size_mb >= 1000 else f"~{size_mb:.0f}MB",
+                "size_mb": round(size_mb),
+                "speed": f"{info['speed'].split(' (')[0]}, quantized ({quantization})",
+                "relative_cost": info["relative_cost"] * cost_ratio,
+                "url": (
+                    f"https://huggingface.co/ggerganov/whisper.cpp/resolve/main/ggml-{variant}.bin"
+                    if variant in _PUBLISHED_VARIANTS else None
+                ),
+                "base_model": name,
+                "quantization": quantization,
+            }
+            if variant in _PUBLISHED_VARIANTS:
+                registry[variant]["sha1"] = _PUBLISHED_VARIANTS[variant]
+        registry[name] = info
+    return registry
+
+
+# All models, least to most accurate (each quantized variant ranks just below
+# its full-precision model)
+WHISPER_MODELS = _with_quantized_variants(_FULL_PRECISION_MODELS)
+
 # Audio settings
 SAMPLE_RATE = 16000  # Whisper expects 16kHz
 
+# Encoder frames per second of audio (a full 30 s window is 1500 frames)
+AUDIO_CTX_PER_SECOND = 50
+
 
 @dataclass
 class Config:
@@ -55,17 +128,75 @@ class Config:
 
     # Model settings
     model: str = "base"
+    model_selection: str = "static"  # "static" or "adaptive" (pick a model per utterance)
+    adaptive_models: List[str] = field(default_factory=lambda: ["tiny", "base", "medium"])
+    latency_budget_seconds: float = 1.0  # Allowed transcription time for a short command
+    latency_budget_per_audio_second: float = 0.1  # Extra time allowed per second of speech
+    speculative_draft: bool = False  # Inject a fast draft, then correct it with the main model
+    draft_model: str = "tiny"
+    draft_min_seconds: float = 3.0  # Only draft dictations at least this long
+    model_warmup: str = "touch"  # At startup: "touch" (read into page cache), "decode" (also a dummy decode), "none"
+    lock_model_in_memory: bool = False  # mlock the model file so it is never evicted (needs memlock limit)
+    model_mirror: str = ""  # Directory, file:// or http(s) URL to pull models from instead of Hugging Face
+
+    # Backend settings
+    use_server: bool = True  # Keep the model resident in whisper-server
+    max_resident_models: int = 2  # whisper-servers kept loaded at once
+    in_memory_audio: bool = True  # Pass PCM directly instead of a temp WAV file
+    cache_enabled: bool = True  # Reuse transcripts of identical clips
+    cache_max_mb: int = 50
+
+    # Decoding settings passed to whisper.cpp (0 = whisper.cpp's default); see `exec.py tune`
+    threads: int = 0  # -t
+    processors: int = 1  # -p, splits the audio across this many decoders
+    beam_size: int = 0  # -bs (1 = greedy)
+    best_of: int = 0  # -bo
+    audio_ctx: int = 0  # -ac, encoder frames; whisper-cli only, skipped for clips that do not fit
+    tuning_max_wer: float = 0.05  # Word error rate `tune` may trade for speed
+
+    # Voice-activity detection (trim silence before transcription)
+    vad_enabled: bool = True
+    vad_threshold_db: float = -45.0
+    vad_max_pause_seconds: float = 1.0
+    vad_padding_seconds: float = 0.2
+    vad_min_speech_seconds: float = 0.2
+
+    # Record per-stage latency of each dictation to metrics.jsonl
+    metrics_enabled: bool = True
+
+    # Job queue settings
+    job_queue_depth: int = 3  # Recordings allowed to wait for transcription
+    job_queue_policy: str = "merge"  # "merge", "drop_oldest" or "drop_newest" when full
+    cancel_stale_after_seconds: float = 20.0  # New recording cancels older jobs (0 = never)
+
+    # Streaming settings (decode while the hotkey is still held)
+    streaming: bool = False
+    stream_window_seconds: float = 8.0
+    stream_overlap_seconds: float = 1.0
 
     # Output settings
-    output_mode: str = "keyboard"  # "keyboard" or "clipboard"
+    output_mode: str = "keyboard"  # "keyboard", "clipboard", "auto" (paste long texts) or "copy"
+    typing_backend: str = "auto"  # "auto", "quartz", "xdotool", "wtype", "ydotool" or "pynput"
+    paste_threshold_chars: int = 300  # "auto" mode pastes texts longer than this
+    clipboard_backend: str = "auto"  # "auto", "appkit", "tk", "pbcopy", "wl-clipboard", "xclip" or "xsel"
+    paste_shortcut: str = "auto"  # e.g. "cmd+v"; "auto" = Cmd+V on macOS, Ctrl+Shift+V elsewhere
+    restore_clipboard: bool = True  # Put the previous clipboard text back after pasting
 
     # Audio settings
     sound_effects: bool = True
+    sound_backend: str = "auto"  # "auto" (sounddevice output stream) or "none"
+    sound_idle_timeout_seconds: int = 30  # Close the cue output stream after this idle time
     max_recording_seconds: int = 60
+    prewarm_microphone: bool = False  # Keep the input stream open between recordings
+    preroll_ms: int = 300  # Audio kept from just before the hotkey press
+    mic_idle_timeout_seconds: int = 300  # Close a pre-warmed stream after this idle time
+    capture_rate: int = 0  # Microphone rate (0 = device's native rate); resampled to 16kHz while recording
 
     # Paths (set during setup)
     whisper_cpp_path: Optional[str] = None
+    whisper_server_path: Optional[str] = None
     models_dir: Optional[str] = None
+    build_profile: str = ""  # whisper.cpp build profile chosen by setup (see setup.BUILD_PROFILES)
 
     # Setup status
     setup_complete: bool = False
@@ -88,11 +219,34 @@ class Config:
         with open(DEFAULT_CONFIG_FILE, "w") as f:
             json.dump(asdict(self), f, indent=2)
 
-    def get_model_path(self) -> Optional[Path]:
-        """Get path to current model file."""
-        if not self.models_dir or self.model not in WHISPER_MODELS:
+    def get_model_path(self, model: Optional[str] = None) -> Optional[Path]:
+        """Get path to a model file (the current model by default)."""
+        model = model or self.model
+        if not self.models_dir or model not in WHISPER_MODELS:
             return None
-        return Path(self.models_dir) / WHISPER_MODELS[self.model]["file"]
+        return Path(self.models_dir) / WHISPER_MODELS[model]["file"]
+
+    def get_decode_args(self, audio_seconds: Optional[float] = None) -> List[str]:
+        """
+        whisper.cpp flags for the decoding settings.
+
+        Args:
+            audio_seconds: Clip length. audio_ctx is only passed when the clip is
+                known to fit in it, since whisper ignores audio beyond it.
+        """
+        args = []
+        if self.threads > 0:
+            args += ["-t", str(self.threads)]
+        if self.processors > 1:
+            args += ["-p", str(self.processors)]
+        if self.beam_size > 0:
+            args += ["-bs", str(self.beam_size)]
+        if self.best_of > 0:
+            args += ["-bo", str(self.best_of)]
+        fits = audio_seconds is not None and audio_seconds * AUDIO_CTX_PER_SECOND <= self.audio_ctx
+        if self.audio_ctx > 0 and fits:
+            args += ["-ac", str(self.audio_ctx)]
+        return args
 
     def get_whisper_cli(self) -> Optional[Path]:
         """Get path to whisper-cli executable."""
@@ -100,6 +254,15 @@ class Config:
             return None
         return Path(self.whisper_cpp_path)
 
+    def get_whisper_server(self) -> Optional[Path]:
+        """Get path to whisper-server executable (built next to whisper-cli)."""
+        if self.whisper_server_path:
+            return Path(self.whisper_server_path)
+        whisper_cli = self.get_whisper_cli()
+        if not whisper_cli:
+            return None
+        return whisper_cli.parent / "whisper-server"
+
     def get_hotkey_description(self) -> str:
         """Get human-readable hotkey description."""
         keys = []
@@ -0,0 +1,158 @@
+"""Unix-domain control socket between the daemon and the CLI.
+
+One JSON request per connection, answered with one JSON response. Only
+uses the standard library so the CLI can talk to the daemon without
+importing the audio stack.
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from .config import DEFAULT_CONTROL_SOCKET, ensure_config_dir
+
+logger = logging.getLogger(__name__)
+
+# Largest request or response accepted
+MAX_MESSAGE_BYTES = 1024 * 1024
+
+
+class ControlError(Exception):
+    """Raised when the daemon cannot be reached or rejects a command."""
+    pass
+
+
+def _read_message(conn: socket.socket) -> dict:
+    """Read one newline-terminated JSON message."""
+    data = b""
+    while not data.endswith(b"\n"):
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        data += chunk
+        if len(data) > MAX_MESSAGE_BYTES:
+            raise ValueError("Message too large")
+    return json.loads(data)
+
+
+def send_command(command: str, path: Path = DEFAULT_CONTROL_SOCKET, timeout: float = 5.0,
+                 **args) -> dict:
+    """
+    Send a command to the running daemon.
+
+    Args:
+        command: Command name (see VoiceDaemon's control handlers)
+        path: Control socket path
+        timeout: Seconds to wait for the reply
+        **args: Command arguments
+
+    Returns:
+        The reply payload
+
+    Raises:
+        ControlError: If the daemon is not reachable or the command failed
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(timeout)
+            conn.connect(str(path))
+            conn.sendall(json.dumps({"command": command, **args}).encode("utf-8") + b"\n")
+            reply = _read_message(conn)
+    except (OSError, ValueError) as e:
+        raise ControlError(f"Daemon not reachable: {e}")
+
+    if not reply.get("ok"):
+        raise ControlError(reply.get("error", "Command failed"))
+    return reply.get("result", {})
+
+
+class ControlServer:
+    """Serves control commands on a Unix-domain socket from a background thread."""
+
+    def __init__(self, handlers: Dict[str, Callable[..., dict]], path: Path = DEFAULT_CONTROL_SOCKET):
+        """
+        Initialize control server.
+
+        Args:
+            handlers: Command name -> function taking the request's arguments
+                as keyword arguments and returning a JSON-serializable dict
+            path: Socket path (only the current user may connect)
+        """
+        self.handlers = handlers
+        self.path = Path(path)
+        self.sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def start(self) -> None:
+        """Bind the socket and start serving."""
+        ensure_config_dir()
+        self.path.unlink(missing_ok=True)  # Left over from a crashed daemon
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            sock.bind(str(self.path))
+        finally:
+            os.umask(old_umask)
+        sock.listen(8)
+        self.sock = sock
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self) -> None:
+        """Accept loop; blocks in accept() until stop() wakes it."""
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            if self._stopping:
+                conn.close()
+                return
+            with conn:
+                conn.settimeout(5.0)
+                try:
+                    reply = self._handle(_read_message(conn))
+                except (OSError, ValueError) as e:
+                    reply = {"ok": False, "error": f"Bad request: {e}"}
+                try:
+                    conn.sendall(json.dumps(reply).encode("utf-8") + b"\n")
+                except OSError:
+                    pass
+
+    def _handle(self, request: dict) -> dict:
+        """Dispatch one request to its handler."""
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "Bad request: expected a JSON object"}
+        args = dict(request)
+        command = args.pop("command", None)
+        handler = self.handlers.get(command)
+        if handler is None:
+            return {"ok": False, "error": f"Unknown command: {command}"}
+        try:
+            return {"ok": True, "result": handler(**args)}
+        except Exception as e:
+            logger.warning(f"Control command {command} failed: {e}")
+            return {"ok": False, "error": str(e)}
+
+    def stop(self) -> None:
+        """Close the socket and remove it."""
+        if self.sock is None:
+            return
+        # Closing does not wake accept() everywhere; a dummy connection does
+        self._stopping = True
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as wake:
+                wake.connect(str(self.path))
+        except OSError:
+            pass
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        self.sock.close()
+        self.sock = None
+        self.path.unlink(missing_ok=True)
@@ -1,21 +1,35 @@
 """Background daemon for voice dictation hotkey listening."""
 
 import os
+import queue
 import sys
 import signal
 import threading
 import time
 import logging
-import subprocess
+from dataclasses import fields, replace
 from pathlib import Path
-from typing import Set, Optional
+from typing import Dict, Set, Optional
 
+import numpy as np
 from pynput import keyboard
 
-from .config import Config, DEFAULT_PID_FILE, DEFAULT_LOG_FILE, ensure_config_dir, get_plugin_root
+from .config import Config, WHISPER_MODELS, SAMPLE_RATE
+from .control import ControlServer
+from .jobs import JobQueue, TranscriptionJob
+from .lifecycle import (
+    METRICS_WINDOW, daemon_status, metrics_snapshot, notify_ready, remove_state_file,
+    start_daemon, stop_daemon, write_state_file
+)
+from .metrics import MetricsLog, UtteranceTrace
 from .recorder import AudioRecorder, MicrophoneError
-from .transcriber import Transcriber
+from .transcriber import Transcriber, TranscriptionResult
+from .selector import ModelSelector
+from .server import ServerPool
+from .streaming import StreamingSession
+from .vad import VoiceActivityDetector
 from .keyboard import TextInjector
+from .warmup import ModelWarmer
 from . import sounds
 
 # Set up logging
@@ -25,6 +39,38 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Key events seen this long after injecting a draft are our own keystrokes
+DRAFT_ECHO_SECONDS = 0.3
+
+# Config fields grouped by the component rebuilt when one of them changes
+HOTKEY_FIELDS = {"hotkey_ctrl", "hotkey_alt", "hotkey_shift", "hotkey_cmd"}
+BACKEND_FIELDS = {
+    "model", "use_server", "max_resident_models", "cache_enabled", "cache_max_mb",
+    "whisper_cpp_path", "whisper_server_path", "models_dir",
+    "threads", "processors", "beam_size", "best_of", "audio_ctx",
+}
+SERVER_FIELDS = {
+    "use_server", "whisper_cpp_path", "whisper_server_path", "models_dir",
+    "threads", "processors", "beam_size", "best_of",
+}
+SELECTOR_FIELDS = {"adaptive_models", "latency_budget_seconds", "latency_budget_per_audio_second"}
+INJECTOR_FIELDS = {
+    "output_mode", "typing_backend", "paste_threshold_chars", "clipboard_backend",
+    "paste_shortcut", "restore_clipboard",
+}
+VAD_FIELDS = {
+    "vad_enabled", "vad_threshold_db", "vad_max_pause_seconds", "vad_padding_seconds",
+    "vad_min_speech_seconds",
+}
+RECORDER_FIELDS = {
+    "max_recording_seconds", "prewarm_microphone", "preroll_ms", "mic_idle_timeout_seconds", "capture_rate",
+}
+SOUND_FIELDS = {"sound_effects", "sound_backend", "sound_idle_timeout_seconds"}
+WARMUP_FIELDS = {"model", "models_dir", "model_warmup", "lock_model_in_memory"}
+
+# Silence used for the dummy decode of model_warmup="decode"
+WARMUP_DECODE_SECONDS = 0.5
+
 
 class VoiceDaemon:
     """Background daemon that listens for hotkeys and handles voice transcription."""
@@ -34,19 +80,83 @@ class VoiceDaemon:
         self.quiet = quiet
 
         # Components
-        self.recorder = AudioRecorder(max_seconds=config.max_recording_seconds)
-        self.transcriber = Transcriber(config)
-        self.injector = TextInjector(mode=config.output_mode)
+        self.recorder = self._make_recorder()
+        self.servers = ServerPool(config, config.max_resident_models) if config.use_server else None
+        self.server = self.servers.get(start=False) if self.servers else None
+        self.transcriber = Transcriber(config, server=self.server)
+        self.transcribers: Dict[str, Transcriber] = {config.model: self.transcriber}
+        self.selector = self._make_selector()
+        self.injector = self._make_injector()
+        self.vad = VoiceActivityDetector.from_config(config) if config.vad_enabled else None
+        self.jobs = JobQueue(
+            self._process_job,
+            max_depth=config.job_queue_depth,
+            policy=config.job_queue_policy,
+            on_change=self._write_state,
+        )
+        self.metrics = MetricsLog() if config.metrics_enabled else None
+        self.cues = sounds.NullCuePlayer()  # Replaced by a real player in start()
+        self.cue_queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self.cue_thread = threading.Thread(target=self._cue_worker, daemon=True)
+        self.control = ControlServer({
+            "status": self._control_status,
+            "metrics": self._control_metrics,
+            "reload": self._control_reload,
+            "model": self._control_model,
+            "record": self._control_record,
+        })
+        self.started_at = time.time()
+        self.warmer: Optional[ModelWarmer] = None
+        self.session_model: Optional[str] = None  # Set by the "model" control command, never saved
+
+        # The hotkey, control-socket and queue worker threads all touch the
+        # components. lock guards swapping them and the recording state;
+        # inject_lock keeps the injector from being replaced mid-injection
+        # (the hotkey path never takes it).
+        self.lock = threading.RLock()
+        self.inject_lock = threading.Lock()
+        self.time_to_ready: Optional[float] = None
 
         # State
         self.is_recording = False
+        self.stream_session: Optional[StreamingSession] = None
+        self.trace: Optional[UtteranceTrace] = None
+        self.last_keypress = 0.0
+        self.recorder_stale = False
         self.pressed_keys: Set[keyboard.Key] = set()
         self.keyboard_listener: Optional[keyboard.Listener] = None
         self.running = False
+        self.shutdown_event = threading.Event()
 
         # Build required keys set based on config
         self.required_keys = self._build_required_keys()
 
+    def _make_recorder(self) -> AudioRecorder:
+        return AudioRecorder(
+            max_seconds=self.config.max_recording_seconds,
+            keep_stream_open=self.config.prewarm_microphone,
+            preroll_seconds=self.config.preroll_ms / 1000,
+            idle_timeout=self.config.mic_idle_timeout_seconds,
+            capture_rate=self.config.capture_rate,
+        )
+
+    def _make_selector(self) -> ModelSelector:
+        return ModelSelector(
+            self.config.adaptive_models,
+            budget_seconds=self.config.latency_budget_seconds,
+            budget_per_audio_second=self.config.latency_budget_per_audio_second,
+        )
+
+    def _make_injector(self) -> TextInjector:
+        return TextInjector(
+            mode=self.config.output_mode,
+            typing_backend=self.config.typing_backend,
+            paste_threshold=self.config.paste_threshold_chars,
+            clipboard_backend=self.config.clipboard_backend,
+            paste_shortcut=self.config.paste_shortcut,
+            restore_clipboard=self.config.restore_clipboard,
+        )
+
     def _build_required_keys(self) -> Set[keyboard.Key]:
         """Build set of required modifier keys from config."""
         keys = set()
@@ -60,6 +170,20 @@ class VoiceDaemon:
             keys.add(keyboard.Key.cmd_l)
         return keys
 
+    def _play_cue(self, name: str) -> None:
+        """Queue an audio cue; the hotkey thread never waits on the output device."""
+        self.cue_queue.put(name)
+
+    def _cue_worker(self) -> None:
+        """Play queued cues and keep them out of the microphone input (runs on the cue thread)."""
+        while True:
+            name = self.cue_queue.get()
+            if name is None:
+                return
+            done_at = self.cues.play(name)
+            if done_at:
+                self.recorder.mute_until(done_at)
+
     def _log(self, message: str) -> None:
         """Log message unless in quiet mode."""
         if not self.quiet:
@@ -67,6 +191,7 @@ class VoiceDaemon:
 
     def _on_press(self, key: keyboard.Key) -> None:
         """Handle key press."""
+        self.last_keypress = time.monotonic()
         if key in self.required_keys:
             self.pressed_keys.add(key)
 
@@ -85,85 +210,289 @@ class VoiceDaemon:
 
     def _start_recording(self) -> None:
         """Start recording audio."""
-        self.is_recording = True
-        self._log("Recording started...")
-
-        if self.config.sound_effects:
-            threading.Thread(target=sounds.play_start_sound, daemon=True).start()
-
-        try:
-            self.recorder.start()
-        except MicrophoneError as e:
-            self._log(f"Microphone error: {e}")
-            if self.config.sound_effects:
-                threading.Thread(target=sounds.play_error_sound, daemon=True).start()
-            self.is_recording = False
+        with self.lock:
+            if self.is_recording:
+                return
+            if self.recorder_stale:
+                self._replace_recorder()
+            self.is_recording = True
+            self.trace = UtteranceTrace()
+            self.trace.mark("press")
+            self._log("Recording started...")
+
+            # A job that has been waiting this long is no longer what the user wants
+            self.jobs.cancel_stale(self.config.cancel_stale_after_seconds)
+
+            try:
+                with self.trace.span("key_to_stream_open"):
+                    self.recorder.start()
+                # After the microphone: reopening an idle-closed output device must not delay it
+                self._play_cue("start")
+                if self.config.streaming:
+                    self.stream_session = StreamingSession(
+                        self.recorder,
+                        self.transcriber,
+                        window_seconds=self.config.stream_window_seconds,
+                        overlap_seconds=self.config.stream_overlap_seconds,
+                        vad=self.vad,
+                    ).start()
+            except MicrophoneError as e:
+                self._log(f"Microphone error: {e}")
+                self._play_cue("error")
+                self.is_recording = False
 
     def _stop_recording(self) -> None:
         """Stop recording and process audio."""
-        if not self.is_recording:
-            return
-
-        self.is_recording = False
-        self._log("Recording stopped, processing...")
-
-        if self.config.sound_effects:
-            threading.Thread(target=sounds.play_stop_sound, daemon=True).start()
-
-        # Stop recording and get audio
-        audio = self.recorder.stop()
-
-        # Process in background thread
-        threading.Thread(
-            target=self._process_audio,
-            args=(audio,),
-            daemon=True
-        ).start()
+        with self.lock:
+            if not self.is_recording:
+                return
 
-    def _process_audio(self, audio) -> None:
+            self.is_recording = False
+            self._log("Recording stopped, processing...")
+
+            self._play_cue("stop")
+
+            trace, self.trace = self.trace, None
+            trace.since("press", "capture")
+            trace.mark("release")
+
+            # Stop recording and get audio
+            with trace.span("stop_to_buffer"):
+                audio = self.recorder.stop()
+            session, self.stream_session = self.stream_session, None
+            sample_rate = self.recorder.sample_rate
+
+        # Transcribe on the queue's worker thread, in recording order
+        job = TranscriptionJob(audio=audio, sample_rate=sample_rate, session=session, trace=trace)
+        if not self.jobs.submit(job):
+            self._log("Transcription queue full, recording dropped")
+
+    def _transcriber_for(self, audio_seconds: float) -> Transcriber:
+        """Pick the transcriber for a clip, choosing its model in adaptive mode."""
+        if self.config.model_selection != "adaptive" or not self.config.models_dir:
+            return self.transcriber
+
+        available = Transcriber.get_available_models(Path(self.config.models_dir))
+        resident = self.servers.ready_models() if self.servers else []
+        model = self.selector.choose(audio_seconds, available, resident) or self.config.model
+        return self._transcriber_for_model(model)
+
+    def _transcriber_for_model(self, model: str) -> Transcriber:
+        """Transcriber for a specific model, sharing the resident server pool."""
+        with self.lock:
+            transcriber = self.transcribers.get(model)
+            if transcriber is None:
+                transcriber = self.transcribers[model] = Transcriber(replace(self.config, model=model))
+            if self.servers:
+                # Marks the server recently used, or loads it again if it was evicted
+                transcriber.server = self.servers.get(model)
+            return transcriber
+
+    def _draft_transcriber(self, final: Transcriber, audio_seconds: float) -> Optional[Transcriber]:
+        """Transcriber for a speculative draft of a long dictation, if enabled."""
+        if not self.config.speculative_draft or audio_seconds < self.config.draft_min_seconds:
+            return None
+        if self.injector.mode == "copy":
+            # Nothing is typed, so there is no draft on screen to correct
+            return None
+        model = self.config.draft_model
+        if model == final.config.model:
+            return None
+        model_path = self.config.get_model_path(model)
+        if not model_path or not model_path.exists():
+            return None
+        return self._transcriber_for_model(model)
+
+    def _transcribe(self, transcriber: Transcriber, audio, cancel: Optional[threading.Event] = None,
+                    trace: Optional[UtteranceTrace] = None) -> TranscriptionResult:
+        """Transcribe a clip and feed the measured decode time to the model selector."""
+        if self.config.in_memory_audio:
+            result = transcriber.transcribe_audio(audio, self.recorder.sample_rate, cancel=cancel)
+        else:
+            # Temp-file path, kept for debugging and old whisper builds
+            write_start = time.perf_counter()
+            wav_path = self.recorder.save_to_wav(audio)
+            if trace is not None:
+                trace.add("wav_write", time.perf_counter() - write_start)
+            self._log(f"Saved to: {wav_path}")
+            result = transcriber.transcribe(wav_path, cancel=cancel)
+            wav_path.unlink(missing_ok=True)
+        if result.success and "decode" in result.timings:
+            self.selector.record(
+                result.model,
+                self.recorder.get_duration(audio),
+                result.timings["decode"],
+                load_seconds=result.timings.get("model_load") if result.backend == "cli" else None,
+            )
+        return result
+
+    def _process_job(self, job: TranscriptionJob) -> None:
+        """Process one queued job (runs on the queue worker thread)."""
+        trace = job.trace or UtteranceTrace()
+        trace.add("queue_wait", job.started_at - job.created_at)
+        try:
+            self._process_audio(job.audio, job.session, job.cancelled, trace)
+        finally:
+            if self.metrics:
+                try:
+                    self.metrics.append(trace.to_record())
+                except OSError as e:
+                    self._log(f"Failed to write metrics: {e}")
+
+    def _process_audio(self, audio, session: Optional[StreamingSession] = None,
+                       cancel: Optional[threading.Event] = None,
+                       trace: Optional[UtteranceTrace] = None) -> None:
         """Process recorded audio (runs in background thread)."""
+        if trace is None:
+            trace = UtteranceTrace()
         if audio is None:
             self._log("No audio recorded")
+            if session:
+                session.cancel()
             return
 
         duration = self.recorder.get_duration(audio)
-        if duration < 0.3:
-            self._log("Recording too short, ignoring")
-            return
-
-        self._log(f"Audio duration: {duration:.1f}s")
+        trace.info["audio_seconds"] = round(duration, 3)
+        vad = self.vad  # A reload may replace it meanwhile
+        if vad is not None:
+            with trace.span("vad"):
+                speech = vad.trim(audio, self.recorder.sample_rate)
+            if speech is None:
+                self._log("No speech detected, ignoring")
+                if session:
+                    session.cancel()
+                return
+            self._log(f"Audio duration: {duration:.1f}s ({self.recorder.get_duration(speech):.1f}s speech)")
+            trace.info["speech_seconds"] = round(self.recorder.get_duration(speech), 3)
+            audio = speech
+        else:
+            if duration < 0.3:
+                self._log("Recording too short, ignoring")
+                if session:
+                    session.cancel()
+                return
+            self._log(f"Audio duration: {duration:.1f}s")
 
-        # Save to temp file
         try:
-            wav_path = self.recorder.save_to_wav(audio)
-            self._log(f"Saved to: {wav_path}")
-
-            # Transcribe
-            result = self.transcriber.transcribe(wav_path)
+            if session is not None:
+                # Earlier windows are already decoded; only the tail is left
+                result = session.finish(audio)
+            else:
+                transcriber = self._transcriber_for(self.recorder.get_duration(audio))
+                draft = self._draft_transcriber(transcriber, self.recorder.get_duration(audio))
+                if draft is not None:
+                    self._process_speculative(audio, draft, transcriber, cancel, trace)
+                    return
+                result = self._transcribe(transcriber, audio, cancel, trace)
 
-            # Clean up temp file
-            wav_path.unlink(missing_ok=True)
+            for stage, seconds in result.timings.items():
+                trace.add(stage, seconds)
+            trace.add("transcribe_total", result.duration_seconds)
+            trace.info.update(model=result.model, backend=result.backend, success=result.success)
 
-            if result.success:
-                self._log(f"Transcribed ({result.duration_seconds:.1f}s): {result.text[:50]}...")
+            if cancel is not None and cancel.is_set():
+                self._log("Transcription cancelled, discarding result")
+                trace.info["cancelled"] = True
+                return
 
-                # Inject text
-                if self.injector.inject(result.text):
-                    self._log("Text injected successfully")
-                    if self.config.sound_effects:
-                        threading.Thread(target=sounds.play_success_sound, daemon=True).start()
-                else:
-                    self._log("Failed to inject text, copied to clipboard")
-                    TextInjector.copy_to_clipboard(result.text)
-            else:
-                self._log(f"Transcription failed: {result.error}")
-                if self.config.sound_effects:
-                    threading.Thread(target=sounds.play_error_sound, daemon=True).start()
+            self._deliver(result, trace)
 
         except Exception as e:
             self._log(f"Error processing audio: {e}")
-            if self.config.sound_effects:
-                threading.Thread(target=sounds.play_error_sound, daemon=True).start()
+            self._play_cue("error")
+
+    def _deliver(self, result: TranscriptionResult, trace: UtteranceTrace,
+                 success_sound: bool = True) -> bool:
+        """Inject a finished transcript (or report its failure). Returns True if injected."""
+        if not result.success:
+            self._log(f"Transcription failed: {result.error}")
+            self._play_cue("error")
+            return False
+
+        self._log(f"Transcribed ({result.duration_seconds:.1f}s): {result.text[:50]}...")
+
+        # Inject text
+        with self.inject_lock:
+            with trace.span("inject"):
+                injected = self.injector.inject(result.text)
+            trace.since("release", "release_to_text")
+            trace.info["chars"] = len(result.text)
+            trace.info["inject_method"] = self.injector.last_stats.get("method")
+            trace.info["inject_chars_per_second"] = self.injector.last_stats.get("chars_per_second")
+            if not injected:
+                self._log("Failed to inject text, copied to clipboard")
+                self.injector.copy_to_clipboard(result.text)
+        if injected:
+            self._log("Text injected successfully")
+            if success_sound:
+                self._play_cue("success")
+        return injected
+
+    def _process_speculative(self, audio, draft: Transcriber, final: Transcriber,
+                             cancel: Optional[threading.Event], trace: UtteranceTrace) -> None:
+        """
+        Inject a fast draft transcript, then correct it with the accurate model.
+
+        Both models decode the clip at the same time. The draft is typed as
+        soon as it is ready; when the accurate transcript arrives, only the
+        part that differs is erased and retyped. If the user has typed since
+        the draft went in, the draft is left alone and the accurate
+        transcript is copied to the clipboard instead.
+        """
+        final_result: Dict[str, TranscriptionResult] = {}
+
+        def run_final():
+            final_result["result"] = self._transcribe(final, audio, cancel)
+
+        worker = threading.Thread(target=run_final, daemon=True)
+        worker.start()
+
+        draft_result = self._transcribe(draft, audio, cancel, trace)
+        trace.add("draft_total", draft_result.duration_seconds)
+        trace.info["draft_model"] = draft_result.model
+
+        drafted = None
+        drafted_at = 0.0
+        if draft_result.success and worker.is_alive() and not (cancel is not None and cancel.is_set()):
+            # Only a draft that was typed or pasted can be corrected in place
+            if self._deliver(draft_result, trace, success_sound=False) \
+                    and trace.info.get("inject_method") != "copy":
+                drafted = draft_result.text
+                drafted_at = time.monotonic()
+
+        worker.join()
+        result = final_result.get("result")
+        if result is None:
+            return
+        for stage, seconds in result.timings.items():
+            trace.add(stage, seconds)
+        trace.add("transcribe_total", result.duration_seconds)
+        trace.info.update(model=result.model, backend=result.backend, success=result.success)
+
+        if cancel is not None and cancel.is_set():
+            self._log("Transcription cancelled, discarding result")
+            trace.info["cancelled"] = True
+            return
+
+        if drafted is None:
+            self._deliver(result, trace)
+            return
+
+        if result.success and result.text != drafted:
+            with self.inject_lock:
+                # Our own keystrokes echo through the listener for a moment after injecting
+                if self.last_keypress > drafted_at + DRAFT_ECHO_SECONDS:
+                    self._log("Input changed since the draft, accurate transcript copied to clipboard")
+                    self.injector.copy_to_clipboard(result.text)
+                else:
+                    with trace.span("replace"):
+                        replaced = self.injector.replace(drafted, result.text)
+                    trace.info["draft_replaced"] = replaced
+                    self._log(f"Draft replaced with {result.model} transcript: {result.text[:50]}...")
+                    if not replaced:
+                        self.injector.copy_to_clipboard(result.text)
+        trace.since("release", "release_to_final")
+        self._play_cue("success")
 
     def start(self) -> None:
         """Start the daemon."""
@@ -184,20 +513,57 @@ class VoiceDaemon:
         )
         self.keyboard_listener.start()
 
+        self.jobs.start()
+        self.cue_thread.start()
+        self._write_state()
+        self.control.start()
+
+        # Decode the cues up front; the output stream is only open around cues
+        self.cues = sounds.create_player(self.config.sound_effects, self.config.sound_backend,
+                                         self.config.sound_idle_timeout_seconds)
+
+        # Load the model into a resident whisper-server. Until it is ready,
+        # dictations fall back to the one-shot whisper-cli.
+        if self.server:
+            self.server.start_async()
+        if self.servers and self.config.model_selection == "adaptive" and self.config.models_dir:
+            # Preload the fastest candidates too, so switching to them costs nothing
+            available = Transcriber.get_available_models(Path(self.config.models_dir))
+            for model in self.selector.candidates:
+                if len(self.servers.servers) >= self.config.max_resident_models:
+                    break
+                if model in available and model not in self.transcribers:
+                    self.transcribers[model] = Transcriber(
+                        replace(self.config, model=model), server=self.servers.get(model)
+                    )
+
+        if self.config.prewarm_microphone:
+            try:
+                self.recorder.open_stream()
+            except MicrophoneError as e:
+                self._log(f"Could not pre-open microphone: {e}")
+
+        self._start_warmup()
+
         if not self.quiet:
             print("=" * 50)
             print("Voice-to-Claude Daemon")
             print("=" * 50)
             print(f"Hotkey: {self.config.get_hotkey_description()}")
-            print(f"Model: {self.config.model}")
+            if self.config.model_selection == "adaptive":
+                print(f"Model: adaptive ({', '.join(self.selector.candidates)}; default {self.config.model})")
+            else:
+                print(f"Model: {self.config.model}")
+            print(f"Backend: {'whisper-server' if self.server else 'whisper-cli'}")
             print(f"Output: {self.config.output_mode}")
             print("=" * 50)
             print("\nReady! Hold hotkey and speak.\n")
 
-        # Keep running
+        notify_ready()
+
+        # Sleep until a signal (or stop()) sets the event; no periodic wakeups
         try:
-            while self.running:
-                time.sleep(0.1)
+            self.shutdown_event.wait()
         except KeyboardInterrupt:
             pass
 
@@ -206,146 +572,231 @@ class VoiceDaemon:
     def stop(self) -> None:
         """Stop the daemon."""
         self.running = False
+        self.shutdown_event.set()
+        self.control.stop()
 
         if self.keyboard_listener:
             self.keyboard_listener.stop()
             self.keyboard_listener = None
 
+        self.recorder.close()
+        self.cue_queue.put(None)
+        if self.cue_thread.is_alive():
+            self.cue_thread.join(timeout=2)
+        self.cues.close()
+        self.jobs.stop()
+        self.injector.close()
+        remove_state_file()
+        if self.warmer:
+            self.warmer.release()
+
+        if self.servers:
+            self.servers.stop()
+
         self._log("Daemon stopped")
 
+    def apply_config(self, new: Config) -> dict:
+        """
+        Switch to a new configuration without restarting.
+
+        Runs under the daemon lock, so a recording is never started or stopped
+        halfway through a swap. Only components whose settings changed are rebuilt. In particular the
+        model is only loaded again if the model or backend paths changed, and
+        models already resident in a whisper-server are reused.
+
+        Returns:
+            {"changed": names of the settings that changed}
+        """
+        with self.lock:
+            changed = {f.name for f in fields(Config) if getattr(self.config, f.name) != getattr(new, f.name)}
+            if not changed:
+                return {"changed": []}
+            if changed & {"job_queue_depth", "job_queue_policy"}:
+                # Validates the policy before anything else is touched
+                self.jobs.configure(new.job_queue_depth, new.job_queue_policy)
+            self.config = new
+            self._log(f"Applying new settings: {', '.join(sorted(changed))}")
+
+            if changed & HOTKEY_FIELDS:
+                self.required_keys = self._build_required_keys()
+                self.pressed_keys.clear()
+            if changed & INJECTOR_FIELDS:
+                with self.inject_lock:
+                    old, self.injector = self.injector, self._make_injector()
+                    old.close()
+            if changed & VAD_FIELDS:
+                self.vad = VoiceActivityDetector.from_config(new) if new.vad_enabled else None
+            if changed & SELECTOR_FIELDS:
+                self.selector = self._make_selector()
+            if "metrics_enabled" in changed:
+                self.metrics = MetricsLog() if new.metrics_enabled else None
+            if changed & SOUND_FIELDS:
+                old_cues, self.cues = self.cues, sounds.create_player(
+                    new.sound_effects, new.sound_backend, new.sound_idle_timeout_seconds
+                )
+                old_cues.close()
+            if changed & RECORDER_FIELDS:
+                # Never swap the microphone mid-recording; the next one picks it up
+                self.recorder_stale = True
+                if not self.is_recording:
+                    self._replace_recorder()
+            if changed & BACKEND_FIELDS:
+                self._rebuild_backend(changed)
+            if changed & WARMUP_FIELDS:
+                self._start_warmup()
+
+            self._write_state()
+            return {"changed": sorted(changed)}
+
+    def _start_warmup(self) -> None:
+        """Warm the current model in the background."""
+        self.time_to_ready = None
+        threading.Thread(target=self._warm_model, args=(time.monotonic(),), daemon=True).start()
+
+    def _warm_model(self, since: float) -> None:
+        """
+        Get the model ready for the first dictation: read the file into the
+        page cache (optionally locking it), wait for the server to load it and,
+        with model_warmup="decode", run one dummy decode.
+        """
+        warmer = None
+        model_path = self.config.get_model_path()
+        if self.config.model_warmup != "none" and model_path and model_path.exists():
+            warmer = ModelWarmer(model_path, lock=self.config.lock_model_in_memory)
+            old, self.warmer = self.warmer, warmer
+            if old:
+                old.release()
+            warmer.warm()
+
+        server = self.server
+        if server:
+            server.wait_until_ready()
+        if self.config.model_warmup == "decode":
+            # Not cached and not recorded by the selector; only the side effects matter
+            probe = Transcriber(replace(self.config, cache_enabled=False), server=server)
+            probe.transcribe_audio(np.zeros(int(SAMPLE_RATE * WARMUP_DECODE_SECONDS), dtype=np.float32))
+
+        if warmer is not self.warmer and warmer is not None:
+            # A reload started another warm-up meanwhile
+            warmer.release()
+            return
+        self.time_to_ready = time.monotonic() - since
+        state = warmer.state if warmer else "not warmed"
+        self._log(f"Model {self.config.model} ready in {self.time_to_ready:.2f}s ({state})")
+        self._write_state()
+
+    def _warmup_status(self) -> dict:
+        status = self.warmer.status() if self.warmer else {"state": "cold"}
+        status["method"] = self.config.model_warmup
+        return status
+
+    def _replace_recorder(self) -> None:
+        """Rebuild the recorder with the current settings."""
+        old = self.recorder
+        self.recorder = self._make_recorder()
+        self.recorder_stale = False
+        old.close()
+        if self.config.prewarm_microphone and self.running:
+            try:
+                self.recorder.open_stream()
+            except MicrophoneError as e:
+                self._log(f"Could not pre-open microphone: {e}")
+
+    def _rebuild_backend(self, changed: Set[str]) -> None:
+        """Point transcription at the new model or backend, keeping resident servers."""
+        if self.servers and self.config.use_server and not (changed & SERVER_FIELDS):
+            self.servers.config = self.config
+            self.servers.max_resident = max(self.config.max_resident_models, 1)
+        else:
+            old_servers = self.servers
+            self.servers = (
+                ServerPool(self.config, self.config.max_resident_models) if self.config.use_server else None
+            )
+            if old_servers:
+                old_servers.stop()
+        # Returns the running server if this model is already resident
+        self.server = self.servers.get() if self.servers else None
+        self.transcriber = Transcriber(self.config, server=self.server)
+        self.transcribers = {self.config.model: self.transcriber}
+
+    def _control_status(self) -> dict:
+        """Control command: live daemon state."""
+        return {
+            "pid": os.getpid(),
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "recording": self.is_recording,
+            "model": self.config.model,
+            "model_selection": self.config.model_selection,
+            "hotkey": self.config.get_hotkey_description(),
+            "output_mode": self.config.output_mode,
+            "queue": self.jobs.stats(),
+            "resident_models": list(self.servers.servers) if self.servers else [],
+            "ready_models": self.servers.ready_models() if self.servers else [],
+            "warmup": self._warmup_status(),
+            "time_to_ready_seconds": round(self.time_to_ready, 3) if self.time_to_ready is not None else None,
+        }
+
+    def _control_metrics(self, limit: int = METRICS_WINDOW) -> dict:
+        """Control command: latency, injection, cache and model speed snapshot."""
+        snapshot = metrics_snapshot(self.config, limit)
+        snapshot["queue"] = self.jobs.stats()
+        return snapshot
+
+    def _control_reload(self) -> dict:
+        """
+        Control command: re-read config.json and apply what changed.
+
+        A model chosen with the "model" command is not in config.json, so a
+        reload returns to the saved model; the reply names the dropped one.
+        """
+        with self.lock:
+            new = Config.load()
+            dropped = self.session_model if self.session_model not in (None, new.model) else None
+            self.session_model = None
+            result = self.apply_config(new)
+        if dropped:
+            result["session_model_dropped"] = dropped
+        return result
+
+    def _control_model(self, model: str) -> dict:
+        """Control command: switch model for this daemon run only (config.json is not changed)."""
+        if model not in WHISPER_MODELS:
+            raise ValueError(f"Unknown model: {model}")
+        with self.lock:
+            model_path = self.config.get_model_path(model)
+            if not model_path or not model_path.exists():
+                raise ValueError(f"Model '{model}' is not downloaded")
+            result = self.apply_config(replace(self.config, model=model))
+            self.session_model = model
+        result["session_only"] = True
+        return result
+
+    def _control_record(self, action: str = "toggle") -> dict:
+        """Control command: start, stop or toggle a recording."""
+        if action not in ("start", "stop", "toggle"):
+            raise ValueError(f"Unknown record action: {action}")
+        with self.lock:
+            if action == "start" or (action == "toggle" and not self.is_recording):
+                self._start_recording()
+            elif self.is_recording:
+                self._stop_recording()
+            return {"recording": self.is_recording}
+
+    def _write_state(self) -> None:
+        """Publish runtime state for `daemon status`."""
+        write_state_file({
+            "pid": os.getpid(),
+            "updated_at": time.time(),
+            "queue": self.jobs.stats(),
+            "warmup": self._warmup_status(),
+            "time_to_ready_seconds": round(self.time_to_ready, 3) if self.time_to_ready is not None else None,
+        })
+
     def _handle_signal(self, signum, frame) -> None:
         """Handle shutdown signals."""
         self._log(f"Received signal {signum}, shutting down...")
         self.running = False
-
-
-def write_pid_file() -> None:
-    """Write PID to file."""
-    ensure_config_dir()
-    DEFAULT_PID_FILE.write_text(str(os.getpid()))
-
-
-def remove_pid_file() -> None:
-    """Remove PID file."""
-    DEFAULT_PID_FILE.unlink(missing_ok=True)
-
-
-def read_pid_file() -> Optional[int]:
-    """Read PID from file."""
-    if DEFAULT_PID_FILE.exists():
-        try:
-            return int(DEFAULT_PID_FILE.read_text().strip())
-        except (ValueError, FileNotFoundError):
-            pass
-    return None
-
-
-def is_daemon_running() -> bool:
-    """Check if daemon is running."""
-    pid = read_pid_file()
-    if pid is None:
-        return False
-
-    try:
-        # Check if process exists
-        os.kill(pid, 0)
-        return True
-    except (OSError, ProcessLookupError):
-        # Process doesn't exist, clean up stale PID file
-        remove_pid_file()
-        return False
-
-
-def start_daemon(background: bool = False, quiet: bool = False) -> None:
-    """Start the daemon."""
-    if is_daemon_running():
-        print("Daemon is already running.")
-        return
-
-    config = Config.load()
-
-    if background:
-        # On macOS, avoid os.fork due to CoreFoundation issues in child process.
-        # On Linux, fork works fine but we use subprocess for consistency.
-        ensure_config_dir()
-
-        plugin_root = get_plugin_root()
-        exec_path = plugin_root / "scripts" / "exec.py"
-        cmd = [sys.executable, str(exec_path), "daemon", "run"]
-        if quiet:
-            cmd.append("--quiet")
-
-        try:
-            with open(DEFAULT_LOG_FILE, "a") as log_file:
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=log_file,
-                    stderr=log_file,
-                    start_new_session=True,
-                )
-                launcher_pid = process.pid
-
-            # Wait briefly for daemon to start and write PID file
-            for _ in range(10):  # Wait up to 1 second
-                time.sleep(0.1)
-                daemon_pid = read_pid_file()
-                if daemon_pid is not None:
-                    print(f"Daemon started in background (PID: {daemon_pid})")
-                    return
-
-            # If we get here, daemon didn't write PID file
-            # Check if the subprocess exited early
-            exit_code = process.poll()
-            if exit_code is not None:
-                print(f"Error: Daemon process exited with code {exit_code}. Check {DEFAULT_LOG_FILE}")
-                sys.exit(1)
-            else:
-                print(f"Warning: Daemon may have failed to start. Check {DEFAULT_LOG_FILE}")
-
-        except (subprocess.SubprocessError, OSError) as e:
-            print(f"Failed to start daemon: {e}")
-            sys.exit(1)
-        return
-
-    write_pid_file()
-
-    try:
-        daemon = VoiceDaemon(config, quiet=quiet)
-        daemon.start()
-    finally:
-        remove_pid_file()
-
-
-def stop_daemon() -> None:
-    """Stop the daemon."""
-    pid = read_pid_file()
-    if pid is None:
-        print("Daemon is not running.")
-        return
-
-    try:
-        os.kill(pid, signal.SIGTERM)
-        print("Daemon stopped.")
-        remove_pid_file()
-    except ProcessLookupError:
-        print("Daemon was not running (stale PID file removed).")
-        remove_pid_file()
-
-
-def daemon_status() -> dict:
-    """Get daemon status."""
-    running = is_daemon_running()
-    pid = read_pid_file() if running else None
-    config = Config.load()
-
-    return {
-        "running": running,
-        "pid": pid,
-        "setup_complete": config.setup_complete,
-        "model": config.model,
-        "hotkey": config.get_hotkey_description(),
-        "output_mode": config.output_mode
-    }
+        self.shutdown_event.set()
 
 
 def main():
@@ -368,7 +819,6 @@ def main():
         stop_daemon()
     elif args.action == "restart":
         stop_daemon()
-        time.sleep(0.5)
         start_daemon(background=args.background, quiet=args.quiet)
     elif args.action == "status":
         status = daemon_status()
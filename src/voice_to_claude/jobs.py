@@ -0,0 +1,228 @@
+"""Ordered transcription job queue with backpressure and cancellation."""
+
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# What to do when a job arrives and the queue is full
+QUEUE_POLICIES = ("merge", "drop_oldest", "drop_newest")
+
+# Silence inserted between merged recordings
+MERGE_GAP_SECONDS = 0.3
+
+_job_ids = itertools.count(1)
+
+
+@dataclass
+class TranscriptionJob:
+    """One recorded utterance waiting to be transcribed and injected."""
+    audio: Optional[np.ndarray]
+    sample_rate: int
+    session: Any = None  # StreamingSession that already decoded part of the audio
+    trace: Any = None  # UtteranceTrace collecting latency spans
+    id: int = field(default_factory=lambda: next(_job_ids))
+    created_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    cancelled: threading.Event = field(default_factory=threading.Event)
+
+    def cancel(self) -> None:
+        """Mark the job cancelled and stop its streaming session."""
+        self.cancelled.set()
+        if self.session is not None:
+            self.session.cancel()
+
+
+class JobQueue:
+    """
+    Runs transcription jobs one at a time, in the order they were recorded.
+
+    A single consumer thread means rapid dictations never run several
+    whisper decodes at once and their text is injected in order. The queue
+    holds at most ``max_depth`` waiting jobs; when full, ``policy`` decides
+    whether the new recording is merged into the last waiting one, the
+    oldest waiting job is dropped, or the new one is rejected.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[TranscriptionJob], None],
+        max_depth: int = 3,
+        policy: str = "merge",
+        on_change: Optional[Callable[[], None]] = None,
+    ):
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown queue policy: {policy}")
+        self.handler = handler
+        self.max_depth = max(max_depth, 1)
+        self.policy = policy
+        self.on_change = on_change
+
+        self.pending: Deque[TranscriptionJob] = deque()
+        self.current: Optional[TranscriptionJob] = None
+        self.started = 0
+        self.processed = 0
+        self.dropped = 0
+        self.merged = 0
+        self.cancelled = 0
+        self.last_wait_seconds = 0.0
+        self.total_wait_seconds = 0.0
+
+        self._cond = threading.Condition()
+        self._running = False
+        self._worker: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the consumer thread."""
+        self._running = True
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def stop(self) -> None:
+        """Cancel everything and stop the consumer thread."""
+        with self._cond:
+            self._running = False
+            for job in self.pending:
+                job.cancel()
+            self.pending.clear()
+            if self.current is not None:
+                self.current.cancel()
+            self._cond.notify_all()
+        if self._worker:
+            self._worker.join(timeout=5)
+            self._worker = None
+
+    def configure(self, max_depth: int, policy: str) -> None:
+        """Change the depth limit and full-queue policy; waiting jobs are kept."""
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown queue policy: {policy}")
+        with self._cond:
+            self.max_depth = max(max_depth, 1)
+            self.policy = policy
+        self._changed()
+
+    def submit(self, job: TranscriptionJob) -> bool:
+        """Queue a job. Returns False if it was rejected."""
+        with self._cond:
+            outcome = "queued"
+            if len(self.pending) >= self.max_depth:
+                outcome = self._make_room(job)
+            if outcome == "queued":
+                self.pending.append(job)
+                self._cond.notify()
+        self._changed()
+        return outcome != "rejected"
+
+    def _make_room(self, job: TranscriptionJob) -> str:
+        """
+        Apply the full-queue policy (caller holds the lock).
+
+        Returns "queued" if there is now room for the job, "merged" if it was
+        folded into the last waiting job, or "rejected".
+        """
+        if self.policy == "merge":
+            last = self.pending[-1]
+            if (last.session is None and job.session is None
+                    and last.audio is not None and job.audio is not None
+                    and last.sample_rate == job.sample_rate):
+                gap = np.zeros(int(MERGE_GAP_SECONDS * job.sample_rate), dtype=job.audio.dtype)
+                last.audio = np.concatenate((last.audio, gap, job.audio))
+                job.audio = None
+                self.merged += 1
+                logger.info(f"Queue full, merged job {job.id} into job {last.id}")
+                return "merged"
+            # Streaming jobs cannot be merged; fall back to dropping the oldest
+
+        if self.policy == "drop_newest":
+            job.cancel()
+            self.dropped += 1
+            logger.info(f"Queue full, dropped new job {job.id}")
+            return "rejected"
+
+        oldest = self.pending.popleft()
+        oldest.cancel()
+        self.dropped += 1
+        logger.info(f"Queue full, dropped oldest job {oldest.id}")
+        return "queued"
+
+    def cancel_stale(self, max_age: float) -> int:
+        """Cancel queued and in-flight jobs recorded more than max_age seconds ago."""
+        if max_age <= 0:
+            return 0
+        cutoff = time.monotonic() - max_age
+        count = 0
+        with self._cond:
+            for job in list(self.pending):
+                if job.created_at < cutoff:
+                    self.pending.remove(job)
+                    job.cancel()
+                    count += 1
+            if self.current is not None and self.current.created_at < cutoff \
+                    and not self.current.cancelled.is_set():
+                self.current.cancel()
+                count += 1
+            self.cancelled += count
+        if count:
+            logger.info(f"Cancelled {count} stale job(s)")
+            self._changed()
+        return count
+
+    def _run(self) -> None:
+        """Consumer loop."""
+        while True:
+            with self._cond:
+                while self._running and not self.pending:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                job = self.pending.popleft()
+                job.started_at = time.monotonic()
+                self.last_wait_seconds = job.started_at - job.created_at
+                self.total_wait_seconds += self.last_wait_seconds
+                self.started += 1
+                self.current = job
+            self._changed()
+
+            try:
+                if not job.cancelled.is_set():
+                    self.handler(job)
+            except Exception as e:
+                logger.error(f"Job {job.id} failed: {e}")
+            finally:
+                with self._cond:
+                    self.current = None
+                    self.processed += 1
+                self._changed()
+
+    def _changed(self) -> None:
+        """Notify the owner that queue state changed."""
+        if self.on_change:
+            try:
+                self.on_change()
+            except Exception as e:
+                logger.warning(f"Queue state callback failed: {e}")
+
+    def stats(self) -> dict:
+        """Snapshot of queue depth and wait times."""
+        with self._cond:
+            now = time.monotonic()
+            return {
+                "depth": len(self.pending),
+                "max_depth": self.max_depth,
+                "policy": self.policy,
+                "in_flight": self.current is not None,
+                "oldest_wait_seconds": round(now - self.pending[0].created_at, 3) if self.pending else 0.0,
+                "last_wait_seconds": round(self.last_wait_seconds, 3),
+                "avg_wait_seconds": round(self.total_wait_seconds / self.started, 3) if self.started else 0.0,
+                "processed": self.processed,
+                "dropped": self.dropped,
+                "merged": self.merged,
+                "cancelled": self.cancelled,
+            }
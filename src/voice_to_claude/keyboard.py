@@ -1,24 +1,177 @@
 """Text injection functionality for Claude Code."""
 
+import os
+import shutil
 import subprocess
+import sys
+import threading
 import time
-from typing import Optional
+from typing import List, Optional
 
 from pynput.keyboard import Controller, Key
 
+from .clipboard import create_clipboard
+
+# Accepted values of typing_backend (besides "auto")
+TYPING_BACKENDS = ("quartz", "wtype", "ydotool", "xdotool", "pynput")
+
+# CGEventKeyboardSetUnicodeString accepts at most 20 UTF-16 code units per event
+QUARTZ_CHUNK_UNITS = 20
+
+# Characters per external typing command; keeps argument lists small
+COMMAND_CHUNK_CHARS = 500
+
+# Modifier names usable in paste_shortcut
+_MODIFIERS = {"ctrl": Key.ctrl, "shift": Key.shift, "alt": Key.alt, "cmd": Key.cmd}
+
+
+def _utf16_chunks(text: str, limit: int) -> List[str]:
+    """Split text into chunks of at most limit UTF-16 code units, never inside a character."""
+    chunks = []
+    current = []
+    units = 0
+    for char in text:
+        size = 2 if ord(char) > 0xFFFF else 1
+        if units + size > limit:
+            chunks.append("".join(current))
+            current, units = [], 0
+        current.append(char)
+        units += size
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+class QuartzTyper:
+    """Types whole chunks per key event with macOS's Quartz event API."""
+
+    name = "quartz"
+
+    def __init__(self):
+        # pyobjc's Quartz bindings ship with pynput on macOS
+        import Quartz
+        self.quartz = Quartz
+
+    def type(self, text: str) -> None:
+        q = self.quartz
+        for chunk in _utf16_chunks(text, QUARTZ_CHUNK_UNITS):
+            units = len(chunk.encode("utf-16-le")) // 2
+            for key_down in (True, False):
+                event = q.CGEventCreateKeyboardEvent(None, 0, key_down)
+                q.CGEventKeyboardSetUnicodeString(event, units, chunk)
+                q.CGEventPost(q.kCGHIDEventTap, event)
+
+
+class CommandTyper:
+    """Types text through an external tool (xdotool, wtype or ydotool)."""
+
+    # argv prefix, and whether the text is passed on stdin instead of as an argument
+    COMMANDS = {
+        "xdotool": (["xdotool", "type", "--clearmodifiers", "--delay", "0", "--"], False),
+        "wtype": (["wtype", "-"], True),
+        "ydotool": (["ydotool", "type", "--key-delay", "0", "--file", "-"], True),
+    }
+
+    def __init__(self, name: str):
+        if name not in self.COMMANDS or not shutil.which(name):
+            raise RuntimeError(f"{name} not available")
+        self.name = name
+        self.args, self.use_stdin = self.COMMANDS[name]
+
+    def type(self, text: str) -> None:
+        for i in range(0, len(text), COMMAND_CHUNK_CHARS):
+            chunk = text[i:i + COMMAND_CHUNK_CHARS]
+            if self.use_stdin:
+                subprocess.run(self.args, input=chunk.encode("utf-8"), check=True,
+                               capture_output=True, timeout=30)
+            else:
+                subprocess.run(self.args + [chunk], check=True, capture_output=True, timeout=30)
+
+
+class PynputTyper:
+    """pynput's per-character typing; works everywhere pynput does."""
+
+    name = "pynput"
+
+    def __init__(self, controller: Controller):
+        self.controller = controller
+
+    def type(self, text: str) -> None:
+        self.controller.type(text)
+
+
+def _backend_candidates() -> List[str]:
+    """Typing backends worth trying on this platform, best first."""
+    if sys.platform == "darwin":
+        return ["quartz", "pynput"]
+    if sys.platform.startswith("linux"):
+        if os.environ.get("WAYLAND_DISPLAY"):
+            return ["wtype", "ydotool", "pynput"]
+        return ["xdotool", "ydotool", "pynput"]
+    return ["pynput"]
+
+
+def default_paste_shortcut() -> str:
+    """Paste shortcut for this platform (terminals on Linux need Shift)."""
+    return "cmd+v" if sys.platform == "darwin" else "ctrl+shift+v"
+
+
+def create_typer(backend: str, controller: Controller):
+    """
+    Create a typing backend.
+
+    Args:
+        backend: One of TYPING_BACKENDS, or "auto" for the best available
+        controller: pynput controller used by the "pynput" backend and as fallback
+
+    Returns:
+        An object with a name and a type(text) method
+    """
+    names = _backend_candidates() if backend == "auto" else [backend, "pynput"]
+    for name in names:
+        try:
+            if name == "quartz":
+                return QuartzTyper()
+            if name == "pynput":
+                return PynputTyper(controller)
+            return CommandTyper(name)
+        except (ImportError, RuntimeError):
+            continue
+    return PynputTyper(controller)
+
 
 class TextInjector:
     """Injects text into Claude Code's input."""
 
-    def __init__(self, mode: str = "keyboard"):
+    def __init__(self, mode: str = "keyboard", controller: Optional[Controller] = None,
+                 typing_backend: str = "auto", paste_threshold: int = 300,
+                 clipboard_backend: str = "auto", paste_shortcut: str = "auto",
+                 restore_clipboard: bool = True, restore_delay: float = 0.5):
         """
         Initialize text injector.
 
         Args:
-            mode: "keyboard" for typing simulation, "clipboard" for paste
+            mode: "keyboard" for typing simulation, "clipboard" for paste,
+                "auto" to paste texts longer than paste_threshold characters, or
+                "copy" to only put the text on the clipboard
+            controller: Keyboard controller to use (defaults to pynput's)
+            typing_backend: Typing engine, see TYPING_BACKENDS ("auto" picks the
+                fastest one available on this platform)
+            paste_threshold: Length above which "auto" mode pastes instead of typing
+            clipboard_backend: See clipboard.CLIPBOARD_BACKENDS ("auto" picks one)
+            paste_shortcut: Keys that paste, e.g. "cmd+v" ("auto" for the platform default)
+            restore_clipboard: Put the previous clipboard text back after pasting
+            restore_delay: Seconds to wait before restoring, so the paste completes
         """
         self.mode = mode
-        self.keyboard = Controller()
+        self.keyboard = controller if controller is not None else Controller()
+        self.typer = create_typer(typing_backend, self.keyboard)
+        self.paste_threshold = paste_threshold
+        self.clipboard = create_clipboard(clipboard_backend)
+        self.paste_shortcut = default_paste_shortcut() if paste_shortcut == "auto" else paste_shortcut
+        self.restore_clipboard = restore_clipboard
+        self.restore_delay = restore_delay
+        self.last_stats: dict = {}
 
     def inject(self, text: str) -> bool:
         """
@@ -33,63 +186,121 @@ class TextInjector:
         if not text:
             return False
 
-        if self.mode == "keyboard":
-            return self._inject_keyboard(text)
+        # Small delay to ensure focus
+        time.sleep(0.05)
+
+        start = time.perf_counter()
+        if self.mode == "keyboard" or (self.mode == "auto" and len(text) <= self.paste_threshold):
+            method, success = self._inject_keyboard(text)
+        elif self.mode == "copy":
+            method, success = "copy", self.copy_to_clipboard(text)
         else:
-            return self._inject_clipboard(text)
+            method, success = "clipboard", self._inject_clipboard(text)
+
+        elapsed = time.perf_counter() - start
+        self.last_stats = {
+            "method": method,
+            "chars": len(text),
+            "seconds": round(elapsed, 4),
+            "chars_per_second": round(len(text) / elapsed, 1) if elapsed > 0 else None,
+        }
+        return success
+
+    def replace(self, old: str, new: str) -> bool:
+        """
+        Replace text injected earlier (still just before the cursor).
 
-    def _inject_keyboard(self, text: str) -> bool:
-        """Type text character by character."""
+        Only the part after the common prefix is erased with Backspace and
+        typed again.
+
+        Args:
+            old: Text that was injected
+            new: Text that should be there instead
+
+        Returns:
+            True if successful; False without touching the keyboard in
+            "copy" mode, where nothing was typed to replace
+        """
+        if self.mode == "copy":
+            return False
+        common = len(os.path.commonprefix([old, new]))
         try:
-            # Small delay to ensure focus
-            time.sleep(0.05)
+            for _ in range(len(old) - common):
+                self.keyboard.press(Key.backspace)
+                self.keyboard.release(Key.backspace)
+        except Exception as e:
+            print(f"Erasing draft text failed: {e}")
+            return False
+        rest = new[common:]
+        return self.inject(rest) if rest else True
 
-            # Type the text
-            self.keyboard.type(text)
-            return True
+    def _inject_keyboard(self, text: str):
+        """Type text with the typing backend. Returns (method, success)."""
+        try:
+            self.typer.type(text)
+            return self.typer.name, True
         except Exception as e:
+            if self.typer.name != "pynput":
+                print(f"{self.typer.name} typing failed, falling back to pynput: {e}")
+                self.typer = PynputTyper(self.keyboard)
+                return self._inject_keyboard(text)
             # Fall back to clipboard
             print(f"Keyboard typing failed, falling back to clipboard: {e}")
-            return self._inject_clipboard(text)
+            return "clipboard", self._inject_clipboard(text)
 
     def _inject_clipboard(self, text: str) -> bool:
-        """Copy text to clipboard and paste."""
+        """Copy text to the clipboard, paste it, then restore the previous contents."""
+        if self.clipboard is None:
+            return False
         try:
-            # Copy to clipboard using pbcopy
-            process = subprocess.Popen(
-                ['pbcopy'],
-                stdin=subprocess.PIPE,
-                env={'LANG': 'en_US.UTF-8'}
-            )
-            process.communicate(text.encode('utf-8'))
-
-            if process.returncode != 0:
+            previous = self.clipboard.get() if self.restore_clipboard else None
+            if not self.clipboard.set(text):
                 return False
 
-            # Small delay then paste
+            # Small delay so the paste sees the new contents
             time.sleep(0.05)
+            self._press_paste()
 
-            # Simulate Cmd+V
-            self.keyboard.press(Key.cmd)
-            self.keyboard.press('v')
-            self.keyboard.release('v')
-            self.keyboard.release(Key.cmd)
-
+            if previous is not None and previous != text:
+                # The target app reads the clipboard asynchronously; restore later
+                threading.Timer(self.restore_delay, self._restore, (previous, text)).start()
             return True
         except Exception as e:
             print(f"Clipboard injection failed: {e}")
             return False
 
-    @staticmethod
-    def copy_to_clipboard(text: str) -> bool:
+    def _press_paste(self) -> None:
+        """Press the paste shortcut."""
+        *modifiers, key = self.paste_shortcut.lower().split("+")
+        keys = [_MODIFIERS[name] for name in modifiers]
+        for modifier in keys:
+            self.keyboard.press(modifier)
+        try:
+            self.keyboard.press(key)
+            self.keyboard.release(key)
+        finally:
+            for modifier in reversed(keys):
+                self.keyboard.release(modifier)
+
+    def _restore(self, previous: str, pasted: str) -> None:
+        """Put back the user's clipboard unless something else replaced ours meanwhile."""
+        try:
+            if self.clipboard.get() == pasted:
+                self.clipboard.set(previous)
+        except Exception as e:
+            print(f"Restoring clipboard failed: {e}")
+
+    def copy_to_clipboard(self, text: str) -> bool:
         """Just copy text to clipboard without pasting."""
+        if self.clipboard is None:
+            return False
         try:
-            process = subprocess.Popen(
-                ['pbcopy'],
-                stdin=subprocess.PIPE,
-                env={'LANG': 'en_US.UTF-8'}
-            )
-            process.communicate(text.encode('utf-8'))
-            return process.returncode == 0
+            return self.clipboard.set(text)
         except Exception:
             return False
+
+    def close(self) -> None:
+        """Release the clipboard backend (lets a Tk helper process exit)."""
+        close = getattr(self.clipboard, "close", None)
+        if close:
+            close()
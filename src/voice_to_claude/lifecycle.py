@@ -0,0 +1,340 @@
+"""
+Daemon process lifecycle: launching, stopping, PID/state files and status.
+
+Kept free of the audio stack (pynput, NumPy, sounddevice) so that hooks and
+CLI commands like `daemon status` start quickly; only the process that runs
+the daemon imports voice_to_claude.daemon.
+"""
+
+import json
+import os
+import select
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Optional
+
+from .config import (
+    Config, DEFAULT_PID_FILE, DEFAULT_LOG_FILE, DEFAULT_STATE_FILE, ensure_config_dir, get_plugin_root
+)
+from .control import ControlError, send_command
+
+# Number of recent dictations used for status percentiles
+METRICS_WINDOW = 200
+
+# Pipe file descriptor a background daemon reports readiness on
+READY_FD_ENV = "VOICE_TO_CLAUDE_READY_FD"
+
+# How long `daemon start` waits for readiness, and `daemon stop` for exit
+READY_TIMEOUT_SECONDS = 15
+STOP_TIMEOUT_SECONDS = 5
+
+
+def notify_ready() -> None:
+    """Tell the launcher (ready pipe) and systemd (sd_notify) that the daemon is ready."""
+    fd = os.environ.pop(READY_FD_ENV, None)
+    if fd is not None:
+        try:
+            os.write(int(fd), f"READY {os.getpid()}\n".encode())
+            os.close(int(fd))
+        except (OSError, ValueError):
+            pass
+
+    notify_socket = os.environ.get("NOTIFY_SOCKET")
+    if notify_socket:
+        # Leading "@" means an abstract socket
+        address = "\0" + notify_socket[1:] if notify_socket.startswith("@") else notify_socket
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+                sock.connect(address)
+                sock.sendall(b"READY=1")
+        except OSError:
+            pass
+
+
+def wait_for_ready(fd: int, timeout: float = READY_TIMEOUT_SECONDS) -> Optional[int]:
+    """
+    Block until a launched daemon reports readiness on the pipe.
+
+    Returns:
+        The daemon's PID, or None if it exited (pipe closed) or timed out
+    """
+    deadline = time.monotonic() + timeout
+    data = b""
+    while b"\n" not in data:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+            return None
+        chunk = os.read(fd, 64)
+        if not chunk:
+            return None
+        data += chunk
+    try:
+        return int(data.split()[1])
+    except (IndexError, ValueError):
+        return None
+
+
+def wait_for_exit(pid: int, timeout: float = STOP_TIMEOUT_SECONDS) -> bool:
+    """Block until a process exits. Returns False on timeout."""
+    # Linux: a pidfd becomes readable when the process exits
+    if hasattr(os, "pidfd_open"):
+        try:
+            fd = os.pidfd_open(pid)
+        except ProcessLookupError:
+            return True
+        except OSError:
+            fd = None
+        if fd is not None:
+            try:
+                return bool(select.select([fd], [], [], timeout)[0])
+            finally:
+                os.close(fd)
+
+    # macOS/BSD: kqueue reports the exit
+    if hasattr(select, "kqueue"):
+        kq = select.kqueue()
+        try:
+            event = select.kevent(
+                pid,
+                filter=select.KQ_FILTER_PROC,
+                flags=select.KQ_EV_ADD | select.KQ_EV_ONESHOT,
+                fflags=select.KQ_NOTE_EXIT,
+            )
+            return bool(kq.control([event], 1, timeout))
+        except ProcessLookupError:
+            return True
+        finally:
+            kq.close()
+
+    # Anything else: poll
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def write_pid_file() -> None:
+    """Write PID to file."""
+    ensure_config_dir()
+    DEFAULT_PID_FILE.write_text(str(os.getpid()))
+
+
+def remove_pid_file() -> None:
+    """Remove PID file."""
+    DEFAULT_PID_FILE.unlink(missing_ok=True)
+
+
+def read_pid_file() -> Optional[int]:
+    """Read PID from file."""
+    if DEFAULT_PID_FILE.exists():
+        try:
+            return int(DEFAULT_PID_FILE.read_text().strip())
+        except (ValueError, FileNotFoundError):
+            pass
+    return None
+
+
+_state_lock = threading.Lock()
+
+
+def write_state_file(state: dict) -> None:
+    """Atomically write the daemon's runtime state."""
+    with _state_lock:
+        ensure_config_dir()
+        tmp_path = DEFAULT_STATE_FILE.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(state, indent=2))
+        os.replace(tmp_path, DEFAULT_STATE_FILE)
+
+
+def remove_state_file() -> None:
+    """Remove state file."""
+    DEFAULT_STATE_FILE.unlink(missing_ok=True)
+
+
+def read_state_file() -> dict:
+    """Read the daemon's runtime state. Returns {} if unavailable."""
+    try:
+        return json.loads(DEFAULT_STATE_FILE.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def is_daemon_running() -> bool:
+    """Check if daemon is running."""
+    pid = read_pid_file()
+    if pid is None:
+        return False
+
+    try:
+        # Check if process exists
+        os.kill(pid, 0)
+        return True
+    except (OSError, ProcessLookupError):
+        # Process doesn't exist, clean up stale PID file
+        remove_pid_file()
+        return False
+
+
+def start_daemon(background: bool = False, quiet: bool = False) -> None:
+    """Start the daemon."""
+    if is_daemon_running():
+        print("Daemon is already running.")
+        return
+
+    config = Config.load()
+
+    if background:
+        # On macOS, avoid os.fork due to CoreFoundation issues in child process.
+        # On Linux, fork works fine but we use subprocess for consistency.
+        ensure_config_dir()
+
+        plugin_root = get_plugin_root()
+        exec_path = plugin_root / "scripts" / "exec.py"
+        cmd = [sys.executable, str(exec_path), "daemon", "run"]
+        if quiet:
+            cmd.append("--quiet")
+
+        # The daemon writes one line to this pipe once it is ready
+        ready_read, ready_write = os.pipe()
+        try:
+            with open(DEFAULT_LOG_FILE, "a") as log_file:
+                process = subprocess.Popen(
+                    cmd,
+                    stdout=log_file,
+                    stderr=log_file,
+                    start_new_session=True,
+                    pass_fds=(ready_write,),
+                    env={**os.environ, READY_FD_ENV: str(ready_write)},
+                )
+            os.close(ready_write)
+            ready_write = None
+
+            daemon_pid = wait_for_ready(ready_read)
+            if daemon_pid is not None:
+                print(f"Daemon started in background (PID: {daemon_pid})")
+                return
+
+            # The pipe closed or timed out: check if the subprocess exited early
+            try:
+                exit_code = process.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                exit_code = None
+            if exit_code is not None:
+                print(f"Error: Daemon process exited with code {exit_code}. Check {DEFAULT_LOG_FILE}")
+                sys.exit(1)
+            else:
+                print(f"Warning: Daemon may have failed to start. Check {DEFAULT_LOG_FILE}")
+
+        except (subprocess.SubprocessError, OSError) as e:
+            print(f"Failed to start daemon: {e}")
+            sys.exit(1)
+        finally:
+            os.close(ready_read)
+            if ready_write is not None:
+                os.close(ready_write)
+        return
+
+    # The audio stack is only imported by the process that runs the daemon
+    from .daemon import VoiceDaemon
+
+    write_pid_file()
+
+    try:
+        daemon = VoiceDaemon(config, quiet=quiet)
+        daemon.start()
+    finally:
+        remove_pid_file()
+
+
+def stop_daemon() -> None:
+    """Stop the daemon."""
+    pid = read_pid_file()
+    if pid is None:
+        print("Daemon is not running.")
+        return
+
+    try:
+        os.kill(pid, signal.SIGTERM)
+        if wait_for_exit(pid):
+            print("Daemon stopped.")
+        else:
+            print(f"Daemon did not exit within {STOP_TIMEOUT_SECONDS}s; it may still be shutting down.")
+        remove_pid_file()
+    except ProcessLookupError:
+        print("Daemon was not running (stale PID file removed).")
+        remove_pid_file()
+
+
+def metrics_snapshot(config: Config, limit: int = METRICS_WINDOW) -> dict:
+    """Latency, injection, cache and model speed summaries from the on-disk logs."""
+    from .cache import shared_cache
+    from .metrics import MetricsLog, summarize, summarize_injection
+    from .selector import ModelSelector
+
+    records = MetricsLog().read_recent(limit)
+    return {
+        "latency": summarize(records),
+        "injection": summarize_injection(records),
+        "cache": shared_cache().stats() if config.cache_enabled else None,
+        "model_speed": ModelSelector(config.adaptive_models).summary(),
+    }
+
+
+def daemon_status(include_metrics: bool = False) -> dict:
+    """
+    Get daemon status.
+
+    A running daemon is asked over the control socket, so runtime changes
+    (e.g. a model switched without saving) are reported; the state file is
+    the fallback when the socket does not answer.
+
+    Args:
+        include_metrics: Also summarize recent per-stage latency from the metrics log
+    """
+    running = is_daemon_running()
+    pid = read_pid_file() if running else None
+    config = Config.load()
+
+    status = {
+        "running": running,
+        "pid": pid,
+        "setup_complete": config.setup_complete,
+        "model": config.model,
+        "model_selection": config.model_selection,
+        "hotkey": config.get_hotkey_description(),
+        "output_mode": config.output_mode,
+        "queue": None,
+    }
+
+    live = None
+    if running:
+        try:
+            live = send_command("status", timeout=1.0)
+        except ControlError:
+            state = read_state_file()
+            if state.get("pid") == pid:
+                for key in ("queue", "warmup", "time_to_ready_seconds"):
+                    status[key] = state.get(key)
+    if live:
+        for key in ("model", "model_selection", "hotkey", "output_mode", "queue",
+                    "recording", "uptime_seconds", "resident_models", "ready_models",
+                    "warmup", "time_to_ready_seconds"):
+            status[key] = live.get(key)
+
+    if include_metrics:
+        snapshot = None
+        if live:
+            try:
+                snapshot = send_command("metrics", timeout=2.0)
+            except ControlError:
+                pass
+        status.update(snapshot or metrics_snapshot(config))
+    return status
@@ -0,0 +1,156 @@
+"""Per-utterance latency instrumentation.
+
+Only uses the standard library so `daemon status` can summarize metrics
+without importing the audio stack.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from .config import DEFAULT_METRICS_FILE, ensure_config_dir
+
+# Stages reported by `daemon status --verbose`, in pipeline order
+STAGES = [
+    "key_to_stream_open",
+    "capture",
+    "stop_to_buffer",
+    "vad",
+    "queue_wait",
+    "wav_write",
+    "model_load",
+    "decode",
+    "draft_total",
+    "transcribe_total",
+    "inject",
+    "release_to_text",
+    "replace",
+    "release_to_final",
+]
+
+
+class UtteranceTrace:
+    """Timing spans (in milliseconds) for one dictation."""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex[:12]
+        self.timestamp = time.time()
+        self.spans: Dict[str, float] = {}
+        self.info: Dict[str, object] = {}
+        self._marks: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        """Record a span measured elsewhere."""
+        self.spans[name] = round(self.spans.get(name, 0.0) + seconds * 1000, 3)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as a span."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def mark(self, name: str) -> None:
+        """Remember a point in time for since()."""
+        self._marks[name] = time.perf_counter()
+
+    def since(self, mark: str, name: str) -> None:
+        """Record the time elapsed since a mark as a span."""
+        if mark in self._marks:
+            self.add(name, time.perf_counter() - self._marks[mark])
+
+    def to_record(self) -> dict:
+        """Serialize for the metrics log."""
+        return {"id": self.id, "timestamp": self.timestamp, "spans_ms": self.spans, **self.info}
+
+
+class MetricsLog:
+    """Append-only JSONL file of utterance traces."""
+
+    def __init__(self, path: Path = DEFAULT_METRICS_FILE):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def append(self, record: dict) -> None:
+        """Append one record as a JSON line."""
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            ensure_config_dir()
+            with open(self.path, "a") as f:
+                f.write(line)
+
+    def read_recent(self, limit: int = 200) -> List[dict]:
+        """Read the last `limit` records without loading the whole file."""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                pos = f.tell()
+                data = b""
+                while pos > 0 and data.count(b"\n") <= limit:
+                    step = min(65536, pos)
+                    pos -= step
+                    f.seek(pos)
+                    data = f.read(step) + data
+        except OSError:
+            return []
+
+        records = []
+        for line in data.splitlines()[-limit:]:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # First line may be cut in half by the block read
+                continue
+        return records
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Linear-interpolated percentile (q in 0-100) of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(records: List[dict]) -> Dict[str, dict]:
+    """Rolling p50/p95/p99 per stage (milliseconds) over the given records."""
+    by_stage: Dict[str, List[float]] = {}
+    for record in records:
+        for name, value in record.get("spans_ms", {}).items():
+            by_stage.setdefault(name, []).append(value)
+
+    order = {name: i for i, name in enumerate(STAGES)}
+    summary = {}
+    for name in sorted(by_stage, key=lambda n: (order.get(n, len(order)), n)):
+        values = by_stage[name]
+        summary[name] = {
+            "count": len(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+        }
+    return summary
+
+
+def summarize_injection(records: List[dict]) -> Dict[str, dict]:
+    """Median injection speed (characters per second) per injection method."""
+    by_method: Dict[str, List[float]] = {}
+    for record in records:
+        method = record.get("inject_method")
+        cps = record.get("inject_chars_per_second")
+        if method and cps:
+            by_method.setdefault(method, []).append(cps)
+    return {
+        method: {"count": len(values), "chars_per_second": percentile(values, 50)}
+        for method, values in sorted(by_method.items())
+    }
@@ -0,0 +1,561 @@
+"""Model files: downloads, verification, quantized variants and per-model reports."""
+
+import hashlib
+import http.client
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .config import Config, WHISPER_MODELS
+from .selector import ModelSelector
+
+logger = logging.getLogger(__name__)
+
+# Names of whisper.cpp's quantize tool, newest first; built next to whisper-cli
+QUANTIZE_TOOLS = ("whisper-quantize", "quantize")
+
+# Size of each ranged request; finished chunks survive an interrupted download
+CHUNK_BYTES = 16 * 1024 * 1024
+DOWNLOAD_CONNECTIONS = 4
+DOWNLOAD_RETRIES = 5
+READ_BYTES = 1024 * 1024
+
+# Per-directory record of model hashes: file name -> sha256, size, source, verified
+CHECKSUMS_FILE = "checksums.json"
+
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# What a dropped or broken connection raises; http.client reports a body cut
+# short (IncompleteRead) as an HTTPException, which is not an OSError
+NETWORK_ERRORS = (OSError, http.client.HTTPException)
+
+ProgressCallback = Callable[[int, Optional[int]], None]
+
+
+class ModelError(Exception):
+    """Raised when a model file cannot be created or fetched."""
+    pass
+
+
+def find_quantize_tool(config: Config) -> Optional[Path]:
+    """Path to whisper.cpp's quantize tool, or None if it was not built."""
+    whisper_cli = config.get_whisper_cli()
+    if not whisper_cli:
+        return None
+    for name in QUANTIZE_TOOLS:
+        tool = whisper_cli.parent / name
+        if tool.exists():
+            return tool
+    return None
+
+
+def can_quantize(config: Config, model: str) -> bool:
+    """True if model is a quantized variant whose full-precision model is on disk."""
+    info = WHISPER_MODELS.get(model, {})
+    if "quantization" not in info:
+        return False
+    source = config.get_model_path(info["base_model"])
+    return source is not None and source.exists()
+
+
+def quantize_model(config: Config, model: str, timeout: int = 3600) -> Path:
+    """
+    Create a quantized variant (e.g. "medium-q5_0") from its full-precision model.
+
+    Args:
+        config: Configuration (locates the models and the quantize tool)
+        model: Quantized variant to create
+        timeout: Seconds to allow the quantize tool
+
+    Returns:
+        Path of the new model file
+
+    Raises:
+        ModelError: If the variant is unknown, its source model is missing or
+            quantizing failed
+    """
+    info = WHISPER_MODELS.get(model)
+    if not info or "quantization" not in info:
+        raise ModelError(f"'{model}' is not a quantized model variant")
+    source = config.get_model_path(info["base_model"])
+    target = config.get_model_path(model)
+    if not source or not source.exists():
+        raise ModelError(f"Full-precision model '{info['base_model']}' is not downloaded")
+    tool = find_quantize_tool(config)
+    if tool is None:
+        raise ModelError("whisper.cpp quantize tool not found; rebuild with: exec.py setup --rebuild")
+
+    # Write next to the target and rename, so a failed run never leaves a partial model
+    tmp_path = target.with_name(target.name + ".tmp")
+    logger.info(f"Quantizing {source.name} to {info['quantization']}")
+    try:
+        result = subprocess.run(
+            [str(tool), str(source), str(tmp_path), info["quantization"]],
+            capture_output=True, text=True, timeout=timeout,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        tmp_path.unlink(missing_ok=True)
+        raise ModelError(f"Quantizing failed: {e}")
+    if result.returncode != 0 or not tmp_path.exists():
+        tmp_path.unlink(missing_ok=True)
+        detail = (result.stderr or result.stdout).strip().splitlines()[-1:] or ["no output"]
+        raise ModelError(f"Quantizing failed (exit {result.returncode}): {detail[0]}")
+    os.replace(tmp_path, target)
+    _record_checksum(target, file_digests(target)["sha256"], source=f"quantized from {source.name}", verified=False)
+    return target
+
+
+def file_digests(path: Path) -> Dict[str, str]:
+    """SHA-256 and SHA-1 of a file (read once), as lowercase hex."""
+    digests = {"sha256": hashlib.sha256(), "sha1": hashlib.sha1()}
+    with open(path, "rb") as f:
+        while block := f.read(READ_BYTES):
+            for digest in digests.values():
+                digest.update(block)
+    return {name: digest.hexdigest() for name, digest in digests.items()}
+
+
+def _read_json(path: Path) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_json(path: Path, data: dict) -> None:
+    """Replace a JSON file atomically."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _record_checksum(path: Path, sha256: Optional[str], source: str = "", verified: bool = False) -> None:
+    """Store (or with sha256=None, forget) the hash of a model file in its directory's checksums."""
+    checksums_path = path.parent / CHECKSUMS_FILE
+    checksums = _read_json(checksums_path)
+    if sha256 is None:
+        if checksums.pop(path.name, None) is None:
+            return
+    else:
+        checksums[path.name] = {
+            "sha256": sha256,
+            "size": path.stat().st_size,
+            "source": source,
+            "verified": verified,
+        }
+    _write_json(checksums_path, checksums)
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Surfaces redirects as HTTPError so their headers can be read."""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def probe_url(url: str, timeout: float = 30) -> dict:
+    """
+    Size, range support and published hash of a download.
+
+    Hugging Face answers a model URL with a redirect to its CDN that carries
+    the file's SHA-256 (X-Linked-Etag) and size (X-Linked-Size); the
+    redirect target reports range support.
+
+    Returns:
+        Dict with url (after redirects), size, ranges, sha256 (None unless
+        published) and etag (identifies the file version for resuming)
+    """
+    location = None
+    try:
+        with urllib.request.build_opener(_NoRedirect).open(
+            urllib.request.Request(url, method="HEAD"), timeout=timeout
+        ) as response:
+            headers = response.headers
+    except urllib.error.HTTPError as e:
+        if not 300 <= e.code < 400 or not e.headers.get("Location"):
+            raise
+        headers = e.headers
+        location = urllib.parse.urljoin(url, e.headers["Location"])
+
+    final = headers
+    if location:
+        with urllib.request.urlopen(urllib.request.Request(location, method="HEAD"), timeout=timeout) as response:
+            final = response.headers
+            location = response.url
+
+    linked_etag = (headers.get("X-Linked-Etag") or "").strip('"').lower()
+    size = headers.get("X-Linked-Size") or final.get("Content-Length")
+    return {
+        "url": location or url,
+        "size": int(size) if size else None,
+        "ranges": final.get("Accept-Ranges", "").lower() == "bytes",
+        "sha256": linked_etag if _SHA256_RE.match(linked_etag) else None,
+        "etag": linked_etag or final.get("ETag", ""),
+    }
+
+
+def _download_stream(url: str, part: Path, progress: Optional[ProgressCallback]) -> None:
+    """Download in one request, for servers without range support."""
+    last_error = None
+    for attempt in range(DOWNLOAD_RETRIES):
+        done = 0
+        try:
+            with urllib.request.urlopen(url, timeout=60) as response, open(part, "wb") as f:
+                total = int(response.headers.get("Content-Length") or 0) or None
+                while block := response.read(READ_BYTES):
+                    f.write(block)
+                    done += len(block)
+                    if progress:
+                        progress(done, total)
+            return
+        except NETWORK_ERRORS as e:
+            last_error = e
+            logger.warning(f"Download interrupted ({e}), restarting")
+            time.sleep(min(2 ** attempt, 30))
+    raise ModelError(f"Download failed: {last_error}")
+
+
+class _RangesIgnored(ModelError):
+    """The server answered a ranged request with the whole file."""
+
+
+def _download_chunks(url: str, probe: dict, part: Path, state_path: Path, connections: int,
+                     progress: Optional[ProgressCallback]) -> None:
+    """
+    Download with parallel ranged requests into a preallocated file.
+
+    Finished chunks are listed in state_path, so a later call for the same
+    file version only fetches what is missing.
+    """
+    size = probe["size"]
+    identity = {"url": url, "etag": probe["etag"], "size": size, "chunk_bytes": CHUNK_BYTES}
+    state = _read_json(state_path)
+    if part.exists() and {k: state.get(k) for k in identity} == identity:
+        done = set(state.get("done", []))
+    else:
+        done = set()
+        part.unlink(missing_ok=True)
+
+    chunks = range((size + CHUNK_BYTES - 1) // CHUNK_BYTES)
+    pending = [index for index in chunks if index not in done]
+    if done:
+        logger.info(f"Resuming download: {len(done)}/{len(chunks)} chunks already on disk")
+
+    with open(part, "ab") as f:
+        f.truncate(size)
+    fd = os.open(part, os.O_WRONLY)
+    lock = threading.Lock()
+    failed = threading.Event()  # Stops queued chunks once one has given up
+    received = [sum(min(CHUNK_BYTES, size - index * CHUNK_BYTES) for index in done)]
+
+    def fetch(index: int) -> None:
+        if failed.is_set():
+            return
+        start = index * CHUNK_BYTES
+        end = min(start + CHUNK_BYTES, size) - 1
+        last_error = None
+        for attempt in range(DOWNLOAD_RETRIES):
+            offset = start
+            try:
+                request = urllib.request.Request(probe["url"], headers={"Range": f"bytes={start}-{end}"})
+                with urllib.request.urlopen(request, timeout=60) as response:
+                    if response.status != 206:
+                        failed.set()
+                        raise _RangesIgnored("Server ignored the range request")
+                    while offset <= end:
+                        block = response.read(min(READ_BYTES, end + 1 - offset))
+                        if not block:
+                            raise OSError("connection closed early")
+                        os.pwrite(fd, block, offset)
+                        offset += len(block)
+                        with lock:
+                            received[0] += len(block)
+                            if progress:
+                                progress(received[0], size)
+                with lock:
+                    done.add(index)
+                    _write_json(state_path, {**identity, "done": sorted(done)})
+                return
+            except NETWORK_ERRORS as e:
+                with lock:
+                    received[0] -= offset - start
+                last_error = e
+                time.sleep(min(2 ** attempt, 30))
+        failed.set()
+        raise ModelError(f"Download failed at byte {start}: {last_error}")
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(connections, 1)) as pool:
+            list(pool.map(fetch, pending))
+    finally:
+        os.close(fd)
+
+
+def _local_source(source: str) -> Optional[Path]:
+    """Path of a local mirror (directory, file or file:// URL); None for remote URLs."""
+    if source.startswith("file://"):
+        return Path(urllib.request.url2pathname(urllib.parse.urlparse(source).path))
+    if "://" in source:
+        return None
+    return Path(source).expanduser()
+
+
+def _import_file(path: Path, part: Path, progress: Optional[ProgressCallback]) -> Dict[str, str]:
+    """Copy a local model file to part, returning its digests (as file_digests)."""
+    digests = {"sha256": hashlib.sha256(), "sha1": hashlib.sha1()}
+    total = path.stat().st_size
+    done = 0
+    with open(path, "rb") as src, open(part, "wb") as dst:
+        while block := src.read(READ_BYTES):
+            for digest in digests.values():
+                digest.update(block)
+            dst.write(block)
+            done += len(block)
+            if progress:
+                progress(done, total)
+    return {name: digest.hexdigest() for name, digest in digests.items()}
+
+
+def pull_model(config: Config, model: str, source: Optional[str] = None,
+               connections: int = DOWNLOAD_CONNECTIONS,
+               progress: Optional[ProgressCallback] = None) -> Path:
+    """
+    Download a model into the models directory, verify it and move it into place.
+
+    Downloads run as parallel ranged requests and resume after an
+    interruption (the partial file is kept as "<file>.part"). The result
+    is checked against the SHA-1 the registry pins and the SHA-256 the
+    download server (or a local mirror's checksums.json) publishes, and
+    only renamed to its final name once they match. Quantized variants
+    without a pinned hash are never fetched; they are made from their
+    full-precision model, which is pulled first if needed.
+
+    Args:
+        config: Configuration (models_dir, model_mirror)
+        model: Registry name, e.g. "large-v3" or "medium-q5_0"
+        source: Mirror to use instead of Hugging Face: a directory, a
+            model file, a file:// URL or an http(s) base URL. Defaults to
+            config.model_mirror. A local mirror's checksums.json is used to
+            verify the copy.
+        connections: Parallel requests for HTTP downloads
+        progress: Called with (bytes done, total bytes or None)
+
+    Returns:
+        Path of the model file
+
+    Raises:
+        ModelError: If the model is unknown, the download failed or the
+            file does not match its checksum
+    """
+    info = WHISPER_MODELS.get(model)
+    if not info:
+        raise ModelError(f"Unknown model: {model}")
+    if not config.models_dir:
+        raise ModelError("No models directory configured; run setup first")
+    target = config.get_model_path(model)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    part = target.with_name(target.name + ".part")
+    state_path = target.with_name(target.name + ".part.json")
+    source = source or config.model_mirror or None
+    if info["url"] is None:
+        return _pull_and_quantize(config, model, source, connections, progress)
+
+    local = _local_source(source) if source else None
+    if local is not None:
+        path = local / info["file"] if local.is_dir() else local
+        if not path.exists():
+            raise ModelError(f"{info['file']} not found in {local}")
+        logger.info(f"Importing {path}")
+        digests = _import_file(path, part, progress)
+        recorded = _read_json(path.parent / CHECKSUMS_FILE).get(info["file"], {})
+        published = recorded.get("sha256")
+        origin = str(path)
+    else:
+        url = info["url"] if not source else (
+            source if source.endswith(".bin") else f"{source.rstrip('/')}/{info['file']}"
+        )
+        try:
+            probe = probe_url(url)
+        except urllib.error.HTTPError as e:
+            raise ModelError(f"Cannot download {url}: {e}")
+        except NETWORK_ERRORS as e:
+            raise ModelError(f"Cannot reach {url}: {e}")
+        if probe["size"]:
+            have = part.stat().st_size if part.exists() else 0
+            free = shutil.disk_usage(target.parent).free
+            if probe["size"] - have > free:
+                raise ModelError(f"Not enough disk space for {info['file']} "
+                                 f"({probe['size'] / 1024 ** 2:.0f}MB needed, {free / 1024 ** 2:.0f}MB free)")
+        logger.info(f"Downloading {url}")
+        if probe["size"] and probe["ranges"]:
+            try:
+                _download_chunks(url, probe, part, state_path, connections, progress)
+            except _RangesIgnored as e:
+                # Advertised Accept-Ranges but answered with the whole file
+                logger.warning(f"{e}, downloading in a single stream")
+                state_path.unlink(missing_ok=True)
+                _download_stream(probe["url"], part, progress)
+        else:
+            _download_stream(probe["url"], part, progress)
+        digests = file_digests(part)
+        published = probe["sha256"]
+        origin = url
+
+    references = {"sha1": info.get("sha1"), "sha256": published}
+    for name, expected in references.items():
+        if expected and digests[name] != expected:
+            part.unlink(missing_ok=True)
+            state_path.unlink(missing_ok=True)
+            raise ModelError(f"Checksum mismatch for {info['file']}: expected {name} {expected}, "
+                             f"got {digests[name]}")
+    os.replace(part, target)
+    state_path.unlink(missing_ok=True)
+    _record_checksum(target, digests["sha256"], source=origin, verified=any(references.values()))
+    return target
+
+
+def _pull_and_quantize(config: Config, model: str, source: Optional[str], connections: int,
+                       progress: Optional[ProgressCallback]) -> Path:
+    """Make an unpublished quantized variant, pulling its full-precision model if needed."""
+    base_model = WHISPER_MODELS[model]["base_model"]
+    base_path = config.get_model_path(base_model)
+    if not base_path.exists():
+        pull_model(config, base_model, source, connections, progress)
+    return quantize_model(config, model)
+
+
+def verify_model(config: Config, model: str, online: bool = False) -> dict:
+    """
+    Check a downloaded model against its known checksum.
+
+    The reference is the registry's pinned SHA-1, else the SHA-256 recorded
+    when the file was pulled, else (with online=True) the SHA-256 published
+    for its download URL.
+
+    Returns:
+        Dict with model, status ("ok", "mismatch", "unknown" when no
+        reference hash exists, or "missing"), sha256, actual and expected
+        (the file's and the reference's digest of the compared kind),
+        source and verified (False when the reference is only the hash
+        recorded at pull time, because the source published none)
+    """
+    info = WHISPER_MODELS[model]
+    path = config.get_model_path(model)
+    if path is None or not path.exists():
+        return {"model": model, "status": "missing"}
+
+    recorded = _read_json(path.parent / CHECKSUMS_FILE).get(path.name, {})
+    kind = "sha1" if info.get("sha1") else "sha256"
+    expected = info.get("sha1") or recorded.get("sha256")
+    source = "registry" if info.get("sha1") else recorded.get("source")
+    verified = bool(info.get("sha1")) or recorded.get("verified", False)
+    if not verified and online and info["url"]:
+        try:
+            published = probe_url(info["url"])["sha256"]
+        except NETWORK_ERRORS as e:
+            logger.warning(f"Cannot fetch the checksum of {model}: {e}")
+            published = None
+        if published:
+            expected, source, verified = published, info["url"], True
+
+    digests = file_digests(path)
+    actual = digests[kind]
+    if expected is None:
+        status = "unknown"
+    else:
+        status = "ok" if actual == expected else "mismatch"
+        if status == "ok" and verified and not recorded.get("verified"):
+            _record_checksum(path, digests["sha256"], source=source, verified=True)
+    return {"model": model, "status": status, "sha256": digests["sha256"], "actual": actual,
+            "expected": expected, "source": source, "verified": verified}
+
+
+def models_in_use(config: Config) -> List[str]:
+    """Models the current config can load."""
+    used = [config.model]
+    if config.model_selection == "adaptive":
+        used += config.adaptive_models
+    if config.speculative_draft:
+        used.append(config.draft_model)
+    return list(dict.fromkeys(used))
+
+
+def prune_models(config: Config, keep: Iterable[str], dry_run: bool = False) -> List[Tuple[Path, int]]:
+    """
+    Delete partial downloads and registry model files not in keep.
+
+    Files the registry does not know (e.g. whisper.cpp's test models) are
+    never touched.
+
+    Returns:
+        The deleted (or with dry_run, deletable) files and their sizes
+    """
+    if not config.models_dir or not Path(config.models_dir).is_dir():
+        return []
+    directory = Path(config.models_dir)
+    kept = {WHISPER_MODELS[name]["file"] for name in keep if name in WHISPER_MODELS}
+    model_files = {info["file"] for info in WHISPER_MODELS.values()}
+    partial = tuple(f"{name}{suffix}" for name in model_files for suffix in (".part", ".part.json", ".tmp"))
+
+    victims = sorted(
+        path for path in directory.iterdir()
+        if path.name.endswith(partial) or (path.name in model_files and path.name not in kept)
+    )
+    removed = [(path, path.stat().st_size) for path in victims]
+    if not dry_run:
+        for path in victims:
+            path.unlink(missing_ok=True)
+            if path.name in model_files:
+                _record_checksum(path, None)
+    return removed
+
+
+def print_progress(done: int, total: Optional[int]) -> None:
+    """Progress callback that redraws one terminal line."""
+    if total:
+        line = f"  {done / 1024 ** 2:.0f}/{total / 1024 ** 2:.0f}MB ({done / total:.0%})"
+    else:
+        line = f"  {done / 1024 ** 2:.0f}MB"
+    sys.stdout.write("\r" + line)
+    if total and done >= total:
+        sys.stdout.write("\n")
+    sys.stdout.flush()
+
+
+def model_report(config: Config) -> List[dict]:
+    """
+    Size and measured speed of every registry model, least to most accurate.
+
+    Sizes are taken from disk for downloaded models. Speed comes from the
+    model selector's measurements of real dictations; models never used
+    have none.
+    """
+    speed = ModelSelector(WHISPER_MODELS).summary()
+    report = []
+    for name, info in WHISPER_MODELS.items():
+        path = config.get_model_path(name)
+        downloaded = path is not None and path.exists()
+        report.append({
+            "model": name,
+            "quantization": info.get("quantization"),
+            "downloaded": downloaded,
+            "size_bytes": path.stat().st_size if downloaded else None,
+            "expected_size": info["size"],
+            "published": info["url"] is not None,
+            "speed": speed.get(name),
+        })
+    return report
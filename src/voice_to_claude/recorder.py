@@ -1,50 +1,157 @@
 """Audio recording functionality."""
 
+import logging
 import tempfile
+import threading
+import time
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional
 
 import numpy as np
 import sounddevice as sd
 from scipy.io import wavfile
 
+from .audio import PolyphaseResampler, RingBuffer, to_int16
 from .config import SAMPLE_RATE
 
+logger = logging.getLogger(__name__)
+
 
 class AudioRecorder:
-    """Records audio from the default microphone."""
+    """
+    Records 16-bit audio from the default microphone.
+
+    The device is opened at its native rate (PortAudio delivers int16, so
+    there is no float conversion) and each block is resampled to sample_rate
+    in the audio callback, straight into the recording buffer. Recordings are
+    int16 at sample_rate and ready for whisper as they are.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        max_seconds: int = 60,
+        keep_stream_open: bool = False,
+        preroll_seconds: float = 0.3,
+        idle_timeout: float = 300,
+        capture_rate: int = 0,
+    ):
+        """
+        Initialize recorder.
 
-    def __init__(self, sample_rate: int = SAMPLE_RATE, max_seconds: int = 60):
+        Args:
+            sample_rate: Sample rate of the recordings
+            max_seconds: Capacity of the recording buffer
+            keep_stream_open: Keep the input stream open between recordings so
+                start() does not pay for opening the device
+            preroll_seconds: Audio from just before start() included in the
+                recording when the stream is kept open
+            idle_timeout: Seconds without a recording before a kept-open
+                stream is closed to save power
+            capture_rate: Rate to open the microphone at; 0 uses the
+                device's native rate. Falls back to the native rate, then
+                sample_rate, if the device rejects it.
+        """
         self.sample_rate = sample_rate
+        self.capture_rate = capture_rate
+        self.stream_rate = sample_rate  # Rate of the open stream
+        self._resampler: Optional[PolyphaseResampler] = None
         self.max_seconds = max_seconds
+        self.keep_stream_open = keep_stream_open
+        self.idle_timeout = idle_timeout
         self.is_recording = False
-        self.audio_data: List[np.ndarray] = []
+        # Preallocated so the audio callback never allocates
+        self.buffer = RingBuffer(max_seconds * sample_rate, dtype=np.int16)
+        self.preroll: Optional[RingBuffer] = (
+            RingBuffer(int(preroll_seconds * sample_rate), dtype=np.int16)
+            if keep_stream_open and preroll_seconds > 0 else None
+        )
+        self._buffer_handed_out = False
+        self._pending_preroll = False
+        self._mute_until = 0.0
+        self._silence = np.zeros(4096, dtype=np.int16)
+        self._idle_timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
         self.stream: Optional[sd.InputStream] = None
 
-    def _audio_callback(self, indata: np.ndarray, frames: int, time_info, status) -> None:
-        """Callback for audio stream."""
-        if self.is_recording:
-            self.audio_data.append(indata.copy())
+    @property
+    def frames_recorded(self) -> int:
+        """Number of frames captured since recording started."""
+        return self.buffer.write_pos
 
-    def start(self) -> bool:
-        """Start recording audio. Returns True if successful."""
+    def mute_until(self, deadline: float) -> None:
+        """
+        Record silence instead of input captured before deadline.
+
+        Used while an audio cue plays so the speakers are not recorded.
+
+        Args:
+            deadline: time.monotonic() value when the cue has finished
+        """
+        self._mute_until = max(self._mute_until, deadline)
+
+    def _audio_callback(self, indata: np.ndarray, frames: int, time_info, status) -> None:
+        """Callback for audio stream (runs on the PortAudio thread)."""
+        if not self.is_recording and self.preroll is None:
+            return
+        block = indata[:, 0]
+        if self._mute_until and time.monotonic() - frames / self.stream_rate < self._mute_until:
+            if frames > len(self._silence):
+                self._silence = np.zeros(frames, dtype=np.int16)
+            block = self._silence[:frames]
+        if self._resampler is not None:
+            block = self._resampler.process(block)
         if self.is_recording:
-            return False
+            if self._pending_preroll:
+                # First block of a recording: prepend the audio from just before the press
+                self._pending_preroll = False
+                if self.preroll is not None:
+                    self.preroll.drain_into(self.buffer)
+            self.buffer.write(block)
+        elif self.preroll is not None:
+            self.preroll.write(block)
 
-        self.is_recording = True
-        self.audio_data = []
+    def _choose_stream_rate(self) -> int:
+        """First of the configured, native and output rates the device accepts."""
+        candidates = [self.capture_rate] if self.capture_rate else []
+        try:
+            candidates.append(int(sd.query_devices(kind="input")["default_samplerate"]))
+        except (sd.PortAudioError, KeyError, TypeError, ValueError):
+            pass
+        candidates.append(self.sample_rate)
+        for rate in dict.fromkeys(candidates):
+            try:
+                sd.check_input_settings(samplerate=rate, channels=1, dtype="int16")
+                return rate
+            except (sd.PortAudioError, ValueError):
+                logger.debug(f"Microphone rejects {rate} Hz")
+        # Let opening the stream report the error
+        return self.sample_rate
 
+    def _open_stream(self) -> None:
+        """Open and start the input stream if it is not already open."""
+        if self.stream is not None:
+            return
         try:
-            self.stream = sd.InputStream(
-                samplerate=self.sample_rate,
+            rate = self._choose_stream_rate()
+            if rate != self.sample_rate:
+                if self._resampler is None or self._resampler.in_rate != rate:
+                    self._resampler = PolyphaseResampler(rate, self.sample_rate)
+                else:
+                    self._resampler.reset()
+                logger.info(f"Microphone open at {rate} Hz, resampling to {self.sample_rate} Hz")
+            else:
+                self._resampler = None
+            self.stream_rate = rate
+            stream = sd.InputStream(
+                samplerate=rate,
                 channels=1,
-                dtype=np.float32,
+                dtype="int16",
                 callback=self._audio_callback
             )
-            self.stream.start()
-            return True
+            stream.start()
+            self.stream = stream
         except sd.PortAudioError as e:
-            self.is_recording = False
             raise MicrophoneError(
                 f"Microphone error: {e}\n\n"
                 "Please grant Microphone permission:\n"
@@ -53,27 +160,105 @@ class AudioRecorder:
                 "Then restart the daemon."
             )
         except Exception as e:
-            self.is_recording = False
             raise RecordingError(f"Error starting recording: {e}")
 
-    def stop(self) -> Optional[np.ndarray]:
-        """Stop recording and return audio data. Returns None if no audio."""
-        if not self.is_recording:
-            return None
-
-        self.is_recording = False
-
-        # Stop and close stream
+    def _close_stream(self) -> None:
+        """Stop and close the input stream."""
         if self.stream:
             self.stream.stop()
             self.stream.close()
             self.stream = None
+        if self.preroll is not None:
+            self.preroll.clear()
+
+    def _schedule_idle_close(self) -> None:
+        """(Re)arm the timer that closes a kept-open stream when idle."""
+        if self._idle_timer:
+            self._idle_timer.cancel()
+        self._idle_timer = threading.Timer(self.idle_timeout, self._close_if_idle)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    def _close_if_idle(self) -> None:
+        """Close the kept-open stream unless a recording is in progress."""
+        with self._lock:
+            if not self.is_recording:
+                self._close_stream()
+
+    def open_stream(self) -> None:
+        """Pre-open the input stream so the next start() captures immediately."""
+        with self._lock:
+            self._open_stream()
+            if self.keep_stream_open:
+                self._schedule_idle_close()
+
+    def start(self) -> bool:
+        """Start recording audio. Returns True if successful."""
+        with self._lock:
+            if self.is_recording:
+                return False
+
+            if self._idle_timer:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+
+            if self._buffer_handed_out:
+                # The last recording's view may still be in use by a transcription
+                self.buffer = RingBuffer(self.buffer.capacity, dtype=self.buffer.data.dtype)
+                self._buffer_handed_out = False
+            else:
+                self.buffer.clear()
+
+            self._pending_preroll = self.stream is not None
+            self.is_recording = True
+
+            try:
+                self._open_stream()
+                return True
+            except RecordingError:
+                self.is_recording = False
+                raise
+
+    def stop(self) -> Optional[np.ndarray]:
+        """
+        Stop recording and return audio data. Returns None if no audio.
+
+        Recordings longer than max_seconds keep only the last max_seconds.
+        """
+        with self._lock:
+            if not self.is_recording:
+                return None
+
+            self.is_recording = False
+
+            if self.keep_stream_open:
+                self._schedule_idle_close()
+            else:
+                self._close_stream()
+
+            if self.buffer.write_pos == 0:
+                return None
+
+            # Zero-copy view of the buffer; the next start() allocates a fresh one
+            self._buffer_handed_out = True
+            return self.buffer.view()
+
+    def close(self) -> None:
+        """Close the input stream, including a kept-open one."""
+        with self._lock:
+            if self._idle_timer:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+            self.is_recording = False
+            self._close_stream()
 
-        # Return concatenated audio
-        if not self.audio_data:
-            return None
+    def read(self, start: int, end: int) -> np.ndarray:
+        """
+        Read frames [start, end) captured so far, while recording continues.
 
-        return np.concatenate(self.audio_data)
+        Used by streaming transcription to decode completed windows.
+        """
+        return self.buffer.read(start, end)
 
     def save_to_wav(self, audio: np.ndarray, path: Optional[Path] = None) -> Path:
         """Save audio data to a WAV file. Returns the path."""
@@ -82,9 +267,8 @@ class AudioRecorder:
             fd, temp_path = tempfile.mkstemp(suffix=".wav")
             path = Path(temp_path)
 
-        # Convert to int16 for WAV
-        audio_int16 = (audio * 32767).astype(np.int16)
-        wavfile.write(str(path), self.sample_rate, audio_int16)
+        # Recordings are already int16; float input is converted
+        wavfile.write(str(path), self.sample_rate, to_int16(audio))
         return path
 
     def get_duration(self, audio: np.ndarray) -> float:
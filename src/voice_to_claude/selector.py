@@ -0,0 +1,221 @@
+"""Per-utterance model selection from measured decode latency."""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .config import DEFAULT_MODEL_STATS_FILE, WHISPER_MODELS, ensure_config_dir
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest measurement in the running estimates
+DECAY = 0.8
+
+# Latency of "base" assumed before anything is measured. whisper encodes a
+# fixed 30 s window, so most of the cost is per call rather than per second.
+DEFAULT_BASE_OVERHEAD = 0.3
+DEFAULT_BASE_RTF = 0.02
+
+# Model load seconds assumed for "base" before anything is measured
+DEFAULT_BASE_LOAD = 0.3
+
+
+class ModelStats:
+    """
+    Running latency model for one whisper model.
+
+    Fits decode_seconds = overhead + rtf * audio_seconds by exponentially
+    weighted least squares, so recent measurements count most and the fit
+    adapts when the machine, build or settings change.
+    """
+
+    def __init__(self, data: Optional[dict] = None):
+        data = data or {}
+        self.w = data.get("w", 0.0)
+        self.sx = data.get("sx", 0.0)
+        self.sy = data.get("sy", 0.0)
+        self.sxx = data.get("sxx", 0.0)
+        self.sxy = data.get("sxy", 0.0)
+        self.samples = data.get("samples", 0)
+        self.load_seconds = data.get("load_seconds")
+
+    def to_dict(self) -> dict:
+        return {
+            "w": self.w, "sx": self.sx, "sy": self.sy, "sxx": self.sxx, "sxy": self.sxy,
+            "samples": self.samples, "load_seconds": self.load_seconds,
+        }
+
+    def add(self, audio_seconds: float, decode_seconds: float) -> None:
+        """Add one measurement."""
+        self.w = self.w * DECAY + 1
+        self.sx = self.sx * DECAY + audio_seconds
+        self.sy = self.sy * DECAY + decode_seconds
+        self.sxx = self.sxx * DECAY + audio_seconds * audio_seconds
+        self.sxy = self.sxy * DECAY + audio_seconds * decode_seconds
+        self.samples += 1
+
+    def add_load(self, load_seconds: float) -> None:
+        """Add one model load time measurement."""
+        if self.load_seconds is None:
+            self.load_seconds = load_seconds
+        else:
+            self.load_seconds = DECAY * self.load_seconds + (1 - DECAY) * load_seconds
+
+    def fit(self, prior: Tuple[float, float]):
+        """
+        Return (overhead, rtf), or None without measurements.
+
+        Until clip lengths vary enough for a regression, the prior's shape is
+        scaled to match the measured mean latency.
+        """
+        if self.w <= 0 or self.sx <= 0:
+            return None
+        denom = self.w * self.sxx - self.sx * self.sx
+        if self.samples >= 3 and denom > 1e-9:
+            rtf = (self.w * self.sxy - self.sx * self.sy) / denom
+            overhead = (self.sy - rtf * self.sx) / self.w
+            if rtf >= 0 and overhead >= 0:
+                return overhead, rtf
+        scale = self.sy / (prior[0] * self.w + prior[1] * self.sx)
+        return prior[0] * scale, prior[1] * scale
+
+
+class ModelSelector:
+    """
+    Picks the most accurate model expected to finish within the latency budget.
+
+    The budget is ``budget_seconds + budget_per_audio_second * audio_seconds``,
+    so short commands must come back quickly while long dictation may use a
+    bigger model. Models already resident in a whisper-server cost no load
+    time; others are charged their measured (or estimated) load time.
+    """
+
+    def __init__(
+        self,
+        candidates: Iterable[str],
+        budget_seconds: float = 1.0,
+        budget_per_audio_second: float = 0.1,
+        stats_file: Path = DEFAULT_MODEL_STATS_FILE,
+    ):
+        # Registry order is smallest/fastest to largest/most accurate
+        order = list(WHISPER_MODELS)
+        self.candidates = sorted(
+            (m for m in candidates if m in WHISPER_MODELS), key=order.index
+        )
+        self.budget_seconds = budget_seconds
+        self.budget_per_audio_second = budget_per_audio_second
+        self.stats_file = Path(stats_file)
+        self._lock = threading.Lock()
+        self.stats: Dict[str, ModelStats] = self._load()
+
+    def _load(self) -> Dict[str, ModelStats]:
+        try:
+            data = json.loads(self.stats_file.read_text())
+        except (OSError, ValueError):
+            return {}
+        return {model: ModelStats(entry) for model, entry in data.items()}
+
+    def _save(self) -> None:
+        try:
+            ensure_config_dir()
+            tmp_path = self.stats_file.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps({m: s.to_dict() for m, s in self.stats.items()}, indent=2))
+            os.replace(tmp_path, self.stats_file)
+        except OSError as e:
+            logger.warning(f"Failed to save model stats: {e}")
+
+    def record(self, model: str, audio_seconds: float, decode_seconds: float,
+               load_seconds: Optional[float] = None) -> None:
+        """Record a measured decode (and, for cold loads, the model load time)."""
+        if audio_seconds <= 0 or decode_seconds <= 0:
+            return
+        with self._lock:
+            stats = self.stats.setdefault(model, ModelStats())
+            stats.add(audio_seconds, decode_seconds)
+            if load_seconds:
+                stats.add_load(load_seconds)
+            self._save()
+
+    def _relative_cost(self, model: str) -> float:
+        return WHISPER_MODELS.get(model, {}).get("relative_cost", 1.0)
+
+    def _prior(self, model: str) -> Tuple[float, float]:
+        """Registry-based (overhead, rtf) estimate, relative to "base"."""
+        scale = self._relative_cost(model) / self._relative_cost("base")
+        return DEFAULT_BASE_OVERHEAD * scale, DEFAULT_BASE_RTF * scale
+
+    def _fit(self, model: str) -> Tuple[float, float]:
+        """
+        (overhead, rtf) for a model: fitted from its own measurements, else
+        scaled from another measured model, else the registry prior.
+        """
+        stats = self.stats.get(model)
+        fit = stats.fit(self._prior(model)) if stats else None
+        if fit:
+            return fit
+        for other, other_stats in self.stats.items():
+            if other not in WHISPER_MODELS:
+                continue
+            other_fit = other_stats.fit(self._prior(other))
+            if other_fit:
+                scale = self._relative_cost(model) / self._relative_cost(other)
+                return other_fit[0] * scale, other_fit[1] * scale
+        return self._prior(model)
+
+    def predict(self, model: str, audio_seconds: float, resident: bool = False) -> float:
+        """Predicted seconds to transcribe audio_seconds with model."""
+        stats = self.stats.get(model)
+        overhead, rtf = self._fit(model)
+        latency = overhead + rtf * audio_seconds
+        if not resident:
+            load = stats.load_seconds if stats and stats.load_seconds is not None else None
+            if load is None:
+                load = DEFAULT_BASE_LOAD * self._relative_cost(model) / self._relative_cost("base")
+            latency += load
+        return latency
+
+    def budget(self, audio_seconds: float) -> float:
+        return self.budget_seconds + self.budget_per_audio_second * audio_seconds
+
+    def choose(self, audio_seconds: float, available: Iterable[str],
+               resident: Iterable[str] = ()) -> Optional[str]:
+        """
+        Choose a model for a clip.
+
+        Args:
+            audio_seconds: Length of the clip to transcribe
+            available: Models that are downloaded
+            resident: Models loaded in a ready whisper-server
+
+        Returns:
+            The most accurate model predicted to meet the budget, else the fastest one
+        """
+        available = set(available)
+        resident = set(resident)
+        candidates: List[str] = [m for m in self.candidates if m in available]
+        if not candidates:
+            return None
+
+        budget = self.budget(audio_seconds)
+        for model in reversed(candidates):
+            if self.predict(model, audio_seconds, model in resident) <= budget:
+                return model
+        return min(candidates, key=lambda m: self.predict(m, audio_seconds, m in resident))
+
+    def summary(self) -> Dict[str, dict]:
+        """Measured speed per model for status output."""
+        result = {}
+        for model, stats in self.stats.items():
+            fit = stats.fit(self._prior(model))
+            if not fit:
+                continue
+            result[model] = {
+                "samples": stats.samples,
+                "overhead_seconds": round(fit[0], 3),
+                "rtf": round(fit[1], 4),
+                "load_seconds": round(stats.load_seconds, 3) if stats.load_seconds is not None else None,
+            }
+        return result
@@ -0,0 +1,329 @@
+"""Persistent whisper.cpp server backend.
+
+Runs whisper.cpp's ``whisper-server`` as a long-lived child process so the
+GGML model is loaded once instead of on every dictation.
+"""
+
+import json
+import logging
+import socket
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import OrderedDict
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .config import Config, DEFAULT_SERVER_LOG_FILE, ensure_config_dir
+
+logger = logging.getLogger(__name__)
+
+
+class ServerError(Exception):
+    """Error talking to the whisper server."""
+    pass
+
+
+def _find_free_port(host: str) -> int:
+    """Ask the OS for a free TCP port on host."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def _encode_multipart(fields: dict, file_field: str, filename: str, data: bytes):
+    """Encode form fields and one file as multipart/form-data."""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+            f"{value}\r\n".encode("utf-8")
+        )
+    parts.append(
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+        "Content-Type: audio/wav\r\n\r\n".encode("utf-8")
+    )
+    parts.append(data)
+    parts.append(f"\r\n--{boundary}--\r\n".encode("utf-8"))
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+class WhisperServer:
+    """Owns a whisper-server process that keeps the model resident."""
+
+    def __init__(
+        self,
+        server_path: Path,
+        model_path: Path,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        extra_args: Optional[List[str]] = None,
+        startup_timeout: float = 60.0,
+        max_restarts: int = 3,
+    ):
+        self.server_path = server_path
+        self.model_path = model_path
+        self.host = host
+        self.port = port
+        self.extra_args = extra_args or []
+        self.startup_timeout = startup_timeout
+        self.max_restarts = max_restarts
+
+        self.process: Optional[subprocess.Popen] = None
+        self.restart_count = 0
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._starting = False
+
+    @classmethod
+    def from_config(cls, config: Config) -> Optional["WhisperServer"]:
+        """Create a server for the configured model, or None if unavailable."""
+        if not config.use_server:
+            return None
+        server_path = config.get_whisper_server()
+        model_path = config.get_model_path()
+        if not server_path or not server_path.exists():
+            return None
+        if not model_path or not model_path.exists():
+            return None
+        # No clip length applies to a server, so audio_ctx is never passed
+        return cls(server_path, model_path, extra_args=config.get_decode_args())
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def is_running(self) -> bool:
+        """Check if the server process is alive."""
+        return self.process is not None and self.process.poll() is None
+
+    def is_ready(self) -> bool:
+        """Check if the server is alive and has finished loading the model."""
+        return self._ready.is_set() and self.is_running()
+
+    def start(self) -> bool:
+        """Start the server and wait until the model is loaded. Returns True if ready."""
+        try:
+            return self._start()
+        finally:
+            # Also set by start_async; every way out of a start must clear it
+            self._starting = False
+
+    def _start(self) -> bool:
+        with self._lock:
+            if self.is_ready():
+                return True
+            self._terminate()
+            self._starting = True
+
+            port = self.port or _find_free_port(self.host)
+            cmd = [
+                str(self.server_path),
+                "-m", str(self.model_path),
+                "--host", self.host,
+                "--port", str(port),
+                *self.extra_args,
+            ]
+
+            try:
+                ensure_config_dir()
+                with open(DEFAULT_SERVER_LOG_FILE, "a") as log_file:
+                    self.process = subprocess.Popen(
+                        cmd,
+                        stdin=subprocess.DEVNULL,
+                        stdout=log_file,
+                        stderr=log_file,
+                    )
+            except OSError as e:
+                logger.warning(f"Failed to launch whisper-server: {e}")
+                self.process = None
+                return False
+            self.port = port
+
+        ready = self._wait_until_ready()
+        if ready:
+            self._ready.set()
+            logger.info(f"whisper-server ready on {self.url} (model: {self.model_path.name})")
+        else:
+            logger.warning(f"whisper-server failed to become ready. Check {DEFAULT_SERVER_LOG_FILE}")
+            with self._lock:
+                self._terminate()
+        return ready
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until a (possibly background) start has loaded the model."""
+        if not self._ready.wait(self.startup_timeout if timeout is None else timeout):
+            return False
+        return self.is_running()
+
+    def start_async(self) -> None:
+        """Start the server in a background thread."""
+        if self._starting:
+            return
+        self._starting = True
+        threading.Thread(target=self.start, daemon=True).start()
+
+    def _wait_until_ready(self) -> bool:
+        """Poll the server until it answers or the process exits."""
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if not self.is_running():
+                return False
+            try:
+                with urllib.request.urlopen(f"{self.url}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return True
+            except urllib.error.HTTPError as e:
+                # Older servers have no /health route; any HTTP answer means it is listening.
+                # 503 means the model is still loading.
+                if e.code != 503:
+                    return True
+            except (urllib.error.URLError, OSError):
+                pass
+            time.sleep(0.05)
+        return False
+
+    def ensure_running(self) -> bool:
+        """
+        Return True if the server can take a request right now.
+
+        If the process has crashed, a restart is kicked off in the background
+        (up to max_restarts times) and False is returned so the caller can fall
+        back to the one-shot CLI.
+        """
+        if self.is_ready():
+            return True
+        if self._starting:
+            return False
+        if self.process is not None and not self.is_running():
+            self._ready.clear()
+            if self.restart_count >= self.max_restarts:
+                return False
+            self.restart_count += 1
+            logger.warning(
+                f"whisper-server exited (code {self.process.returncode}), "
+                f"restarting ({self.restart_count}/{self.max_restarts})"
+            )
+            self.start_async()
+        return False
+
+    def transcribe(self, audio_path: Path, timeout: float = 120) -> str:
+        """Transcribe a WAV file. Raises ServerError on failure."""
+        return self.transcribe_bytes(Path(audio_path).read_bytes(), timeout=timeout)
+
+    def transcribe_bytes(self, wav_data: bytes, timeout: float = 120) -> str:
+        """Transcribe in-memory WAV data. Raises ServerError on failure."""
+        if not self.is_ready():
+            raise ServerError("whisper-server is not running")
+
+        body, content_type = _encode_multipart(
+            {"response_format": "json", "temperature": "0.0"},
+            "file", "audio.wav", wav_data,
+        )
+        request = urllib.request.Request(
+            f"{self.url}/inference",
+            data=body,
+            headers={"Content-Type": content_type},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                payload = json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            raise ServerError(f"whisper-server returned HTTP {e.code}")
+        except (urllib.error.URLError, OSError) as e:
+            # Connection refused or reset usually means the process died.
+            if not self.is_running():
+                self._ready.clear()
+            raise ServerError(f"whisper-server request failed: {e}")
+        except json.JSONDecodeError as e:
+            raise ServerError(f"Invalid response from whisper-server: {e}")
+
+        if "error" in payload:
+            raise ServerError(f"whisper-server error: {payload['error']}")
+        return payload.get("text", "")
+
+    def _terminate(self) -> None:
+        """Terminate the process (caller holds the lock)."""
+        self._ready.clear()
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+
+    def stop(self) -> None:
+        """Stop the server."""
+        with self._lock:
+            self._terminate()
+
+
+class ServerPool:
+    """
+    Resident whisper-servers for several models, least recently used evicted.
+
+    Lets the daemon switch models per utterance without reloading: up to
+    ``max_resident`` servers stay loaded at once. The configured default
+    model is never evicted.
+    """
+
+    def __init__(self, config: Config, max_resident: int = 2):
+        self.config = config
+        self.max_resident = max(max_resident, 1)
+        self.servers: "OrderedDict[str, WhisperServer]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, model: Optional[str] = None, start: bool = True) -> Optional[WhisperServer]:
+        """
+        Return the server for model (the configured one by default).
+
+        A new server is started in the background unless start is False;
+        callers fall back to the CLI until it is ready. Returns None if no
+        server can run this model.
+        """
+        model = model or self.config.model
+        with self._lock:
+            server = self.servers.get(model)
+            if server is not None:
+                self.servers.move_to_end(model)
+                return server
+
+            server = WhisperServer.from_config(replace(self.config, model=model))
+            if server is None:
+                return None
+            while len(self.servers) >= self.max_resident:
+                evictable = [m for m in self.servers if m != self.config.model]
+                if not evictable:
+                    # No room next to the default model; use the CLI for this one
+                    return None
+                logger.info(f"Unloading whisper-server for model {evictable[0]}")
+                self.servers.pop(evictable[0]).stop()
+            self.servers[model] = server
+        if start:
+            server.start_async()
+        return server
+
+    def ready_models(self) -> List[str]:
+        """Models whose server can take a request right now."""
+        with self._lock:
+            return [model for model, server in self.servers.items() if server.is_ready()]
+
+    def stop(self) -> None:
+        """Stop all servers."""
+        with self._lock:
+            servers: Dict[str, WhisperServer] = dict(self.servers)
+            self.servers.clear()
+        for server in servers.values():
+            server.stop()
@@ -4,12 +4,19 @@ Builds whisper.cpp, downloads model, configures daemon.
 """
 
 import argparse
+import ctypes.util
+import glob
 import json
 import os
+import platform
+import shutil
 import subprocess
 import sys
 from pathlib import Path
 
+from .config import Config, WHISPER_MODELS
+from .models import ModelError, print_progress, pull_model
+
 
 def _get_plugin_root() -> Path:
     env_root = os.environ.get("CLAUDE_PLUGIN_ROOT")
@@ -26,6 +33,27 @@ CONFIG_FILE = CONFIG_DIR / "config.json"
 WHISPER_DIR = INSTALL_DIR / "whisper.cpp"
 PLUGIN_ROOT = _get_plugin_root()
 
+# whisper.cpp build profiles: description and cmake flags. "native" lets the
+# compiler use every instruction set of this CPU (AVX2/AVX-512 on x86, NEON on
+# ARM); the explicit ones exist to A/B against it, e.g. AVX2 on CPUs that
+# downclock under AVX-512.
+_X86_BASE = ["-DGGML_NATIVE=OFF", "-DGGML_AVX=ON", "-DGGML_AVX2=ON", "-DGGML_FMA=ON", "-DGGML_F16C=ON"]
+BUILD_PROFILES = {
+    "metal": ("Apple GPU (Metal)", ["-DGGML_METAL=ON"]),
+    "native": ("CPU, all instruction sets of this machine", ["-DGGML_METAL=OFF", "-DGGML_NATIVE=ON"]),
+    "openblas": ("CPU with OpenBLAS for the encoder", [
+        "-DGGML_METAL=OFF", "-DGGML_NATIVE=ON", "-DGGML_BLAS=ON", "-DGGML_BLAS_VENDOR=OpenBLAS",
+    ]),
+    "avx512": ("x86 CPU, AVX-512", ["-DGGML_METAL=OFF", *_X86_BASE, "-DGGML_AVX512=ON"]),
+    "avx2": ("x86 CPU, AVX2 (no AVX-512)", ["-DGGML_METAL=OFF", *_X86_BASE, "-DGGML_AVX512=OFF"]),
+    "generic": ("Portable CPU build, no host-specific instructions", ["-DGGML_METAL=OFF", "-DGGML_NATIVE=OFF"]),
+}
+
+# Where distributions put cblas.h (Debian/Ubuntu use a multiarch subdirectory)
+_CBLAS_HEADER_GLOBS = ("/usr/include/cblas.h", "/usr/include/openblas/cblas.h", "/usr/include/*/openblas*/cblas.h",
+                       "/usr/local/include/cblas.h", "/opt/homebrew/opt/openblas/include/cblas.h",
+                       "/usr/local/opt/openblas/include/cblas.h")
+
 
 def print_header(text):
     print(f"\n{'=' * 50}")
@@ -38,42 +66,105 @@ def print_step(num, total, text):
 
 
 def run_command(cmd, cwd=None, capture=False):
-    """Run a shell command."""
+    """Run a command given as an argument list (no shell)."""
     try:
         if capture:
-            result = subprocess.run(cmd, shell=True, cwd=cwd, capture_output=True, text=True)
+            result = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True)
             return result.returncode == 0, result.stdout, result.stderr
         else:
-            result = subprocess.run(cmd, shell=True, cwd=cwd)
+            result = subprocess.run(cmd, cwd=cwd)
             return result.returncode == 0, "", ""
     except Exception as e:
         return False, "", str(e)
 
 
-def check_whisper_built():
-    """Check if whisper.cpp is built."""
-    whisper_cli = WHISPER_DIR / "build" / "bin" / "whisper-cli"
+def openblas_dev_installed():
+    """True if whisper.cpp can be built against OpenBLAS (headers too, not only the runtime library)."""
+    if shutil.which("pkg-config"):
+        found, _, _ = run_command(["pkg-config", "--exists", "openblas"], capture=True)
+        if found:
+            return True
+    if not ctypes.util.find_library("openblas"):
+        return False
+    return any(glob.glob(pattern) for pattern in _CBLAS_HEADER_GLOBS)
+
+
+def detect_cpu():
+    """Instruction sets, BLAS availability and core count of this machine."""
+    machine = platform.machine().lower()
+    flags = ""
+    if sys.platform == "darwin":
+        # Only Intel Macs report these; Apple Silicon always has NEON
+        _, out, _ = run_command(["sysctl", "-n", "machdep.cpu.features", "machdep.cpu.leaf7_features"],
+                                capture=True)
+        flags = out.lower()
+    else:
+        try:
+            flags = Path("/proc/cpuinfo").read_text().lower()
+        except OSError:
+            pass
+    words = set(flags.split())
+
+    if hasattr(os, "sched_getaffinity"):
+        cores = len(os.sched_getaffinity(0))
+    else:
+        cores = os.cpu_count() or 1
+
+    return {
+        "machine": machine,
+        "cores": cores,
+        "avx2": "avx2" in words,
+        "avx512": "avx512f" in words,
+        "neon": machine in ("arm64", "aarch64") or "asimd" in words or "neon" in words,
+        "openblas": openblas_dev_installed(),
+    }
+
+
+def choose_profile(cpu):
+    """Best build profile for the detected CPU."""
+    if sys.platform == "darwin" and cpu["machine"] == "arm64":
+        return "metal"
+    if cpu["openblas"]:
+        return "openblas"
+    return "native"
+
+
+def build_dir(profile):
+    """Build directory of a profile; each profile keeps its own so they can be A/B-ed."""
+    return WHISPER_DIR / f"build-{profile}"
+
+
+def check_whisper_built(profile):
+    """Check if whisper.cpp is built with this profile."""
+    whisper_cli = build_dir(profile) / "bin" / "whisper-cli"
     return whisper_cli.exists()
 
 
-def build_whisper():
-    """Clone and build whisper.cpp with Metal support."""
+def build_whisper(profile, cores, rebuild=False):
+    """Clone and build whisper.cpp with a build profile."""
+    description, flags = BUILD_PROFILES[profile]
     print("  Creating install directory...")
     INSTALL_DIR.mkdir(parents=True, exist_ok=True)
 
     if not WHISPER_DIR.exists():
         print("  Cloning whisper.cpp...")
         success, _, err = run_command(
-            "git clone https://github.com/ggerganov/whisper.cpp.git",
+            ["git", "clone", "https://github.com/ggerganov/whisper.cpp.git"],
             cwd=INSTALL_DIR
         )
         if not success:
             print(f"  Error cloning whisper.cpp: {err}")
             return False
 
-    print("  Building with Metal support (this may take a few minutes)...")
+    build = build_dir(profile)
+    if rebuild and build.exists():
+        # Drop the CMake cache so changed flags take effect
+        shutil.rmtree(build)
+
+    print(f"  Building profile '{profile}' ({description}) on {cores} cores "
+          "(this may take a few minutes)...")
     success, _, err = run_command(
-        "cmake -B build -DGGML_METAL=ON",
+        ["cmake", "-B", str(build), "-DCMAKE_BUILD_TYPE=Release", *flags],
         cwd=WHISPER_DIR
     )
     if not success:
@@ -81,14 +172,14 @@ def build_whisper():
         return False
 
     success, _, err = run_command(
-        "cmake --build build -j",
+        ["cmake", "--build", str(build), "--config", "Release", "-j", str(cores)],
         cwd=WHISPER_DIR
     )
     if not success:
         print(f"  Error building: {err}")
         return False
 
-    if check_whisper_built():
+    if check_whisper_built(profile):
         print("  ✓ whisper.cpp built successfully")
         return True
     else:
@@ -102,29 +193,43 @@ def check_model_exists(model="base"):
     return model_file.exists()
 
 
-def download_model(model="base"):
-    """Download a Whisper model."""
-    print(f"  Downloading {model} model...")
-    success, _, err = run_command(
-        f"./models/download-ggml-model.sh {model}",
-        cwd=WHISPER_DIR
+def download_model(model="base", bin_dir=None):
+    """Download and verify a Whisper model; unpublished quantized variants are quantized locally."""
+    info = WHISPER_MODELS[model]
+    config = Config(
+        whisper_cpp_path=str(bin_dir / "whisper-cli") if bin_dir else None,
+        models_dir=str(WHISPER_DIR / "models"),
+        model_mirror=load_saved_config().get("model_mirror", ""),
     )
-    if success and check_model_exists(model):
-        print(f"  ✓ {model} model downloaded")
-        return True
+    if info["url"] is None:
+        print(f"  Quantizing {info['base_model']} to {info['quantization']}...")
     else:
-        print(f"  ✗ Failed to download model: {err}")
+        print(f"  Downloading {model} model...")
+    try:
+        pull_model(config, model, progress=print_progress)
+    except ModelError as e:
+        print(f"\n  ✗ {e}")
         return False
+    print(f"  ✓ {model} model ready")
+    return True
 
 
-def save_config():
-    """Save configuration file."""
+def load_saved_config():
+    """Existing config.json contents, or {}."""
+    try:
+        with open(CONFIG_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_config(bin_dir, profile=None, model=None):
+    """Save configuration file, keeping settings the user already changed."""
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
 
-    config = {
-        "whisper_cpp_path": str(WHISPER_DIR / "build" / "bin" / "whisper-cli"),
-        "models_dir": str(WHISPER_DIR / "models"),
+    defaults = {
         "model": "base",
+        "use_server": True,
         "hotkey_ctrl": True,
         "hotkey_alt": True,
         "hotkey_shift": False,
@@ -132,20 +237,53 @@ def save_config():
         "output_mode": "keyboard",
         "sound_effects": True,
         "max_recording_seconds": 60,
-        "setup_complete": True
     }
-
-    with open(CONFIG_FILE, "w") as f:
+    config = {**defaults, **load_saved_config()}
+    config.update({
+        "whisper_cpp_path": str(bin_dir / "whisper-cli"),
+        "whisper_server_path": str(bin_dir / "whisper-server"),
+        "models_dir": str(WHISPER_DIR / "models"),
+        "setup_complete": True,
+    })
+    if profile:
+        config["build_profile"] = profile
+    if model:
+        config["model"] = model
+
+    tmp_path = CONFIG_FILE.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
         json.dump(config, f, indent=2)
+    os.replace(tmp_path, CONFIG_FILE)
 
     print("  ✓ Configuration saved")
     return True
 
 
-def run_setup(skip_build=False, skip_model=False):
-    """Run the full setup process."""
+def run_setup(skip_build=False, skip_model=False, rebuild=False, profile=None, model=None):
+    """
+    Run the full setup process.
+
+    Args:
+        skip_build: Do not build whisper.cpp
+        skip_model: Do not download the model
+        rebuild: Rebuild whisper.cpp from a clean build directory
+        profile: Build profile (see BUILD_PROFILES); detected from the CPU by default
+        model: Model to download and select (see WHISPER_MODELS); "base" by default
+    """
     print_header("voice-to-claude Setup")
 
+    if model is not None and model not in WHISPER_MODELS:
+        print(f"  ✗ Unknown model: {model}. Available: {', '.join(WHISPER_MODELS)}")
+        sys.exit(1)
+
+    saved_profile = load_saved_config().get("build_profile")
+    legacy_bin = WHISPER_DIR / "build" / "bin"
+    if profile is None and not rebuild and not saved_profile and (legacy_bin / "whisper-cli").exists():
+        # Installed before build profiles existed; keep that build
+        bin_dir = legacy_bin
+    else:
+        bin_dir = None
+
     total_steps = 2
     if not skip_build:
         total_steps += 1
@@ -159,36 +297,67 @@ def run_setup(skip_build=False, skip_model=False):
         current_step += 1
         print_step(current_step, total_steps, "Setting up whisper.cpp...")
 
-        if check_whisper_built():
-            print("  ✓ whisper.cpp already built")
+        cpu = detect_cpu()
+        features = [name.upper().replace("AVX512", "AVX-512") for name in ("avx2", "avx512", "neon") if cpu[name]]
+        print(f"  CPU: {cpu['machine']}, {cpu['cores']} cores, "
+              f"{', '.join(features) or 'no SIMD extensions detected'}"
+              f"{', OpenBLAS available' if cpu['openblas'] else ''}")
+        requested = profile
+        if bin_dir is None:
+            profile = profile or saved_profile or choose_profile(cpu)
+            bin_dir = build_dir(profile) / "bin"
+
+        if bin_dir == legacy_bin:
+            print("  ✓ whisper.cpp already built (run with --rebuild to use a build profile)")
+        elif check_whisper_built(profile) and not rebuild:
+            print(f"  ✓ whisper.cpp already built (profile '{profile}')")
         else:
-            if not build_whisper():
+            built = build_whisper(profile, cpu["cores"], rebuild=rebuild)
+            if not built and profile == "openblas" and requested != "openblas":
+                # OpenBLAS was detected, not asked for; a plain CPU build still works
+                print("  OpenBLAS build failed, building profile 'native' instead")
+                profile = "native"
+                bin_dir = build_dir(profile) / "bin"
+                built = (check_whisper_built(profile) and not rebuild) or \
+                    build_whisper(profile, cpu["cores"], rebuild=rebuild)
+            if not built:
                 print("\n  ✗ Failed to build whisper.cpp")
-                print("  Make sure you have cmake and Xcode tools installed:")
-                print("    brew install cmake")
-                print("    xcode-select --install")
+                if sys.platform == "darwin":
+                    print("  Make sure you have cmake and Xcode tools installed:")
+                    print("    brew install cmake")
+                    print("    xcode-select --install")
+                else:
+                    print("  Make sure you have cmake and a C++ compiler installed:")
+                    print("    sudo apt install cmake build-essential")
+                    if profile == "openblas":
+                        print("    sudo apt install libopenblas-dev")
                 sys.exit(1)
 
+    if bin_dir is None:
+        # Build skipped: keep what an earlier setup chose
+        profile = profile or saved_profile
+        bin_dir = build_dir(profile) / "bin" if profile else legacy_bin
+
     # Step 2: Download model
     if not skip_model:
         current_step += 1
         print_step(current_step, total_steps, "Downloading Whisper model...")
 
-        if check_model_exists("base"):
-            print("  ✓ Base model already downloaded")
+        wanted = model or "base"
+        if check_model_exists(wanted):
+            print(f"  ✓ {wanted} model already downloaded")
         else:
-            if not download_model("base"):
+            if not download_model(wanted, bin_dir):
                 print("\n  ✗ Failed to download model")
-                print("  Try manually:")
-                print(f"    cd {WHISPER_DIR}")
-                print("    ./models/download-ggml-model.sh base")
+                print("  Retry (an interrupted download resumes where it stopped):")
+                print(f"    python scripts/exec.py setup --skip-build --model {wanted}")
                 sys.exit(1)
 
     # Step 3: Save configuration
     current_step += 1
     print_step(current_step, total_steps, "Saving configuration...")
 
-    save_config()
+    save_config(bin_dir, profile if bin_dir != legacy_bin else None, model)
 
     # Done!
     print_header("Setup Complete!")
@@ -204,9 +373,14 @@ def main():
     parser = argparse.ArgumentParser(description="voice-to-claude setup")
     parser.add_argument("--skip-build", action="store_true", help="Skip whisper.cpp build")
     parser.add_argument("--skip-model", action="store_true", help="Skip model download")
+    parser.add_argument("--model", choices=list(WHISPER_MODELS), help="Model to download (default: base)")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild whisper.cpp from scratch")
+    parser.add_argument("--profile", choices=list(BUILD_PROFILES),
+                        help="whisper.cpp build profile (default: detected from the CPU)")
     args = parser.parse_args()
 
-    run_setup(skip_build=args.skip_build, skip_model=args.skip_model)
+    run_setup(skip_build=args.skip_build, skip_model=args.skip_model,
+              rebuild=args.rebuild, profile=args.profile, model=args.model)
 
 
 if __name__ == "__main__":
@@ -1,37 +1,245 @@
-"""Audio feedback sounds."""
+"""Audio feedback sounds.
 
-import subprocess
+Cues are decoded once into NumPy buffers and mixed into a sounddevice
+output stream that stays open while cues are being played, so a burst of
+cues costs no process spawn and at most one device open. The stream is
+closed once idle, so no audio callback runs between dictations.
+"""
+
+import logging
+import threading
+import time
+import warnings
 from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CUES = ("start", "stop", "success", "error")
+
+# macOS system sounds used when available
+SYSTEM_SOUNDS = {
+    "start": Path("/System/Library/Sounds/Pop.aiff"),
+    "stop": Path("/System/Library/Sounds/Tink.aiff"),
+    "success": Path("/System/Library/Sounds/Glass.aiff"),
+    "error": Path("/System/Library/Sounds/Basso.aiff"),
+}
+
+# Synthesized fallbacks: (frequency Hz, seconds) segments
+TONES = {
+    "start": [(880, 0.06)],
+    "stop": [(660, 0.06)],
+    "success": [(880, 0.05), (1320, 0.07)],
+    "error": [(220, 0.2)],
+}
+
+# Margin added to a cue's end when muting the microphone
+MUTE_MARGIN_SECONDS = 0.05
+
+
+def _synthesize(segments, rate: int, volume: float = 0.3) -> np.ndarray:
+    """Short sine tones with a fade in/out to avoid clicks."""
+    parts = []
+    for freq, seconds in segments:
+        t = np.arange(int(seconds * rate), dtype=np.float32) / rate
+        tone = np.sin(2 * np.pi * freq * t).astype(np.float32)
+        fade = min(len(tone) // 4, int(0.005 * rate))
+        if fade:
+            ramp = np.linspace(0.0, 1.0, fade, dtype=np.float32)
+            tone[:fade] *= ramp
+            tone[-fade:] *= ramp[::-1]
+        parts.append(tone)
+    return (np.concatenate(parts) * volume).astype(np.float32)
+
+
+def _decode_aiff(path: Path, rate: int) -> Optional[np.ndarray]:
+    """Decode an uncompressed AIFF file to mono float32 at rate, or None."""
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            import aifc
+    except ImportError:
+        # Removed in Python 3.13; the synthesized cues are used instead
+        return None
+    try:
+        with aifc.open(str(path), "rb") as f:
+            channels, width, src_rate = f.getnchannels(), f.getsampwidth(), f.getframerate()
+            frames = f.readframes(f.getnframes())
+            big_endian = f.getcomptype() != b"sowt"
+    except (OSError, EOFError, aifc.Error):
+        return None
+    if width != 2:
+        return None
+
+    samples = np.frombuffer(frames, dtype=">i2" if big_endian else "<i2").astype(np.float32) / 32768
+    samples = samples.reshape(-1, channels).mean(axis=1)
+    if src_rate != rate:
+        positions = np.arange(int(len(samples) * rate / src_rate)) * (src_rate / rate)
+        samples = np.interp(positions, np.arange(len(samples)), samples)
+    return samples.astype(np.float32)
+
+
+def load_cues(rate: int) -> Dict[str, np.ndarray]:
+    """Decode the system cue sounds (or synthesize them) at the given rate."""
+    cues = {}
+    for name in CUES:
+        path = SYSTEM_SOUNDS[name]
+        audio = _decode_aiff(path, rate) if path.exists() else None
+        cues[name] = audio if audio is not None else _synthesize(TONES[name], rate)
+    return cues
+
+
+class CuePlayer:
+    """Plays preloaded cues through one output stream, closed after idle_timeout."""
+
+    def __init__(self, device=None, idle_timeout: float = 30):
+        """
+        Initialize player.
+
+        Args:
+            device: Output device (default device if None)
+            idle_timeout: Seconds after the last cue before the stream is
+                closed; the next cue reopens it
+        """
+        import sounddevice as sd
+
+        self.sd = sd
+        self.device = device
+        self.idle_timeout = idle_timeout
+        self.rate = int(sd.query_devices(device, "output")["default_samplerate"])
+        self.cues = load_cues(self.rate)
+        self._active: List[list] = []  # [buffer, position] pairs being mixed
+        self._lock = threading.Lock()  # Guards _active; taken by the audio callback
+        self._stream_lock = threading.Lock()  # Guards opening and closing the stream
+        self._idle_timer: Optional[threading.Timer] = None
+        self.stream = None
+
+    def start(self) -> None:
+        """Open the output stream (checks the device works); it closes again when idle."""
+        with self._stream_lock:
+            self._open_stream()
+            self._schedule_idle_close()
+
+    def _open_stream(self) -> None:
+        """Open and start the output stream if it is not already open."""
+        if self.stream is not None:
+            return
+        stream = self.sd.OutputStream(
+            samplerate=self.rate,
+            channels=1,
+            dtype="float32",
+            device=self.device,
+            callback=self._callback,
+        )
+        stream.start()
+        self.stream = stream
+
+    def _schedule_idle_close(self) -> None:
+        """(Re)arm the timer that closes the stream when no cue has played for a while."""
+        if self._idle_timer:
+            self._idle_timer.cancel()
+        self._idle_timer = threading.Timer(self.idle_timeout, self._close_if_idle)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    def _close_if_idle(self) -> None:
+        """Close the stream unless a cue is still playing."""
+        with self._stream_lock:
+            with self._lock:
+                playing = bool(self._active)
+            if playing:
+                self._schedule_idle_close()
+            else:
+                self._close_stream()
+
+    def _close_stream(self) -> None:
+        """Stop and close the output stream."""
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+
+    def _callback(self, outdata: np.ndarray, frames: int, time_info, status) -> None:
+        """Mix active cues into the output (runs on the PortAudio thread)."""
+        out = outdata[:, 0]
+        out.fill(0)
+        with self._lock:
+            remaining = []
+            for cue in self._active:
+                buffer, pos = cue
+                n = min(frames, len(buffer) - pos)
+                out[:n] += buffer[pos:pos + n]
+                cue[1] = pos + n
+                if cue[1] < len(buffer):
+                    remaining.append(cue)
+            self._active = remaining
+
+    def play(self, name: str) -> float:
+        """
+        Start playing a cue without blocking.
+
+        Returns:
+            time.monotonic() at which the cue will have finished playing
+        """
+        buffer = self.cues[name]
+        with self._stream_lock:
+            try:
+                self._open_stream()
+            except Exception as e:
+                logger.warning(f"Cannot play cue {name}: {e}")
+                return 0.0
+            with self._lock:
+                self._active.append([buffer, 0])
+            latency = self.stream.latency
+            self._schedule_idle_close()
+        return time.monotonic() + latency + len(buffer) / self.rate + MUTE_MARGIN_SECONDS
+
+    def close(self) -> None:
+        """Close the output stream."""
+        with self._stream_lock:
+            if self._idle_timer:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+            self._close_stream()
+            with self._lock:
+                self._active = []
+
+
+class NullCuePlayer:
+    """Silent player for headless machines, tests and disabled sound effects."""
 
+    cues: Dict[str, np.ndarray] = {}
 
-def play_start_sound() -> None:
-    """Play sound when recording starts."""
-    # Use macOS system sound
-    subprocess.run(
-        ["afplay", "/System/Library/Sounds/Pop.aiff"],
-        capture_output=True
-    )
+    def start(self) -> None:
+        pass
 
+    def play(self, name: str) -> float:
+        return 0.0
 
-def play_stop_sound() -> None:
-    """Play sound when recording stops."""
-    subprocess.run(
-        ["afplay", "/System/Library/Sounds/Tink.aiff"],
-        capture_output=True
-    )
+    def close(self) -> None:
+        pass
 
 
-def play_success_sound() -> None:
-    """Play sound on successful transcription."""
-    subprocess.run(
-        ["afplay", "/System/Library/Sounds/Glass.aiff"],
-        capture_output=True
-    )
+def create_player(enabled: bool = True, backend: str = "auto", idle_timeout: float = 30):
+    """
+    Create and start a cue player.
 
+    Args:
+        enabled: False returns the silent player
+        backend: "auto" (sounddevice if an output device works) or "none"
+        idle_timeout: Seconds after the last cue before the output stream closes
 
-def play_error_sound() -> None:
-    """Play sound on error."""
-    subprocess.run(
-        ["afplay", "/System/Library/Sounds/Basso.aiff"],
-        capture_output=True
-    )
+    Returns:
+        A started CuePlayer, or a NullCuePlayer
+    """
+    if not enabled or backend == "none":
+        return NullCuePlayer()
+    try:
+        player = CuePlayer(idle_timeout=idle_timeout)
+        player.start()
+        return player
+    except Exception as e:
+        logger.warning(f"Audio cues disabled, no usable output device: {e}")
+        return NullCuePlayer()
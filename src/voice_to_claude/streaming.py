@@ -0,0 +1,149 @@
+"""Incremental transcription while the hotkey is still held."""
+
+import logging
+import re
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from .recorder import AudioRecorder
+from .transcriber import Transcriber, TranscriptionResult
+from .vad import VoiceActivityDetector
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize_word(word: str) -> str:
+    """Lowercase a word and strip punctuation for overlap matching."""
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def stitch_text(previous: str, new: str, max_overlap_words: int = 8) -> str:
+    """
+    Join two segment transcripts, dropping words repeated across the overlap.
+
+    Finds the longest run of words that ends ``previous`` and starts ``new``
+    (ignoring case and punctuation) and keeps only one copy of it.
+    """
+    if not previous:
+        return new
+    if not new:
+        return previous
+
+    prev_words = previous.split()
+    new_words = new.split()
+    prev_norm = [_normalize_word(w) for w in prev_words[-max_overlap_words:]]
+    new_norm = [_normalize_word(w) for w in new_words[:max_overlap_words]]
+
+    for size in range(min(len(prev_norm), len(new_norm)), 0, -1):
+        if prev_norm[-size:] == new_norm[:size]:
+            return " ".join(prev_words + new_words[size:])
+    return " ".join(prev_words + new_words)
+
+
+class StreamingSession:
+    """
+    Decodes completed windows of audio in the background during recording.
+
+    Windows of ``window_seconds`` are decoded as soon as they are captured,
+    each starting ``overlap_seconds`` before the end of the previous one so
+    words on the boundary are seen whole at least once. On release only the
+    remaining tail is decoded, so time-to-text stays roughly constant no
+    matter how long the utterance was.
+    """
+
+    def __init__(
+        self,
+        recorder: AudioRecorder,
+        transcriber: Transcriber,
+        window_seconds: float = 8.0,
+        overlap_seconds: float = 1.0,
+        poll_interval: float = 0.25,
+        vad: Optional[VoiceActivityDetector] = None,
+    ):
+        self.recorder = recorder
+        # Keep the buffer of this recording; the next start() may swap it out
+        self.buffer = recorder.buffer
+        self.transcriber = transcriber
+        self.window_frames = int(window_seconds * recorder.sample_rate)
+        self.overlap_frames = int(min(overlap_seconds, window_seconds / 2) * recorder.sample_rate)
+        self.poll_interval = poll_interval
+        self.vad = vad
+
+        self.segments: List[str] = []
+        self.errors: List[str] = []
+        self.next_start = 0
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def start(self) -> "StreamingSession":
+        """Start the background decode worker."""
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+        return self
+
+    def _run(self) -> None:
+        """Decode each window as soon as it has been fully captured."""
+        while not self._stop.wait(self.poll_interval):
+            while self.buffer.write_pos - self.next_start >= self.window_frames:
+                end = self.next_start + self.window_frames
+                self._decode(self.buffer.read(self.next_start, end))
+                self.next_start = end - self.overlap_frames
+                if self._stop.is_set():
+                    return
+
+    def _decode(self, audio: np.ndarray) -> None:
+        """Decode one segment and record its text."""
+        if self.vad is not None:
+            audio = self.vad.trim(audio, self.recorder.sample_rate)
+            if audio is None:
+                return
+        result = self.transcriber.transcribe_audio(audio, self.recorder.sample_rate)
+        if result.success:
+            self.segments.append(result.text)
+        elif result.error != "No speech detected":
+            logger.warning(f"Streaming segment failed: {result.error}")
+            self.errors.append(result.error)
+
+    def cancel(self) -> None:
+        """Stop decoding without finalizing."""
+        self._stop.set()
+
+    def finish(self, audio: Optional[np.ndarray]) -> TranscriptionResult:
+        """
+        Finalize after recording stopped.
+
+        Args:
+            audio: The recording returned by AudioRecorder.stop() (None if empty)
+
+        Returns:
+            TranscriptionResult with the stitched text of all segments
+        """
+        start_time = time.time()
+        self._stop.set()
+        if self._worker:
+            # Waits for at most one in-flight window
+            self._worker.join()
+
+        if audio is not None and self.buffer.write_pos > self.next_start:
+            self._decode(self.buffer.read(self.next_start, self.buffer.write_pos))
+
+        text = ""
+        for segment in self.segments:
+            text = stitch_text(text, segment)
+
+        model = self.transcriber.config.model
+        elapsed = time.time() - start_time
+        if text:
+            return TranscriptionResult(text=text, duration_seconds=elapsed, model=model,
+                                       success=True, backend="streaming")
+        return TranscriptionResult(
+            text="",
+            duration_seconds=elapsed,
+            model=model,
+            success=False,
+            error=self.errors[-1] if self.errors else "No speech detected",
+            backend="streaming"
+        )
@@ -1,12 +1,56 @@
 """Whisper.cpp transcription functionality."""
 
+import logging
+import os
+import re
 import subprocess
+import tempfile
+import threading
 import time
+import wave
 from pathlib import Path
-from typing import Optional, Tuple
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass, field
 
-from .config import Config, WHISPER_MODELS
+import numpy as np
+
+from .audio import encode_wav
+from .cache import make_key, shared_cache
+from .config import Config, WHISPER_MODELS, SAMPLE_RATE
+from .server import WhisperServer, ServerError
+
+logger = logging.getLogger(__name__)
+
+# whisper.cpp prints e.g. "whisper_print_timings:     load time =   123.45 ms" on stderr
+_TIMING_RE = re.compile(r"whisper_print_timings:\s+(load|total) time\s*=\s*([\d.]+)\s*ms")
+
+# Builds that cannot read "-f -" report an error naming the file '-', e.g.
+# "error: input file not found '-'" or "error: failed to read audio file '-'"
+_STDIN_REJECTED_RE = re.compile(r"^error: .*'-'", re.MULTILINE)
+STDIN_REJECTED = "whisper-cli cannot read stdin"
+
+# whisper-cli binaries found to reject stdin; they get a temporary file straight away
+_no_stdin_clis: Set[str] = set()
+
+
+def parse_whisper_timings(stderr: str) -> Dict[str, float]:
+    """Split whisper-cli's reported time into model load and decode (seconds)."""
+    found = {name: float(value) / 1000 for name, value in _TIMING_RE.findall(stderr)}
+    timings = {}
+    if "load" in found:
+        timings["model_load"] = found["load"]
+        if "total" in found:
+            timings["decode"] = max(found["total"] - found["load"], 0.0)
+    return timings
+
+
+def _wav_seconds(path: Path) -> Optional[float]:
+    """Length of a WAV file from its header, or None if unreadable."""
+    try:
+        with wave.open(str(path), "rb") as f:
+            return f.getnframes() / f.getframerate()
+    except (OSError, EOFError, wave.Error):
+        return None
 
 
 @dataclass
@@ -17,25 +61,179 @@ class TranscriptionResult:
     model: str
     success: bool
     error: Optional[str] = None
+    backend: str = "cli"
+    timings: Dict[str, float] = field(default_factory=dict)  # Stage name -> seconds
 
 
 class Transcriber:
     """Transcribes audio using whisper.cpp."""
 
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, server: Optional[WhisperServer] = None):
+        """
+        Initialize transcriber.
+
+        Args:
+            config: Configuration with whisper-cli and model paths
+            server: Optional resident whisper-server; the one-shot CLI is used
+                whenever it is missing, still loading or failing
+        """
         self.config = config
+        self.server = server
+        self.cache = (
+            shared_cache(max_bytes=config.cache_max_mb * 1024 * 1024)
+            if config.cache_enabled else None
+        )
+
+    def decode_options(self) -> dict:
+        """Options that change whisper's output, part of the cache key."""
+        return {
+            "no_timestamps": True,
+            "processors": self.config.processors,
+            "beam_size": self.config.beam_size,
+            "best_of": self.config.best_of,
+            "audio_ctx": self.config.audio_ctx,
+        }
+
+    def _cache_key(self, wav_data: bytes) -> Optional[str]:
+        """Cache key for a clip, or None if caching is off."""
+        if self.cache is None:
+            return None
+        return make_key(wav_data, self.config.get_model_path(), self.decode_options())
+
+    def _cached_result(self, key: Optional[str]) -> Optional[TranscriptionResult]:
+        """Return a cached transcript as a result, if present."""
+        if key is None:
+            return None
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        return TranscriptionResult(
+            text=entry["text"],
+            duration_seconds=0.0,
+            model=self.config.model,
+            success=True,
+            backend="cache"
+        )
 
-    def transcribe(self, audio_path: Path, timeout: int = 120) -> TranscriptionResult:
+    def _store(self, key: Optional[str], result: TranscriptionResult) -> TranscriptionResult:
+        """Cache a successful result and pass it through."""
+        if key is not None and result.success:
+            self.cache.put(key, result.text, result.model)
+        return result
+
+    def transcribe(self, audio_path: Path, timeout: int = 120,
+                   cancel: Optional[threading.Event] = None) -> TranscriptionResult:
         """
         Transcribe an audio file.
 
         Args:
             audio_path: Path to the WAV file to transcribe
             timeout: Maximum time in seconds to wait for transcription
+            cancel: Optional event; setting it kills an in-flight whisper-cli
 
         Returns:
             TranscriptionResult with text and metadata
         """
+        error = self._check_setup()
+        if error:
+            return error
+
+        wav_data = None
+        key = None
+        if self.cache is not None:
+            wav_data = Path(audio_path).read_bytes()
+            key = self._cache_key(wav_data)
+            cached = self._cached_result(key)
+            if cached:
+                return cached
+
+        if self.server is not None and self.server.ensure_running():
+            start_time = time.time()
+            try:
+                if wav_data is None:
+                    wav_data = Path(audio_path).read_bytes()
+                text = self.server.transcribe_bytes(wav_data, timeout=timeout)
+                elapsed = time.time() - start_time
+                return self._store(key, self._make_result(
+                    text, elapsed, backend="server", timings={"model_load": 0.0, "decode": elapsed}
+                ))
+            except ServerError as e:
+                logger.warning(f"{e}, falling back to whisper-cli")
+
+        return self._store(key, self._transcribe_cli(
+            ["-f", str(audio_path)], None, timeout, cancel, audio_seconds=_wav_seconds(audio_path)
+        ))
+
+    def transcribe_audio(self, audio: np.ndarray, sample_rate: int = SAMPLE_RATE,
+                         timeout: int = 120,
+                         cancel: Optional[threading.Event] = None) -> TranscriptionResult:
+        """
+        Transcribe in-memory PCM without writing a temporary file.
+
+        The audio is encoded as WAV in memory and sent to the resident server,
+        or piped to whisper-cli on stdin. If the CLI cannot read stdin, a
+        temporary WAV file is used as a fallback.
+
+        Args:
+            audio: Mono float32 (or int16) PCM samples
+            sample_rate: Sample rate of the audio
+            timeout: Maximum time in seconds to wait for transcription
+            cancel: Optional event; setting it kills an in-flight whisper-cli
+
+        Returns:
+            TranscriptionResult with text and metadata
+        """
+        error = self._check_setup()
+        if error:
+            return error
+
+        encode_start = time.perf_counter()
+        wav_data = encode_wav(audio, sample_rate)
+        encode_seconds = time.perf_counter() - encode_start
+
+        key = self._cache_key(wav_data)
+        cached = self._cached_result(key)
+        if cached:
+            return cached
+
+        if self.server is not None and self.server.ensure_running():
+            start_time = time.time()
+            try:
+                text = self.server.transcribe_bytes(wav_data, timeout=timeout)
+                elapsed = time.time() - start_time
+                return self._store(key, self._make_result(text, elapsed, backend="server", timings={
+                    "wav_write": encode_seconds, "model_load": 0.0, "decode": elapsed,
+                }))
+            except ServerError as e:
+                logger.warning(f"{e}, falling back to whisper-cli")
+
+        audio_seconds = len(audio) / sample_rate
+        whisper_cli = str(self.config.get_whisper_cli())
+        if whisper_cli not in _no_stdin_clis:
+            result = self._transcribe_cli(["-f", "-"], wav_data, timeout, cancel, audio_seconds=audio_seconds)
+            result.timings["wav_write"] = encode_seconds
+            if result.success or not (result.error or "").startswith(STDIN_REJECTED):
+                return self._store(key, result)
+            # Older whisper-cli builds cannot read stdin; go through a temp file from now on
+            logger.warning(f"{result.error}, using temporary WAV files")
+            _no_stdin_clis.add(whisper_cli)
+
+        write_start = time.perf_counter()
+        fd, temp_path = tempfile.mkstemp(suffix=".wav")
+        wav_path = Path(temp_path)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(wav_data)
+            encode_seconds += time.perf_counter() - write_start
+            result = self._transcribe_cli(["-f", str(wav_path)], None, timeout, cancel,
+                                          audio_seconds=audio_seconds)
+            result.timings["wav_write"] = encode_seconds
+            return self._store(key, result)
+        finally:
+            wav_path.unlink(missing_ok=True)
+
+    def _check_setup(self) -> Optional[TranscriptionResult]:
+        """Return an error result if whisper-cli or the model is missing."""
         whisper_cli = self.config.get_whisper_cli()
         model_path = self.config.get_model_path()
 
@@ -57,51 +255,107 @@ class Transcriber:
                 error=f"Model '{self.config.model}' not found at {model_path}. Run /voice-to-claude:setup first."
             )
 
+        return None
+
+    def _make_result(self, raw_text: str, elapsed: float, backend: str,
+                     timings: Optional[Dict[str, float]] = None) -> TranscriptionResult:
+        """Build a result from raw whisper output."""
+        # Clean up transcript (remove extra whitespace)
+        transcript = " ".join(raw_text.strip().split())
+
+        if not transcript:
+            return TranscriptionResult(
+                text="",
+                duration_seconds=elapsed,
+                model=self.config.model,
+                success=False,
+                error="No speech detected",
+                backend=backend,
+                timings=dict(timings or {})
+            )
+
+        return TranscriptionResult(
+            text=transcript,
+            duration_seconds=elapsed,
+            model=self.config.model,
+            success=True,
+            backend=backend,
+            timings=dict(timings or {})
+        )
+
+    def _transcribe_cli(self, input_args: List[str], stdin_data: Optional[bytes],
+                        timeout: int, cancel: Optional[threading.Event] = None,
+                        audio_seconds: Optional[float] = None) -> TranscriptionResult:
+        """Transcribe with a one-shot whisper-cli process."""
         start_time = time.time()
 
         try:
-            result = subprocess.run(
+            process = subprocess.Popen(
                 [
-                    str(whisper_cli),
-                    "-m", str(model_path),
-                    "-f", str(audio_path),
+                    str(self.config.get_whisper_cli()),
+                    "-m", str(self.config.get_model_path()),
+                    *input_args,
+                    *self.config.get_decode_args(audio_seconds),
                     "--no-timestamps",
                     "-nt",
                 ],
-                capture_output=True,
-                text=True,
-                timeout=timeout
+                stdin=subprocess.PIPE if stdin_data is not None else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
             )
 
+            # Wait in short slices so a cancelled job can kill the decode
+            deadline = start_time + timeout
+            stdin_pending = stdin_data
+            while True:
+                try:
+                    stdout_bytes, stderr_bytes = process.communicate(
+                        stdin_pending, timeout=min(0.1, max(deadline - time.time(), 0.001))
+                    )
+                    break
+                except subprocess.TimeoutExpired:
+                    stdin_pending = None
+                    if cancel is not None and cancel.is_set():
+                        process.kill()
+                        process.communicate()
+                        return TranscriptionResult(
+                            text="",
+                            duration_seconds=time.time() - start_time,
+                            model=self.config.model,
+                            success=False,
+                            error="Cancelled"
+                        )
+                    if time.time() >= deadline:
+                        process.kill()
+                        process.communicate()
+                        raise subprocess.TimeoutExpired(process.args, timeout)
+
             elapsed = time.time() - start_time
+            stdout = stdout_bytes.decode("utf-8", errors="replace")
+            stderr = stderr_bytes.decode("utf-8", errors="replace")
 
-            if result.returncode != 0:
+            # Checked before the exit code: newer builds skip unreadable inputs and still exit 0
+            rejected = _STDIN_REJECTED_RE.search(stderr) if stdin_data is not None else None
+            if rejected:
                 return TranscriptionResult(
                     text="",
                     duration_seconds=elapsed,
                     model=self.config.model,
                     success=False,
-                    error=f"Transcription failed: {result.stderr}"
+                    error=f"{STDIN_REJECTED} ({rejected.group(0)})"
                 )
 
-            # Clean up transcript (remove extra whitespace)
-            transcript = " ".join(result.stdout.strip().split())
-
-            if not transcript:
+            if process.returncode != 0:
                 return TranscriptionResult(
                     text="",
                     duration_seconds=elapsed,
                     model=self.config.model,
                     success=False,
-                    error="No speech detected"
+                    error=f"Transcription failed: {stderr}"
                 )
 
-            return TranscriptionResult(
-                text=transcript,
-                duration_seconds=elapsed,
-                model=self.config.model,
-                success=True
-            )
+            return self._make_result(stdout, elapsed, backend="cli",
+                                     timings=parse_whisper_timings(stderr))
 
         except subprocess.TimeoutExpired:
             return TranscriptionResult(
@@ -120,6 +374,67 @@ class Transcriber:
                 error=f"Transcription error: {e}"
             )
 
+    def transcribe_many(self, audio_paths: List[Path], timeout: int = 600) -> List[TranscriptionResult]:
+        """
+        Transcribe several WAV files with a single whisper-cli process.
+
+        The model is loaded once for the whole group. Each transcript is
+        written by whisper-cli to its own text file (-otxt / -of) so outputs
+        cannot be confused. The reported duration is the group's wall time
+        split evenly across its files.
+
+        Args:
+            audio_paths: WAV files to transcribe
+            timeout: Maximum time in seconds for the whole group
+
+        Returns:
+            One TranscriptionResult per input, in order
+        """
+        if not audio_paths:
+            return []
+        error = self._check_setup()
+        if error:
+            return [error] * len(audio_paths)
+
+        # Serve what we can from the cache; only the misses go to whisper
+        results: List[Optional[TranscriptionResult]] = [None] * len(audio_paths)
+        keys: List[Optional[str]] = [None] * len(audio_paths)
+        if self.cache is not None:
+            for i, path in enumerate(audio_paths):
+                keys[i] = self._cache_key(Path(path).read_bytes())
+                results[i] = self._cached_result(keys[i])
+        misses = [i for i, result in enumerate(results) if result is None]
+        if not misses:
+            return results
+
+        with tempfile.TemporaryDirectory() as out_dir:
+            input_args = []
+            for i in misses:
+                input_args += ["-f", str(audio_paths[i]), "-of", os.path.join(out_dir, str(i))]
+            input_args.append("-otxt")
+
+            result = self._transcribe_cli(input_args, None, timeout)
+            per_file = result.duration_seconds / len(misses)
+            failed = not result.success and (result.error or "").startswith(
+                ("Transcription failed", "Transcription timed out", "Transcription error")
+            )
+
+            for i in misses:
+                txt_path = Path(out_dir) / f"{i}.txt"
+                if failed or not txt_path.exists():
+                    results[i] = TranscriptionResult(
+                        text="",
+                        duration_seconds=per_file,
+                        model=self.config.model,
+                        success=False,
+                        error=result.error if failed else f"No output for {audio_paths[i]}"
+                    )
+                    continue
+                results[i] = self._store(keys[i], self._make_result(
+                    txt_path.read_text(encoding="utf-8", errors="replace"), per_file, backend="cli"
+                ))
+            return results
+
     @staticmethod
     def find_whisper_cli(plugin_root: Path) -> Optional[Path]:
         """Find whisper-cli executable."""
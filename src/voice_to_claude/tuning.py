@@ -0,0 +1,185 @@
+"""Decoding-parameter tuning: the fastest whisper.cpp settings that stay accurate."""
+
+import logging
+import math
+import os
+import re
+import statistics
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .config import AUDIO_CTX_PER_SECOND, Config
+from .transcriber import Transcriber, _wav_seconds
+
+logger = logging.getLogger(__name__)
+
+# Config fields set by tuning
+TUNED_FIELDS = ("threads", "processors", "beam_size", "best_of", "audio_ctx")
+
+# Decoding strategies tried: greedy, greedy without fallback candidates, narrow beams
+DECODER_VARIATIONS = [
+    {"beam_size": 1, "best_of": 0},
+    {"beam_size": 1, "best_of": 1},
+    {"beam_size": 2, "best_of": 0},
+    {"beam_size": 3, "best_of": 0},
+]
+
+# Reduced encoder contexts tried (only those the reference clip fits in)
+AUDIO_CTX_VARIATIONS = (1024, 768, 512)
+
+
+def usable_cores() -> int:
+    """CPU cores this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def reference_clip(config: Config) -> Optional[Path]:
+    """whisper.cpp's bundled samples/jfk.wav, found next to the models directory."""
+    if not config.models_dir:
+        return None
+    clip = Path(config.models_dir).parent / "samples" / "jfk.wav"
+    return clip if clip.exists() else None
+
+
+def _words(text: str) -> List[str]:
+    return re.findall(r"[\w']+", text.lower())
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level edit distance divided by the reference length (case and punctuation ignored)."""
+    ref, hyp = _words(reference), _words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(
+                previous[j] + 1,  # deletion
+                current[j - 1] + 1,  # insertion
+                previous[j - 1] + (ref_word != hyp_word),  # substitution
+            ))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+@dataclass
+class Trial:
+    """One measured setting."""
+    settings: Dict[str, int]
+    seconds: float  # Median decode time
+    text: str
+    wer: float
+    error: Optional[str] = None
+
+
+class Tuner:
+    """
+    Searches decoding settings one group at a time (threads, processors,
+    decoding strategy, encoder context), keeping each change only if it is
+    faster and the transcript stays within max_wer of the reference.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        clip: Path,
+        runs: int = 3,
+        max_wer: Optional[float] = None,
+        reference_text: Optional[str] = None,
+        progress: Optional[Callable[[Trial], None]] = None,
+    ):
+        """
+        Initialize tuner.
+
+        Args:
+            config: Configuration with the installed model and whisper-cli
+            clip: Reference WAV file
+            runs: Decodes per setting; the median time is used
+            max_wer: Allowed word error rate (config.tuning_max_wer by default)
+            reference_text: Correct transcript of the clip; by default the
+                transcript produced with whisper.cpp's default settings
+            progress: Called with each finished trial
+        """
+        self.config = config
+        self.clip = Path(clip)
+        self.runs = max(runs, 1)
+        self.max_wer = config.tuning_max_wer if max_wer is None else max_wer
+        self.reference_text = reference_text
+        self.progress = progress
+        self.trials: List[Trial] = []
+        self.best: Optional[Trial] = None
+
+    def _run(self, settings: Dict[str, int]) -> Trial:
+        """Decode the clip with settings (whisper-cli, no cache)."""
+        transcriber = Transcriber(replace(self.config, cache_enabled=False, **settings))
+        times = []
+        text = ""
+        for _ in range(self.runs):
+            result = transcriber.transcribe(self.clip)
+            if not result.success:
+                return Trial(settings, math.inf, "", 1.0, result.error)
+            # Model load time does not depend on these settings
+            times.append(result.timings.get("decode", result.duration_seconds))
+            text = result.text
+        reference = self.reference_text if self.reference_text is not None else text
+        return Trial(settings, statistics.median(times), text, word_error_rate(reference, text))
+
+    def _try(self, variations: List[Dict[str, int]]) -> None:
+        """Try each variation on top of the best settings so far."""
+        for variation in variations:
+            settings = {**self.best.settings, **variation}
+            if any(trial.settings == settings for trial in self.trials):
+                continue
+            trial = self._run(settings)
+            self.trials.append(trial)
+            if self.progress:
+                self.progress(trial)
+            if trial.error is None and trial.wer <= self.max_wer and trial.seconds < self.best.seconds:
+                self.best = trial
+
+    def run(self) -> Trial:
+        """
+        Run the search.
+
+        Returns:
+            The fastest accepted trial (the defaults if nothing beat them)
+        """
+        defaults = {name: getattr(Config, name) for name in TUNED_FIELDS}
+
+        # Bring the model into the page cache so the first trial is not penalized
+        Transcriber(replace(self.config, cache_enabled=False, **defaults)).transcribe(self.clip)
+
+        baseline = self._run(defaults)
+        if baseline.error:
+            raise RuntimeError(f"Reference decode failed: {baseline.error}")
+        if self.reference_text is None:
+            self.reference_text = baseline.text
+        baseline.wer = word_error_rate(self.reference_text, baseline.text)
+        self.trials.append(baseline)
+        if self.progress:
+            self.progress(baseline)
+        self.best = baseline
+
+        cores = usable_cores()
+        thread_counts = sorted({2 ** i for i in range(cores.bit_length()) if 2 ** i <= cores} | {cores})
+        self._try([{"threads": n} for n in thread_counts])
+
+        threads = self.best.settings["threads"] or min(4, cores)
+        self._try([
+            {"processors": p, "threads": max(threads // p, 1)}
+            for p in (2, 4) if p <= cores
+        ])
+
+        self._try(DECODER_VARIATIONS)
+
+        clip_seconds = _wav_seconds(self.clip)
+        if clip_seconds is not None:
+            self._try([
+                {"audio_ctx": ctx} for ctx in AUDIO_CTX_VARIATIONS
+                if clip_seconds * AUDIO_CTX_PER_SECOND <= ctx
+            ])
+        return self.best
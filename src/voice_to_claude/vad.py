@@ -0,0 +1,109 @@
+"""Energy / zero-crossing voice-activity detection."""
+
+from typing import Optional
+
+import numpy as np
+
+from .config import Config
+
+
+class VoiceActivityDetector:
+    """
+    Trims silence from a recording before it is sent to whisper.
+
+    Audio is split into short frames. A frame counts as speech if it is louder
+    than ``threshold_db``, or slightly quieter but with a high zero-crossing
+    rate (unvoiced consonants like "s" and "f"). Everything is computed with
+    vectorized NumPy over all frames at once.
+    """
+
+    def __init__(
+        self,
+        threshold_db: float = -45.0,
+        max_pause_seconds: float = 1.0,
+        padding_seconds: float = 0.2,
+        min_speech_seconds: float = 0.2,
+        frame_ms: int = 20,
+        unvoiced_margin_db: float = 10.0,
+        unvoiced_zcr: float = 0.25,
+    ):
+        self.threshold_db = threshold_db
+        self.max_pause_seconds = max_pause_seconds
+        self.padding_seconds = padding_seconds
+        self.min_speech_seconds = min_speech_seconds
+        self.frame_ms = frame_ms
+        self.unvoiced_margin_db = unvoiced_margin_db
+        self.unvoiced_zcr = unvoiced_zcr
+
+    @classmethod
+    def from_config(cls, config: Config) -> "VoiceActivityDetector":
+        """Create a detector with thresholds from config."""
+        return cls(
+            threshold_db=config.vad_threshold_db,
+            max_pause_seconds=config.vad_max_pause_seconds,
+            padding_seconds=config.vad_padding_seconds,
+            min_speech_seconds=config.vad_min_speech_seconds,
+        )
+
+    def speech_frames(self, audio: np.ndarray, sample_rate: int) -> np.ndarray:
+        """Return a boolean speech mask with one entry per frame."""
+        frame_len = max(int(sample_rate * self.frame_ms / 1000), 1)
+        n_frames = len(audio) // frame_len
+        if n_frames == 0:
+            return np.zeros(0, dtype=bool)
+
+        frames = audio[:n_frames * frame_len].reshape(n_frames, frame_len)
+        # Per-frame energy straight from the samples; int16 is never converted as a whole
+        energy = np.einsum("ij,ij->i", frames, frames, dtype=np.float64) / frame_len
+        if frames.dtype == np.int16:
+            energy /= 32768.0 ** 2
+
+        rms = np.sqrt(energy)
+        level_db = 20.0 * np.log10(rms + 1e-10)
+        signs = frames < 0
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frame_len
+
+        voiced = level_db > self.threshold_db
+        unvoiced = (level_db > self.threshold_db - self.unvoiced_margin_db) & (zcr > self.unvoiced_zcr)
+        return voiced | unvoiced
+
+    def trim(self, audio: np.ndarray, sample_rate: int) -> Optional[np.ndarray]:
+        """
+        Trim leading/trailing silence and shorten long internal pauses.
+
+        Returns:
+            The speech portion of the audio, or None if no speech was detected
+        """
+        audio = audio.reshape(-1)
+        frame_len = max(int(sample_rate * self.frame_ms / 1000), 1)
+        speech = self.speech_frames(audio, sample_rate)
+
+        frame_seconds = frame_len / sample_rate
+        if np.count_nonzero(speech) * frame_seconds < self.min_speech_seconds:
+            return None
+
+        # Keep some context around speech so word edges are not clipped
+        pad = int(round(self.padding_seconds / frame_seconds))
+        if pad:
+            speech = np.convolve(speech, np.ones(2 * pad + 1), mode="same") > 0
+
+        voiced_idx = np.flatnonzero(speech)
+        first, last = voiced_idx[0], voiced_idx[-1] + 1
+        speech = speech[first:last]
+
+        # Frames into the current pause; pauses are cut to max_pause_seconds
+        idx = np.arange(len(speech))
+        last_speech = np.maximum.accumulate(np.where(speech, idx, 0))
+        keep = speech | (idx - last_speech <= int(self.max_pause_seconds / frame_seconds))
+
+        start = first * frame_len
+        # Let the trimmed region run to the end of the buffer if speech does
+        end = len(audio) if last * frame_len + frame_len > len(audio) else last * frame_len
+        if keep.all():
+            return audio[start:end]
+
+        sample_keep = np.repeat(keep, frame_len)
+        tail = (end - start) - len(sample_keep)
+        if tail > 0:
+            sample_keep = np.concatenate((sample_keep, np.full(tail, keep[-1])))
+        return audio[start:end][sample_keep[:end - start]]
@@ -0,0 +1,122 @@
+"""Model warm-up: bring the GGML file into memory before the first dictation."""
+
+import ctypes
+import logging
+import mmap
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# A file read faster than this was already in the page cache
+CACHED_BYTES_PER_SECOND = 2 * 1024 ** 3
+
+
+class ModelWarmer:
+    """
+    Pulls a model file into the page cache by mapping it and touching every page.
+
+    With lock=True the pages are also mlock()ed and the mapping is kept open
+    until release(), so the kernel cannot evict them and later model loads
+    (a restarted whisper-server, a whisper-cli run) never hit the disk.
+    Locking needs a large enough RLIMIT_MEMLOCK; without it the file is
+    still warmed, just not pinned.
+    """
+
+    def __init__(self, path: Path, lock: bool = False):
+        self.path = Path(path)
+        self.lock = lock
+        self.state = "cold"  # cold -> warming -> warm / resident, or failed
+        self.seconds: Optional[float] = None
+        self.size = 0
+        self.was_cached: Optional[bool] = None
+        self.locked = False
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._buffer = None
+
+    def warm(self) -> bool:
+        """Read the whole file into memory. Returns False if it could not be mapped."""
+        self.state = "warming"
+        start = time.perf_counter()
+        try:
+            f = open(self.path, "rb")
+        except OSError as e:
+            logger.warning(f"Cannot warm model {self.path}: {e}")
+            self.state = "failed"
+            return False
+        try:
+            self.size = os.fstat(f.fileno()).st_size
+            # A shared read-only mapping, so mlock pins the file's own page-cache
+            # pages (the ones whisper reads) rather than private copies of them
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            f.close()
+            logger.warning(f"Cannot map model {self.path}: {e}")
+            self.state = "failed"
+            return False
+
+        if hasattr(mm, "madvise") and hasattr(mmap, "MADV_WILLNEED"):
+            # Start kernel readahead for the whole file before touching it
+            mm.madvise(mmap.MADV_WILLNEED)
+        # A strided slice reads one byte per page in C, faulting every page in
+        mm[::mmap.PAGESIZE]
+        self.seconds = time.perf_counter() - start
+        self.was_cached = self.size / max(self.seconds, 1e-9) > CACHED_BYTES_PER_SECOND
+
+        if self.lock:
+            self.locked = self._mlock(mm)
+        if self.locked:
+            self._file, self._map = f, mm
+        else:
+            mm.close()
+            f.close()
+        self.state = "resident" if self.locked else "warm"
+        return True
+
+    def _mlock(self, mm: mmap.mmap) -> bool:
+        """Pin the mapping in RAM. Returns False if not permitted."""
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            # ctypes cannot take the address of a read-only buffer; numpy can
+            buffer = np.frombuffer(mm, dtype=np.uint8)
+        except (OSError, AttributeError, TypeError) as e:
+            logger.warning(f"mlock unavailable: {e}")
+            return False
+        if libc.mlock(ctypes.c_void_p(buffer.ctypes.data), ctypes.c_size_t(self.size)) != 0:
+            error = os.strerror(ctypes.get_errno())
+            del buffer
+            logger.warning(f"Could not lock model in memory ({error}); raise the memlock limit to allow it")
+            return False
+        self._buffer = buffer
+        return True
+
+    def release(self) -> None:
+        """Unlock and unmap a locked model."""
+        if self._map is None:
+            return
+        if self._buffer is not None:
+            libc = ctypes.CDLL(None, use_errno=True)
+            libc.munlock(ctypes.c_void_p(self._buffer.ctypes.data), ctypes.c_size_t(self.size))
+            # The mapping cannot be closed while an array still points into it
+            self._buffer = None
+        self._map.close()
+        self._file.close()
+        self._map = self._file = None
+        self.locked = False
+        self.state = "warm"
+
+    def status(self) -> dict:
+        """Warm-up details for status output."""
+        return {
+            "state": self.state,
+            "model_file": self.path.name,
+            "bytes": self.size,
+            "seconds": round(self.seconds, 3) if self.seconds is not None else None,
+            "was_cached": self.was_cached,
+            "locked": self.locked,
+        }
@@ -0,0 +1,56 @@
+"""TranscriptCache eviction, counters and sharing."""
+
+import json
+import os
+
+from voice_to_claude.cache import STATS_FILE, TranscriptCache, shared_cache
+
+
+def entry_files(directory):
+    return sorted(name for name in os.listdir(directory) if name != STATS_FILE)
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = TranscriptCache(tmp_path, max_bytes=10_000)
+    for i in range(3):
+        cache.put(f"k{i}", "x" * 3000, "tiny")
+    assert cache.get("k0")["text"] == "x" * 3000  # k1 is now the oldest
+
+    cache.put("k3", "x" * 3000, "tiny")
+
+    assert entry_files(tmp_path) == ["k0.json", "k2.json", "k3.json"]
+    assert cache.get("k1") is None
+
+
+def test_index_picks_up_existing_entries(tmp_path):
+    TranscriptCache(tmp_path, max_bytes=10_000).put("old", "x" * 6000, "tiny")
+
+    cache = TranscriptCache(tmp_path, max_bytes=10_000)
+    cache.put("new", "x" * 6000, "tiny")
+
+    assert entry_files(tmp_path) == ["new.json"]
+
+
+def test_counts_are_flushed_in_batches(tmp_path):
+    cache = TranscriptCache(tmp_path)
+    cache.put("k", "hello", "tiny")
+    cache.get("k")
+    cache.get("k")
+    cache.get("missing")
+
+    assert not (tmp_path / STATS_FILE).exists()
+    assert cache.stats() == {"hits": 2, "misses": 1, "evictions": 0}
+
+    cache.flush()
+    cache.get("k")
+    cache.flush()
+    assert json.loads((tmp_path / STATS_FILE).read_text()) == {"hits": 3, "misses": 1, "evictions": 0}
+
+
+def test_shared_cache_is_one_instance_per_directory(tmp_path):
+    first = shared_cache(tmp_path, max_bytes=1000)
+    second = shared_cache(tmp_path, max_bytes=2000)
+
+    assert first is second
+    assert first.max_bytes == 2000
+    assert shared_cache(tmp_path / "other") is not first
@@ -0,0 +1,82 @@
+"""Tk clipboard helper handling, against stand-in helper scripts."""
+
+import sys
+
+import pytest
+
+from voice_to_claude import clipboard
+from voice_to_claude.clipboard import TkClipboard
+
+# Answers like the real helper, keeping the text in memory
+HELPER = """
+import json, sys
+text = ""
+print(json.dumps({"ok": True}), flush=True)
+for line in sys.stdin:
+    request = json.loads(line)
+    if request["op"] == "set":
+        text = request["text"]
+    print(json.dumps({"ok": True, "text": text}), flush=True)
+"""
+
+# Reports ready, then never answers while MARKER exists
+HUNG_HELPER = """
+import json, os, sys, time
+print(json.dumps({"ok": True}), flush=True)
+for line in sys.stdin:
+    while os.path.exists(MARKER):
+        time.sleep(0.05)
+    print(json.dumps({"ok": True, "text": "answered"}), flush=True)
+"""
+
+
+@pytest.fixture
+def make_clipboard(tmp_path, monkeypatch):
+    monkeypatch.setenv("DISPLAY", ":0")
+    monkeypatch.setattr(clipboard, "TK_HELPER_TIMEOUT_SECONDS", 0.3)
+    marker = tmp_path / "hang"
+    created = []
+
+    def make(body):
+        script = tmp_path / "helper.py"
+        script.write_text(f"MARKER = {str(marker)!r}\n{body}")
+        monkeypatch.setattr(TkClipboard, "_helper_command", lambda self: [sys.executable, str(script)])
+        created.append(TkClipboard())
+        return created[-1], marker
+
+    yield make
+    for board in created:
+        board.close()
+        board._process.kill()
+        board._process.wait()
+
+
+def test_helper_serves_requests(make_clipboard):
+    board, _ = make_clipboard(HELPER)
+
+    assert board.set("hello")
+    assert board.get() == "hello"
+
+
+def test_hung_helper_is_killed_and_replaced(make_clipboard):
+    board, marker = make_clipboard(HUNG_HELPER)
+    marker.touch()
+    hung = board._process
+
+    assert board.get() is None
+    assert hung.poll() is not None
+
+    marker.unlink()
+    assert board.get() == "answered"
+    assert board._process is not hung
+
+
+def test_closed_clipboard_does_not_respawn_the_helper(make_clipboard):
+    board, _ = make_clipboard(HELPER)
+    helper = board._process
+
+    board.close()
+
+    assert board.get() is None
+    assert board._process is helper
+    assert helper.wait(timeout=2) == 0
@@ -0,0 +1,33 @@
+"""Control socket requests, served on a temporary socket."""
+
+import json
+import socket
+
+import pytest
+
+from voice_to_claude.control import ControlServer, send_command
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = ControlServer({"echo": lambda **args: args}, path=tmp_path / "daemon.sock")
+    server.start()
+    yield server
+    server.stop()
+
+
+def raw_request(path, payload: bytes) -> dict:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.settimeout(5)
+        conn.connect(str(path))
+        conn.sendall(payload + b"\n")
+        return json.loads(conn.makefile().readline())
+
+
+@pytest.mark.parametrize("payload", [b"[1, 2]", b'"status"', b"42", b"null", b"not json"])
+def test_bad_requests_are_answered_and_serving_continues(server, payload):
+    reply = raw_request(server.path, payload)
+
+    assert reply["ok"] is False
+    assert reply["error"].startswith("Bad request")
+    assert send_command("echo", path=server.path, value=1) == {"value": 1}
@@ -0,0 +1,182 @@
+"""VoiceDaemon threading around the hotkey path, with stand-ins for the device stack."""
+
+import enum
+import sys
+import threading
+import time
+import types
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+try:
+    import sounddevice  # noqa: F401
+except (ImportError, OSError):
+    fake_sd = types.ModuleType("sounddevice")
+    fake_sd.PortAudioError = type("PortAudioError", (Exception,), {})
+    sys.modules["sounddevice"] = fake_sd
+
+try:
+    from pynput import keyboard as _keyboard  # noqa: F401
+except Exception:
+    # No X server here; the daemon only needs the names it uses
+    fake_keyboard = types.ModuleType("pynput.keyboard")
+    fake_keyboard.Key = enum.Enum("Key", "ctrl ctrl_l alt alt_l shift shift_l cmd cmd_l backspace")
+    fake_keyboard.Controller = type("Controller", (), {"press": lambda *a: None, "release": lambda *a: None,
+                                                       "type": lambda *a: None})
+    fake_keyboard.Listener = type("Listener", (), {})
+    fake_pynput = types.ModuleType("pynput")
+    fake_pynput.keyboard = fake_keyboard
+    sys.modules["pynput"] = fake_pynput
+    sys.modules["pynput.keyboard"] = fake_keyboard
+
+from voice_to_claude.config import Config  # noqa: E402
+from voice_to_claude.daemon import VoiceDaemon  # noqa: E402
+from voice_to_claude.metrics import UtteranceTrace  # noqa: E402
+from voice_to_claude.transcriber import TranscriptionResult  # noqa: E402
+
+
+class FakeRecorder:
+    sample_rate = 16000
+
+    def __init__(self, events):
+        self.events = events
+        self.muted_until = 0.0
+
+    def start(self):
+        self.events.append("recorder.start")
+        return True
+
+    def stop(self):
+        self.events.append("recorder.stop")
+        return None
+
+    def mute_until(self, deadline):
+        self.muted_until = deadline
+
+    def close(self):
+        pass
+
+
+class SlowCuePlayer:
+    """Opening the output device takes a while, as after an idle close."""
+
+    def __init__(self, events, delay=0.5):
+        self.events = events
+        self.delay = delay
+
+    def play(self, name):
+        time.sleep(self.delay)
+        self.events.append(f"cue.{name}")
+        return time.monotonic() + 0.1
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    config = Config(use_server=False, cache_enabled=False, metrics_enabled=False, streaming=False,
+                    clipboard_backend="xsel", setup_complete=True)
+    daemon = VoiceDaemon(config, quiet=True)
+    daemon.events = []
+    daemon.recorder = FakeRecorder(daemon.events)
+    daemon.cues = SlowCuePlayer(daemon.events)
+    daemon.cue_thread.start()
+    yield daemon
+    daemon.cue_queue.put(None)
+    daemon.cue_thread.join(timeout=2)
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_cue_does_not_hold_up_the_hotkey_thread(daemon):
+    start = time.monotonic()
+    daemon._start_recording()
+
+    assert time.monotonic() - start < daemon.cues.delay / 2
+    assert "recorder.start" in daemon.events
+    assert wait_for(lambda: "cue.start" in daemon.events)
+    assert daemon.recorder.muted_until > 0
+
+
+def test_microphone_starts_before_the_start_cue(daemon, monkeypatch):
+    monkeypatch.setattr(daemon, "_play_cue", lambda name: daemon.events.append(f"queue.{name}"))
+
+    daemon._start_recording()
+
+    assert daemon.events == ["recorder.start", "queue.start"]
+
+
+class SlowInjector:
+    mode = "keyboard"
+
+    def __init__(self, events, name, delay=0.3):
+        self.events = events
+        self.name = name
+        self.delay = delay
+        self.last_stats = {"method": "keyboard"}
+
+    def inject(self, text):
+        self.events.append(f"{self.name}.inject")
+        time.sleep(self.delay)
+        self.events.append(f"{self.name}.injected")
+        return True
+
+    def copy_to_clipboard(self, text):
+        return True
+
+    def close(self):
+        self.events.append(f"{self.name}.close")
+
+
+def test_reload_waits_for_an_injection_in_progress(daemon, monkeypatch):
+    daemon.injector = SlowInjector(daemon.events, "old")
+    monkeypatch.setattr(daemon, "_make_injector",
+                        lambda: daemon.events.append("new.created") or SlowInjector(daemon.events, "new"))
+    monkeypatch.setattr(daemon, "_write_state", lambda: None)
+    result = TranscriptionResult(text="hello", duration_seconds=0.1, model="tiny", success=True)
+    worker = threading.Thread(target=daemon._deliver, args=(result, UtteranceTrace()))
+    worker.start()
+    assert wait_for(lambda: "old.inject" in daemon.events)
+
+    daemon.apply_config(replace(daemon.config, output_mode="clipboard"))
+    worker.join()
+
+    assert daemon.events.index("old.injected") < daemon.events.index("new.created")
+    assert daemon.events.index("new.created") < daemon.events.index("old.close")
+    assert "new.close" not in daemon.events
+    assert daemon.injector.name == "new"
+
+
+def test_reload_during_a_recording_keeps_its_recorder(daemon, monkeypatch):
+    monkeypatch.setattr(daemon, "_write_state", lambda: None)
+    recorder = daemon.recorder
+    daemon._control_record("start")
+
+    daemon.apply_config(replace(daemon.config, max_recording_seconds=30))
+    assert daemon.recorder is recorder and daemon.recorder_stale
+    daemon._control_record("stop")
+
+    assert daemon.events[:2] == ["recorder.start", "recorder.stop"]
+
+
+def test_session_model_is_reported_and_dropped_on_reload(daemon, monkeypatch):
+    def apply_config(new):
+        daemon.config = new
+        return {"changed": []}
+
+    saved = replace(daemon.config, model="base")
+    monkeypatch.setattr(daemon, "apply_config", apply_config)
+    monkeypatch.setattr(daemon.config, "get_model_path", lambda model=None: Path(__file__))
+    monkeypatch.setattr(Config, "load", classmethod(lambda cls: saved))
+
+    assert daemon._control_model("tiny")["session_only"]
+    assert daemon._control_reload()["session_model_dropped"] == "tiny"
+    assert daemon._control_reload().get("session_model_dropped") is None
@@ -0,0 +1,143 @@
+"""JobQueue full-queue policies and stale-job cancellation."""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from voice_to_claude.jobs import MERGE_GAP_SECONDS, JobQueue, TranscriptionJob
+
+RATE = 16000
+
+
+class FakeSession:
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+def job(value=1, seconds=0.1, session=None, age=0.0):
+    job = TranscriptionJob(np.full(int(seconds * RATE), value, dtype=np.int16), RATE, session=session)
+    job.created_at -= age
+    return job
+
+
+def full_queue(policy, depth=2):
+    """A queue without a consumer, already holding depth jobs."""
+    queue = JobQueue(lambda job: None, max_depth=depth, policy=policy)
+    jobs = [job(value=n + 1) for n in range(depth)]
+    for queued in jobs:
+        assert queue.submit(queued)
+    return queue, jobs
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        JobQueue(lambda job: None, policy="shuffle")
+
+
+def test_merge_appends_the_recording_to_the_last_waiting_job():
+    queue, (first, last) = full_queue("merge")
+    new = job(value=9)
+
+    assert queue.submit(new)
+
+    assert list(queue.pending) == [first, last]
+    assert len(last.audio) == int(0.1 * RATE) * 2 + int(MERGE_GAP_SECONDS * RATE)
+    assert last.audio[-1] == 9 and last.audio[int(0.1 * RATE)] == 0
+    assert new.audio is None
+    assert queue.stats()["merged"] == 1
+
+
+def test_streaming_jobs_are_not_merged():
+    queue, (first, last) = full_queue("merge")
+    new = job(session=FakeSession())
+
+    assert queue.submit(new)
+
+    assert list(queue.pending) == [last, new]
+    assert first.cancelled.is_set()
+    assert queue.stats()["merged"] == 0 and queue.stats()["dropped"] == 1
+
+
+def test_drop_oldest_cancels_the_first_waiting_job():
+    session = FakeSession()
+    queue = JobQueue(lambda job: None, max_depth=1, policy="drop_oldest")
+    oldest = job(session=session)
+    queue.submit(oldest)
+    new = job()
+
+    assert queue.submit(new)
+
+    assert list(queue.pending) == [new]
+    assert oldest.cancelled.is_set() and session.cancelled
+
+
+def test_drop_newest_rejects_the_new_job():
+    queue, jobs = full_queue("drop_newest")
+    new = job()
+
+    assert not queue.submit(new)
+
+    assert list(queue.pending) == jobs
+    assert new.cancelled.is_set()
+    assert queue.stats()["dropped"] == 1
+
+
+def test_stale_waiting_jobs_are_cancelled():
+    queue = JobQueue(lambda job: None, max_depth=3)
+    stale, fresh = job(age=10), job()
+    queue.submit(stale)
+    queue.submit(fresh)
+
+    assert queue.cancel_stale(5) == 1
+
+    assert list(queue.pending) == [fresh]
+    assert stale.cancelled.is_set() and not fresh.cancelled.is_set()
+    assert queue.stats()["cancelled"] == 1
+    assert queue.cancel_stale(0) == 0
+
+
+def test_stale_in_flight_job_is_cancelled_once():
+    running, release = threading.Event(), threading.Event()
+    handled = []
+
+    def handler(job):
+        handled.append(job)
+        running.set()
+        release.wait(2)
+
+    queue = JobQueue(handler)
+    queue.start()
+    session = FakeSession()
+    stale = job(age=10, session=session)
+    queue.submit(stale)
+    assert running.wait(2)
+
+    assert queue.cancel_stale(5) == 1
+    assert queue.cancel_stale(5) == 0
+
+    assert stale.cancelled.is_set() and session.cancelled
+    release.set()
+    queue.stop()
+    assert handled == [stale]
+
+
+def test_cancelled_jobs_are_skipped_by_the_worker():
+    handled = []
+    queue = JobQueue(handled.append)
+    skipped, kept = job(), job()
+    skipped.cancel()
+    queue.submit(skipped)
+    queue.submit(kept)
+    queue.start()
+
+    deadline = time.monotonic() + 2
+    while queue.stats()["processed"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    queue.stop()
+
+    assert handled == [kept]
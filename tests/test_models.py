@@ -0,0 +1,125 @@
+"""Model downloads against a local HTTP server."""
+
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from voice_to_claude import models
+from voice_to_claude.config import WHISPER_MODELS, Config
+
+MODEL_BYTES = os.urandom(300_000)
+
+
+class ModelServer(BaseHTTPRequestHandler):
+    """Serves MODEL_BYTES; the class attributes switch on misbehaviour."""
+
+    honour_ranges = True
+    truncate_first = 0  # Number of GET responses cut off halfway
+    gets = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(len(MODEL_BYTES)))
+        self.end_headers()
+
+    def do_GET(self):
+        cls = type(self)
+        cls.gets += 1
+        data = MODEL_BYTES
+        ranged = self.headers.get("Range") and cls.honour_ranges
+        if ranged:
+            start, end = (int(n) for n in self.headers["Range"].split("=")[1].split("-"))
+            data = MODEL_BYTES[start:end + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(MODEL_BYTES)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if cls.truncate_first > 0:
+            cls.truncate_first -= 1
+            self.wfile.write(data[:len(data) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    handler = type("Handler", (ModelServer,), {})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{httpd.server_address[1]}/ggml-tiny.bin"
+    monkeypatch.setitem(WHISPER_MODELS, "tiny", {
+        **WHISPER_MODELS["tiny"], "url": url, "sha1": hashlib.sha1(MODEL_BYTES).hexdigest(),
+    })
+    monkeypatch.setattr(models, "CHUNK_BYTES", 32 * 1024)
+    monkeypatch.setattr(models.time, "sleep", lambda seconds: None)
+    yield handler
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def config(tmp_path):
+    return Config(models_dir=str(tmp_path))
+
+
+def test_parallel_download_is_verified(server, config):
+    path = models.pull_model(config, "tiny")
+
+    assert path.read_bytes() == MODEL_BYTES
+    assert models.verify_model(config, "tiny")["status"] == "ok"
+
+
+def test_truncated_responses_are_retried(server, config):
+    server.truncate_first = 3
+
+    assert models.pull_model(config, "tiny").read_bytes() == MODEL_BYTES
+
+
+def test_ignored_ranges_fall_back_to_one_stream(server, config):
+    server.honour_ranges = False
+
+    path = models.pull_model(config, "tiny", connections=1)
+
+    assert path.read_bytes() == MODEL_BYTES
+    # One ranged attempt answered with the whole file, then the stream; no other chunk was fetched
+    assert server.gets == 2
+    assert not path.with_name(path.name + ".part.json").exists()
+
+
+def test_pinned_checksum_mismatch_is_rejected(server, config, monkeypatch):
+    monkeypatch.setitem(WHISPER_MODELS, "tiny", {**WHISPER_MODELS["tiny"], "sha1": "0" * 40})
+
+    with pytest.raises(models.ModelError, match="Checksum mismatch"):
+        models.pull_model(config, "tiny")
+    assert not config.get_model_path("tiny").exists()
+
+
+def test_every_downloadable_model_has_a_pinned_hash():
+    for name, info in WHISPER_MODELS.items():
+        if info["url"] is not None:
+            assert len(info.get("sha1") or "") == 40, name
+
+
+def test_unpinned_variant_is_quantized_not_fetched(server, config, tmp_path, monkeypatch):
+    mirror = tmp_path / "mirror"
+    mirror.mkdir()
+    (mirror / "ggml-tiny-q5_1.bin").write_bytes(b"unverifiable")
+    (mirror / "ggml-tiny.bin").write_bytes(MODEL_BYTES)
+    quantized = []
+    monkeypatch.setattr(models, "quantize_model", lambda config, model: quantized.append(model) or model)
+
+    models.pull_model(config, "tiny-q5_1", source=str(mirror))
+
+    assert quantized == ["tiny-q5_1"]
+    # The base model comes from the mirror, checked against its pinned hash
+    assert models.verify_model(config, "tiny")["status"] == "ok"
@@ -0,0 +1,89 @@
+"""AudioRecorder buffering, driven through the audio callback without a device."""
+
+import sys
+import types
+
+import numpy as np
+import pytest
+
+try:
+    import sounddevice  # noqa: F401
+except (ImportError, OSError):
+    # No PortAudio here; the recorder only needs the names it calls
+    fake_sd = types.ModuleType("sounddevice")
+    fake_sd.PortAudioError = type("PortAudioError", (Exception,), {})
+    sys.modules["sounddevice"] = fake_sd
+
+from voice_to_claude import recorder as recorder_module  # noqa: E402
+from voice_to_claude.audio import encode_wav  # noqa: E402
+from voice_to_claude.recorder import AudioRecorder  # noqa: E402
+
+
+class FakeInputStream:
+    def __init__(self, samplerate, channels, dtype, callback):
+        self.samplerate = samplerate
+        self.callback = callback
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_device(monkeypatch):
+    """A 48kHz microphone that rejects 16kHz; returns the opened streams."""
+    streams = []
+
+    def check_input_settings(samplerate, channels, dtype):
+        if samplerate != 48000:
+            raise recorder_module.sd.PortAudioError("Invalid sample rate")
+
+    def input_stream(**kwargs):
+        streams.append(FakeInputStream(**kwargs))
+        return streams[-1]
+
+    monkeypatch.setattr(recorder_module.sd, "query_devices",
+                        lambda kind=None: {"default_samplerate": 48000.0}, raising=False)
+    monkeypatch.setattr(recorder_module.sd, "check_input_settings", check_input_settings, raising=False)
+    monkeypatch.setattr(recorder_module.sd, "InputStream", input_stream, raising=False)
+    return streams
+
+
+def record(recorder, streams, seconds=0.5, amplitude=8000):
+    """One take of a 440Hz tone fed in 10ms device blocks."""
+    assert recorder.start()
+    stream = streams[-1]
+    rate = stream.samplerate
+    t = np.arange(int(rate * seconds)) / rate
+    tone = (amplitude * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+    block = rate // 100
+    for i in range(0, len(tone), block):
+        chunk = tone[i:i + block]
+        stream.callback(chunk.reshape(-1, 1), len(chunk), None, None)
+    return recorder.stop()
+
+
+def test_recordings_are_int16_at_16khz(fake_device):
+    recorder = AudioRecorder(max_seconds=2)
+    audio = record(recorder, fake_device)
+
+    assert fake_device[-1].samplerate == 48000
+    assert audio.dtype == np.int16
+    assert abs(len(audio) - 8000) < 20
+    assert 7500 < np.abs(audio).max() < 8500
+
+
+def test_second_recording_keeps_int16(fake_device):
+    recorder = AudioRecorder(max_seconds=2)
+    first = record(recorder, fake_device)
+    second = record(recorder, fake_device)  # The first view is still held, so the buffer is replaced
+
+    assert second.dtype == np.int16
+    assert not np.shares_memory(first, second)
+    assert 7500 < np.abs(second).max() < 8500
+    assert encode_wav(second)[44:] == second.tobytes()
@@ -0,0 +1,35 @@
+"""WhisperServer start bookkeeping, without a real whisper-server."""
+
+import sys
+from pathlib import Path
+
+from voice_to_claude.server import WhisperServer
+
+
+def test_start_when_already_ready_clears_starting(monkeypatch):
+    server = WhisperServer(Path("whisper-server"), Path("model.bin"))
+    monkeypatch.setattr(server, "is_ready", lambda: True)
+    server._starting = True  # As left by start_async
+
+    assert server.start()
+    assert not server._starting
+
+
+def test_failed_launch_allows_another_start(tmp_path, monkeypatch):
+    monkeypatch.setattr("voice_to_claude.server.DEFAULT_SERVER_LOG_FILE", tmp_path / "server.log")
+    server = WhisperServer(tmp_path / "missing-server", Path("model.bin"))
+    server._starting = True
+
+    assert not server.start()
+    assert not server._starting
+
+
+def test_server_that_exits_clears_starting(tmp_path, monkeypatch):
+    monkeypatch.setattr("voice_to_claude.server.DEFAULT_SERVER_LOG_FILE", tmp_path / "server.log")
+    script = tmp_path / "whisper-server"
+    script.write_text(f"#!{sys.executable}\n")
+    script.chmod(0o755)
+    server = WhisperServer(script, Path("model.bin"), startup_timeout=5)
+
+    assert not server.start()
+    assert not server._starting
@@ -0,0 +1,62 @@
+"""Build profile detection and fallback, without building anything."""
+
+import json
+
+import pytest
+
+from voice_to_claude import setup
+
+
+@pytest.fixture
+def no_pkg_config(monkeypatch):
+    monkeypatch.setattr(setup.shutil, "which", lambda name: None)
+
+
+def test_openblas_runtime_without_headers_is_not_enough(monkeypatch, no_pkg_config):
+    monkeypatch.setattr(setup.ctypes.util, "find_library", lambda name: "libopenblas.so.0")
+    monkeypatch.setattr(setup.glob, "glob", lambda pattern: [])
+
+    assert not setup.openblas_dev_installed()
+
+
+def test_openblas_with_headers_is_detected(monkeypatch, no_pkg_config):
+    monkeypatch.setattr(setup.ctypes.util, "find_library", lambda name: "libopenblas.so.0")
+    monkeypatch.setattr(setup.glob, "glob",
+                        lambda pattern: ["/usr/include/x86_64-linux-gnu/openblas-pthread/cblas.h"]
+                        if "openblas*" in pattern else [])
+
+    assert setup.openblas_dev_installed()
+
+
+@pytest.fixture
+def fake_install(tmp_path, monkeypatch):
+    """Setup with a CPU that reports OpenBLAS and a recorded build_whisper."""
+    monkeypatch.setattr(setup, "WHISPER_DIR", tmp_path / "whisper.cpp")
+    monkeypatch.setattr(setup, "CONFIG_DIR", tmp_path)
+    monkeypatch.setattr(setup, "CONFIG_FILE", tmp_path / "config.json")
+    monkeypatch.setattr(setup, "detect_cpu", lambda: {
+        "machine": "x86_64", "cores": 4, "avx2": True, "avx512": False, "neon": False, "openblas": True,
+    })
+    monkeypatch.setattr(setup.sys, "platform", "linux")
+    builds = []
+
+    def build_whisper(profile, cores, rebuild=False):
+        builds.append(profile)
+        return profile != "openblas"
+
+    monkeypatch.setattr(setup, "build_whisper", build_whisper)
+    return builds
+
+
+def test_failed_openblas_build_falls_back_to_native(fake_install, tmp_path):
+    setup.run_setup(skip_model=True)
+
+    assert fake_install == ["openblas", "native"]
+    assert json.loads((tmp_path / "config.json").read_text())["build_profile"] == "native"
+
+
+def test_requested_openblas_profile_does_not_fall_back(fake_install):
+    with pytest.raises(SystemExit):
+        setup.run_setup(skip_model=True, profile="openblas")
+
+    assert fake_install == ["openblas"]
@@ -0,0 +1,40 @@
+"""Joining the transcripts of overlapping streaming windows."""
+
+import sys
+import types
+
+try:
+    import sounddevice  # noqa: F401
+except (ImportError, OSError):
+    # No PortAudio here; streaming only imports the recorder
+    fake_sd = types.ModuleType("sounddevice")
+    fake_sd.PortAudioError = type("PortAudioError", (Exception,), {})
+    sys.modules["sounddevice"] = fake_sd
+
+from voice_to_claude.streaming import stitch_text  # noqa: E402
+
+
+def test_words_repeated_across_the_overlap_are_kept_once():
+    assert stitch_text("we walked to the", "to the park") == "we walked to the park"
+
+
+def test_overlap_matching_ignores_case_and_punctuation():
+    assert stitch_text("we walked to the park.", "The park, then home") == "we walked to the park. then home"
+
+
+def test_longest_overlap_wins():
+    assert stitch_text("and so on and so", "and so on and so forth") == "and so on and so forth"
+
+
+def test_unrelated_segments_are_concatenated():
+    assert stitch_text("first part", "second part") == "first part second part"
+
+
+def test_overlap_longer_than_the_limit_is_not_removed():
+    assert stitch_text("one two three", "one two three four", max_overlap_words=2) == \
+        "one two three one two three four"
+
+
+def test_empty_segments():
+    assert stitch_text("", "hello") == "hello"
+    assert stitch_text("hello", "") == "hello"
@@ -0,0 +1,90 @@
+"""Transcriber's whisper-cli input handling, against stand-in whisper-cli scripts."""
+
+import sys
+
+import numpy as np
+import pytest
+
+from voice_to_claude import transcriber as transcriber_module
+from voice_to_claude.config import Config
+from voice_to_claude.transcriber import Transcriber
+
+# Prints a transcript for readable input, logging each call's input argument
+NEW_CLI = """
+import sys
+args = sys.argv[1:]
+source = args[args.index("-f") + 1]
+open(LOG, "a").write(source + "\\n")
+if source == "-":
+    sys.stdin.buffer.read()
+print(" hello world")
+"""
+
+# Rejects stdin like builds from before "-f -" existed
+OLD_CLI = """
+import sys
+args = sys.argv[1:]
+source = args[args.index("-f") + 1]
+open(LOG, "a").write(source + "\\n")
+if source == "-":
+    print("error: input file not found '-'", file=sys.stderr)
+    sys.exit(2)
+print(" hello world")
+"""
+
+# Fails for a reason unrelated to stdin
+BROKEN_CLI = """
+import sys
+args = sys.argv[1:]
+open(LOG, "a").write(args[args.index("-f") + 1] + "\\n")
+print("whisper_init_from_file: failed to load model", file=sys.stderr)
+sys.exit(1)
+"""
+
+
+@pytest.fixture(autouse=True)
+def fresh_stdin_support(monkeypatch):
+    monkeypatch.setattr(transcriber_module, "_no_stdin_clis", set())
+
+
+def make_transcriber(tmp_path, body):
+    log = tmp_path / "calls.log"
+    cli = tmp_path / "whisper-cli"
+    cli.write_text(f"#!{sys.executable}\nLOG = {str(log)!r}\n{body}")
+    cli.chmod(0o755)
+    (tmp_path / "ggml-tiny.bin").write_bytes(b"model")
+    config = Config(model="tiny", whisper_cpp_path=str(cli), models_dir=str(tmp_path),
+                    use_server=False, cache_enabled=False)
+    return Transcriber(config), log
+
+
+def calls(log):
+    return ["file" if line != "-" else "-" for line in log.read_text().split()]
+
+
+AUDIO = np.zeros(1600, dtype=np.int16)
+
+
+def test_stdin_is_used_when_supported(tmp_path):
+    transcriber, log = make_transcriber(tmp_path, NEW_CLI)
+
+    assert transcriber.transcribe_audio(AUDIO).text == "hello world"
+    assert calls(log) == ["-"]
+
+
+def test_rejected_stdin_falls_back_once_then_uses_files(tmp_path):
+    transcriber, log = make_transcriber(tmp_path, OLD_CLI)
+
+    assert transcriber.transcribe_audio(AUDIO).text == "hello world"
+    assert transcriber.transcribe_audio(AUDIO).text == "hello world"
+    assert calls(log) == ["-", "file", "file"]
+
+
+def test_other_failures_are_not_retried(tmp_path):
+    transcriber, log = make_transcriber(tmp_path, BROKEN_CLI)
+
+    result = transcriber.transcribe_audio(AUDIO)
+
+    assert not result.success
+    assert "failed to load model" in result.error
+    assert calls(log) == ["-"]
@@ -0,0 +1,80 @@
+"""VoiceActivityDetector trimming on synthetic recordings."""
+
+import numpy as np
+
+from voice_to_claude.vad import VoiceActivityDetector
+
+RATE = 16000
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * RATE), dtype=np.int16)
+
+
+def tone(seconds, amplitude=8000):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+
+
+def hiss(seconds, amplitude=100, zero_crossings=True):
+    """A quiet signal, below the voiced threshold but above threshold - margin."""
+    samples = np.full(int(seconds * RATE), amplitude, dtype=np.int16)
+    if zero_crossings:
+        samples[1::2] = -amplitude
+    return samples
+
+
+def detector(**kwargs):
+    options = dict(threshold_db=-45.0, max_pause_seconds=1.0, padding_seconds=0.2, min_speech_seconds=0.2)
+    return VoiceActivityDetector(**{**options, **kwargs})
+
+
+def test_silence_is_rejected():
+    assert detector().trim(silence(2), RATE) is None
+
+
+def test_speech_shorter_than_the_minimum_is_rejected():
+    audio = np.concatenate((silence(1), tone(0.1), silence(1)))
+
+    assert detector().trim(audio, RATE) is None
+
+
+def test_leading_and_trailing_silence_is_trimmed_to_the_padding():
+    audio = np.concatenate((silence(1), tone(0.5), silence(1)))
+
+    trimmed = detector().trim(audio, RATE)
+
+    assert len(trimmed) == round((0.2 + 0.5 + 0.2) * RATE)
+    assert np.array_equal(trimmed[int(0.2 * RATE):int(0.7 * RATE)], tone(0.5))
+
+
+def test_long_pauses_are_shortened():
+    audio = np.concatenate((silence(1), tone(0.5), silence(3), tone(0.5), silence(1)))
+
+    trimmed = detector().trim(audio, RATE)
+
+    # Both words with their padding either side, and the silence between cut to max_pause_seconds
+    assert len(trimmed) == round((0.2 + 0.5 + 0.2 + 1.0 + 0.2 + 0.5 + 0.2) * RATE)
+    assert np.count_nonzero(trimmed) == np.count_nonzero(tone(0.5)) * 2
+
+
+def test_speech_running_to_the_end_is_kept_whole():
+    audio = np.concatenate((silence(1), tone(0.5), tone(0.005)))
+
+    trimmed = detector().trim(audio, RATE)
+
+    assert np.array_equal(trimmed[-len(tone(0.005)):], tone(0.005))
+
+
+def test_quiet_unvoiced_sounds_count_as_speech():
+    quiet = np.concatenate((silence(1), hiss(0.5), silence(1)))
+    hum = np.concatenate((silence(1), hiss(0.5, zero_crossings=False), silence(1)))
+
+    assert detector().trim(quiet, RATE) is not None
+    assert detector().trim(hum, RATE) is None
+
+
+def test_float_audio_is_measured_like_int16():
+    audio = np.concatenate((silence(1), tone(0.5), silence(1))).astype(np.float32) / 32768.0
+
+    assert len(detector().trim(audio, RATE)) == round((0.2 + 0.5 + 0.2) * RATE)
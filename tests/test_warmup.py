@@ -0,0 +1,30 @@
+"""ModelWarmer mapping and locking of a model file."""
+
+import os
+
+from voice_to_claude.warmup import ModelWarmer
+
+
+def test_warm_without_lock_unmaps(tmp_path):
+    path = tmp_path / "ggml-test.bin"
+    path.write_bytes(os.urandom(1 << 20))
+    warmer = ModelWarmer(path)
+
+    assert warmer.warm()
+    assert warmer.status()["state"] == "warm"
+    assert warmer._map is None
+
+
+def test_lock_pins_the_shared_file_mapping(tmp_path):
+    path = tmp_path / "ggml-test.bin"
+    path.write_bytes(os.urandom(1 << 20))
+    warmer = ModelWarmer(path, lock=True)
+
+    assert warmer.warm()
+    if warmer.locked:  # Depends on RLIMIT_MEMLOCK
+        # Read-only shared pages: locking must not create private copies
+        assert not warmer._buffer.flags.writeable
+        assert warmer.status()["state"] == "resident"
+    warmer.release()
+    assert warmer.status()["state"] == "warm"
+    assert not warmer.locked